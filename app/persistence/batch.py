@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from app.persistence.repository import ReadQuery
+from app.persistence.timeouts import QueryTimeouts
+
+T = TypeVar('T')
+
+
+@dataclass
+class _Entry:
+    query: ReadQuery
+    future: Future[Any]
+
+
+# --------------------------------------------------
+# QUERY BATCH
+# --------------------------------------------------
+class QueryBatch:
+    """Runs several repository reads with one connection checkout.
+
+    >>> batch = QueryBatch(connection_pool)
+    >>> team = batch.submit(team_repository.find_by_name, 'Team A')
+    >>> player = batch.submit(player_repository.find_by_id, 5)
+    >>> batch.execute()
+    >>> team.result(), player.result()
+
+    With `multi_statement` all queries go to the server as one request and their
+    result sets are read one after another - a single round trip. Otherwise they
+    run one by one on the same pinned connection (no checkout / session reset
+    between them). Batched reads skip the query result cache. `timeouts` limit
+    every query of the batch, the deadline covers the whole batch.
+    """
+
+    def __init__(self, connection_pool: Any, multi_statement: bool = True, timeouts: QueryTimeouts | None = None):
+        self._connection_pool = connection_pool
+        self._multi_statement = multi_statement
+        self._timeouts = timeouts or QueryTimeouts()
+        self._entries: list[_Entry] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> QueryBatch:
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def submit(self, finder: Callable[..., T], *args: Any) -> Future[T]:
+        """Queue `finder(*args)` (a bound repository finder) and return a future of its result."""
+        repository = getattr(finder, '__self__', None)
+        build = getattr(repository, f'_{finder.__name__}_query', None)
+        if build is None:
+            raise ValueError(f'{finder.__qualname__} cannot be batched')
+        future: Future[T] = Future()
+        query = build(*args)
+        if query is None:
+            # Finder odpowiada bez bazy (np. TeamRepository z indeksem)
+            future.set_result(finder(*args))
+        else:
+            self._entries.append(_Entry(query, future))
+        return future
+
+    def execute(self) -> None:
+        entries, self._entries = self._entries, []
+        if not entries:
+            return
+        try:
+            with self._connection_pool.get_connection() as conn, self._timeouts.guard(conn):
+                cursor = conn.cursor()
+                if self._multi_statement and len(entries) > 1:
+                    self._execute_multi(cursor, entries)
+                else:
+                    for entry in entries:
+                        cursor.execute(self._timeouts.sql(entry.query.sql), entry.query.params)
+                        QueryBatch._resolve(entry, cursor)
+        except Exception as e:
+            for entry in entries:
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+            raise
+
+    def _execute_multi(self, cursor: Any, entries: list[_Entry]) -> None:
+        sql = ';\n'.join(self._timeouts.sql(entry.query.sql) for entry in entries)
+        params = tuple(param for entry in entries for param in entry.query.params)
+        cursor.execute(sql, params)
+        for i, entry in enumerate(entries):
+            if i > 0 and not cursor.nextset():
+                raise RuntimeError(f'Missing result set for query {i + 1} of {len(entries)}')
+            QueryBatch._resolve(entry, cursor)
+
+    @staticmethod
+    def _resolve(entry: _Entry, cursor: Any) -> None:
+        rows = cursor.fetchall()
+        try:
+            entry.future.set_result(entry.query.convert(cursor, rows[:1] if entry.query.one else rows, False))
+        except Exception as e:
+            entry.future.set_exception(e)
@@ -0,0 +1,147 @@
+import copy
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+def copy_rows(rows: list[Any]) -> list[Any]:
+    """Copy of a cached result - a new list of new entity objects, so callers cannot change the cache."""
+    return [copy.copy(row) for row in rows]
+
+
+class TtlCache:
+    """Small thread-safe cache whose entries expire `ttl` seconds after they were loaded.
+
+    Expired entries are dropped on every write, and at most `max_entries` are kept -
+    the one closest to expiring goes first, so keys that are never read again
+    (e.g. every `top_scorers(n)`) cannot grow it without bound.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic, max_entries: int = 1024):
+        self._ttl = ttl
+        self._clock = clock
+        self._max_entries = max_entries
+        # Kolejnosc wstawienia = kolejnosc wygasania (stale ttl)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        value = loader()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self._ttl, value)
+            self._evict(self._clock())
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            expires, _ = next(iter(self._entries.values()))
+            if expires > now and len(self._entries) <= self._max_entries:
+                return
+            self._entries.popitem(last=False)
+
+
+def _size_of(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set)):
+        size += sum(_size_of(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(_size_of(key) + _size_of(item) for key, item in value.items())
+    elif hasattr(value, '__dict__'):
+        size += _size_of(vars(value))
+    return size
+
+
+class TableVersions:
+    """Per-table counters bumped by every write; cached results remember the versions they saw."""
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, table: str) -> None:
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def snapshot(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+
+class QueryCache:
+    """Result-set cache keyed by normalized statement and bound parameters.
+
+    An entry is valid only while the versions of all tables it reads are unchanged,
+    so a write to `players` never evicts queries that only touch `teams`. Least
+    recently used entries are evicted when the estimated size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, versions: TableVersions | None = None):
+        self._max_bytes = max_bytes
+        self._versions = versions or TableVersions()
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], Any, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        return ' '.join(sql.split()).rstrip(';')
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, sql: str, params: tuple[Any, ...], tables: tuple[str, ...],
+                    loader: Callable[[], Any]) -> Any:
+        key = (QueryCache.normalize(sql), params, tables)
+        versions = self._versions.snapshot(tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == versions:
+                self._entries.move_to_end(key)
+                return entry[1]
+            if entry:
+                self._remove(key)
+
+        value = loader()
+        size = _size_of(value)
+        if size > self._max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (versions, value, size)
+            self._size += size
+            while self._size > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+        return value
+
+    def invalidate(self, *tables: str) -> None:
+        for table in tables:
+            self._versions.bump(table)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size -= size
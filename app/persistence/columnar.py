@@ -0,0 +1,69 @@
+import importlib.util
+from array import array
+from typing import Any, Sequence
+
+from app.persistence.mapper import DECIMAL_TYPES, field_types
+
+# >> pipenv install numpy (opcjonalnie - bez numpy kolumny liczbowe sa zwracane jako array.array)
+# Sam import numpy to dziesiatki ms - sprawdzamy tylko, czy jest, a importujemy przy pierwszym wyniku
+HAVE_NUMPY = importlib.util.find_spec('numpy') is not None
+
+
+# --------------------------------------------------
+# COLUMNAR RESULTS
+# --------------------------------------------------
+class ColumnarBuilder:
+    """Collects fetched row batches straight into one container per column.
+
+    Columns typed as int / float on the entity go into contiguous `array.array`
+    storage ('q' / 'd'), other columns into lists. No per-row entity objects are
+    created. A numeric column that contains NULL falls back to a list.
+    """
+
+    def __init__(self, entity: Any, description: Sequence[Sequence[Any]]):
+        types = field_types(entity)
+        self._columns = [column[0] for column in description]
+        self._decimal = [column[1] in DECIMAL_TYPES for column in description]
+        self._data: list[Any] = []
+        for name in self._columns:
+            column_types = types.get(name, ())
+            if int in column_types:
+                self._data.append(array('q'))
+            elif float in column_types:
+                self._data.append(array('d'))
+            else:
+                self._data.append([])
+
+    def add(self, rows: Sequence[Sequence[Any]]) -> None:
+        if not rows:
+            return
+        for i, values in enumerate(zip(*rows)):
+            storage = self._data[i]
+            if isinstance(storage, array):
+                if None in values:
+                    storage = self._data[i] = storage.tolist()
+                elif self._decimal[i]:
+                    values = tuple(map(int, values)) if storage.typecode == 'q' else tuple(map(float, values))
+            storage.extend(values)
+
+    def result(self, use_numpy: bool | None = None) -> dict[str, Any]:
+        if use_numpy is None:
+            use_numpy = HAVE_NUMPY
+        if use_numpy and not HAVE_NUMPY:
+            raise ImportError('numpy is not installed')
+        if not use_numpy:
+            return dict(zip(self._columns, self._data))
+        import numpy
+        return {
+            name: numpy.frombuffer(data, dtype=numpy.int64 if data.typecode == 'q' else numpy.float64)
+            if isinstance(data, array) else numpy.array(data, dtype=object)
+            for name, data in zip(self._columns, self._data)
+        }
+
+
+def fetch_columnar(entity: Any, cursor: Any, batch_size: int, use_numpy: bool | None = None) -> dict[str, Any]:
+    builder = ColumnarBuilder(entity, cursor.description)
+    while rows := cursor.fetchmany(batch_size):
+        builder.add(rows)
+    return builder.result(use_numpy)
+
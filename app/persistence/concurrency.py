@@ -0,0 +1,47 @@
+import functools
+import logging
+from dataclasses import field, fields
+from typing import Any, Callable, TypeVar
+
+T = TypeVar('T')
+
+
+# --------------------------------------------------
+# OPTIMISTIC LOCKING
+# --------------------------------------------------
+class OptimisticLockError(Exception):
+    """Raised when an update finds no row with the expected id_ and version."""
+
+
+def version_column() -> Any:
+    """Declare an integer version column on a dataclass entity.
+
+    Updates through CrudRepository then check and increment it instead of
+    overwriting the row blindly.
+    """
+    return field(default=0, metadata={'version': True})
+
+
+def version_column_of(entity: Any) -> str | None:
+    return next((f.name for f in fields(entity) if f.metadata.get('version')), None)
+
+
+def retry_on_conflict(attempts: int = 3) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Re-run a service method when it loses an optimistic locking race.
+
+    The decorated method must read the entity again on every call, so each attempt
+    works with the current version.
+    """
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            for attempt in range(1, attempts + 1):
+                try:
+                    return method(*args, **kwargs)
+                except OptimisticLockError:
+                    if attempt == attempts:
+                        raise
+                    logging.info(f'Optimistic lock conflict in {method.__name__}, attempt {attempt}/{attempts}')
+            raise AssertionError('unreachable')
+        return wrapper
+    return decorator
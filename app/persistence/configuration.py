@@ -1,7 +1,221 @@
+import dataclasses
+import os
+import threading
+from typing import Any, Callable
 
-from app.persistence.connection import connection_pool
-from app.persistence.repository import TeamRepository, PlayerRepository, PlayerWithTeamRepository   
+from app.persistence import connection
 
-team_repository = TeamRepository(connection_pool)
-player_repository = PlayerRepository(connection_pool)
-player_with_team_repository = PlayerWithTeamRepository(connection_pool)
\ No newline at end of file
+# --------------------------------------------------------------------------------------
+# Repozytoria (i pula polaczen) sa tworzone dopiero przy pierwszym uzyciu.
+# `from app.persistence.configuration import team_repository` dalej dziala - atrybut
+# modulu jest pobierany z rejestru przez __getattr__.
+# --------------------------------------------------------------------------------------
+
+
+class RepositoryRegistry:
+    def __init__(self, pool_factory: Callable[[str], Any]):
+        # pool_factory dostaje nazwe profilu (app.persistence.settings) i zwraca pule
+        self._pool_factory = pool_factory
+        self._pools: dict[str, Any] = {}
+        self._override_pool: Any = None
+        self._factories: dict[str, tuple[Callable[[Any], Any], str]] = {}
+        self._instances: dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[Any], Any], profile: str = 'default') -> None:
+        self._factories[name] = (factory, profile)
+
+    def has(self, name: str) -> bool:
+        return name in self._factories
+
+    def get(self, name: str) -> Any:
+        if name not in self._instances:
+            with self._lock:
+                if name not in self._instances:
+                    factory, profile = self._factories[name]
+                    self._instances[name] = factory(self.pool(profile))
+        return self._instances[name]
+
+    def pool(self, profile: str = 'default') -> Any:
+        with self._lock:
+            if profile not in self._pools:
+                pool = self._override_pool if self._override_pool is not None else self._pool_factory(profile)
+                self._pools[profile] = pool
+            return self._pools[profile]
+
+    def use_pool(self, pool: Any, profile: str | None = None) -> None:
+        # Np. testy: repozytoria (wszystkich profili albo jednego) na wskazanej puli
+        with self._lock:
+            if profile is None:
+                self._override_pool = pool
+                self._pools.clear()
+            else:
+                self._pools[profile] = pool
+            self._instances.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._override_pool = None
+            self._pools.clear()
+            self._instances.clear()
+
+
+def _profile_pool(profile: str) -> Any:
+    if profile == 'default':
+        return connection.connection_pool
+    return connection.MySQLConnectionPoolBuilder.from_profile(profile).build_lazy()
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _query_cache(pool: Any) -> Any:
+    from app.persistence.cache import QueryCache
+    # Wspolny cache - zapis przez dowolne repozytorium uniewaznia zapytania do tej samej tabeli
+    return QueryCache()
+
+
+def _retry_policy(pool: Any) -> Any:
+    from app.persistence.retry import RetryPolicy
+    # Wspolna polityka - jeden budzet ponowien i jedne metryki dla wszystkich repozytoriow
+    return RetryPolicy()
+
+
+def _query_canceller(pool: Any) -> Any:
+    from app.persistence.timeouts import QueryCanceller
+    return QueryCanceller(pool)
+
+
+def _query_timeouts(pool: Any) -> Any:
+    from app.persistence.timeouts import QueryTimeouts
+    # MYSQL_QUERY_TIMEOUT=5 - limit (w sekundach) kazdego zapytania repozytoriow, potem KILL QUERY
+    seconds = os.environ.get('MYSQL_QUERY_TIMEOUT')
+    if not seconds:
+        return None
+    timeouts = QueryTimeouts.of(float(seconds), registry.get('query_canceller'))
+    # Pula z init_command z load_pool_config ustawia juz lock_wait kazdemu polaczeniu
+    if getattr(pool, 'init_command', None) == timeouts.init_command():
+        return dataclasses.replace(timeouts, lock_wait_on_connect=True)
+    return timeouts
+
+
+def _admission_controller(pool: Any) -> Any:
+    from app.service.admission import AdaptiveLimit, AdmissionController
+    # Wiecej rownoczesnych operacji niz polaczen w puli konczy sie bledem "pool exhausted"
+    return AdmissionController(AdaptiveLimit(initial=pool.pool_size, max_limit=pool.pool_size))
+
+
+def _team_repository(pool: Any) -> Any:
+    from app.persistence.repository import TeamRepository
+    # Id z sekwencji, jak w graph_writer - auto_increment moglby zajac id z bloku zarezerwowanego przez inny proces
+    return (TeamRepository(pool, registry.get('query_cache'))
+            .with_retry(registry.get('retry_policy'))
+            .with_timeouts(registry.get('query_timeouts'))
+            .with_id_allocator(registry.get('team_id_allocator')))
+
+
+def _player_repository(pool: Any) -> Any:
+    from app.persistence.repository import PlayerRepository
+    repository = (PlayerRepository(pool, registry.get('query_cache'))
+                  .with_retry(registry.get('retry_policy'))
+                  .with_timeouts(registry.get('query_timeouts'))
+                  .with_id_allocator(registry.get('player_id_allocator')))
+    # MYSQL_TEAM_STATS=1 - zapisy zawodnikow aktualizuja tabele team_stats (connection.create_team_stats_table)
+    if _env_flag('MYSQL_TEAM_STATS'):
+        repository.with_summary(registry.get('team_stats'))
+    return repository
+
+
+def _team_stats(pool: Any) -> Any:
+    from app.persistence.summary import TeamStatsSummary
+    return TeamStatsSummary(pool)
+
+
+def _player_with_team_repository(pool: Any) -> Any:
+    from app.persistence.repository import PlayerWithTeamRepository
+    return PlayerWithTeamRepository(pool, registry.get('query_cache'))
+
+
+def _player_write_buffer(pool: Any) -> Any:
+    from app.persistence.write_behind import WriteBehindBuffer
+    # Aktualizacje statystyk w trakcie meczu - tysiace drobnych zmian, zapisywane paczkami
+    return WriteBehindBuffer(registry.get('player_repository')).start()
+
+
+def _team_id_allocator(pool: Any) -> Any:
+    from app.persistence.ids import HiLoIdAllocator
+    # Pierwsza rezerwacja tworzy id_sequences i zaczyna sekwencje za max(id_) tabeli
+    return HiLoIdAllocator(pool, 'teams', table='teams')
+
+
+def _player_id_allocator(pool: Any) -> Any:
+    from app.persistence.ids import HiLoIdAllocator
+    return HiLoIdAllocator(pool, 'players', table='players')
+
+
+def _graph_writer(pool: Any) -> Any:
+    from app.persistence.graph import GraphWriter
+    from app.persistence.model import Player, Team
+    return GraphWriter(
+        [registry.get('team_repository'), registry.get('player_repository')],
+        {Team: registry.get('team_id_allocator'), Player: registry.get('player_id_allocator')}
+    )
+
+
+def _sharded_player_repository(pool: Any) -> Any:
+    from app.persistence.sharding import ShardMap, ShardedPlayerRepository
+    # MYSQL_SHARDS=shard0,shard1 - nazwy profili (app.persistence.settings), kolejnosc wyznacza numer sharda.
+    # Sekwencja id jest w bazie domyslnej.
+    profiles = [name.strip() for name in os.environ.get('MYSQL_SHARDS', '').split(',') if name.strip()]
+    if not profiles:
+        raise ValueError('MYSQL_SHARDS is not set')
+    shard_map = ShardMap([registry.pool(profile) for profile in profiles])
+    return ShardedPlayerRepository(shard_map, registry.get('player_id_allocator'), registry.get('query_cache'))
+
+
+def _team_index(pool: Any) -> Any:
+    from app.persistence.team_index import TeamIndex
+    # Po pobraniu indeksu team_repository odpowiada na zapytania o punkty i nazwe z pamieci.
+    # Zmiany z innych procesow i innych repozytoriow (np. bulk_team_repository) sa widoczne najpozniej po max_age sekundach.
+    return TeamIndex(registry.get('team_repository'), max_age=60.0).attach()
+
+
+def _parallel_player_importer(pool: Any) -> Any:
+    from app.service.parallel_import import ParallelPlayerImporter
+    return ParallelPlayerImporter(pool, player_repository=registry.get('bulk_player_repository'),
+                                  team_repository=registry.get('bulk_team_repository'))
+
+
+def _reporting_repository(pool: Any) -> Any:
+    from app.persistence.reporting import ReportingRepository
+    return ReportingRepository(pool, cache_ttl=5.0, use_team_stats=_env_flag('MYSQL_TEAM_STATS'))
+
+
+registry = RepositoryRegistry(_profile_pool)
+registry.register('query_cache', _query_cache)
+registry.register('retry_policy', _retry_policy)
+registry.register('query_canceller', _query_canceller, profile='control')
+registry.register('query_timeouts', _query_timeouts)
+registry.register('admission_controller', _admission_controller)
+registry.register('team_stats', _team_stats)
+registry.register('team_repository', _team_repository)
+registry.register('player_repository', _player_repository)
+registry.register('player_with_team_repository', _player_with_team_repository)
+registry.register('reporting_repository', _reporting_repository)
+registry.register('player_write_buffer', _player_write_buffer)
+registry.register('team_index', _team_index)
+registry.register('team_id_allocator', _team_id_allocator)
+registry.register('player_id_allocator', _player_id_allocator)
+registry.register('graph_writer', _graph_writer)
+registry.register('sharded_player_repository', _sharded_player_repository)
+# Repozytoria dla importow / eksportow - osobna pula strojona pod duze transfery
+registry.register('bulk_team_repository', _team_repository, profile='bulk')
+registry.register('bulk_player_repository', _player_repository, profile='bulk')
+registry.register('parallel_player_importer', _parallel_player_importer, profile='bulk')
+
+
+def __getattr__(name: str) -> Any:
+    if registry.has(name):
+        return registry.get(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
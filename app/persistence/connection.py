@@ -1,9 +1,16 @@
-from mysql.connector import pooling
-from mysql.connector.pooling import MySQLConnectionPool
-from typing import Self, Any, TypedDict, cast
+from __future__ import annotations
+
+from typing import Self, Any, Protocol, TypedDict, Iterator, TYPE_CHECKING, cast
 from dataclasses import field
+from contextlib import contextmanager
 import os
 import logging
+import threading
+import weakref
+
+# Connector jest importowany dopiero przy budowie puli - sam import modulu nic nie laczy
+if TYPE_CHECKING:
+    from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
 
 # >> pip install mysql-connector-python
 
@@ -27,7 +34,32 @@ class PoolConfig(TypedDict, total=False):
     user: str
     password: str
     port:int
-    
+    allow_local_infile: bool
+    connection_timeout: int
+    read_timeout: int
+    write_timeout: int
+    autocommit: bool
+    use_pure: bool
+    compress: bool
+    buffered: bool
+    charset: str
+    init_command: str
+
+
+class ConnectionPool(Protocol):
+    """What repositories need from a pool: MySQLConnectionPool, LazyConnectionPool and PinnedConnectionPool."""
+
+    @property
+    def pool_size(self) -> int: ...
+
+    # Context manager z polaczeniem (PooledMySQLConnection albo polaczenie przypiete)
+    def get_connection(self) -> Any: ...
+
+
+def c_extension_available() -> bool:
+    import mysql.connector
+    return bool(mysql.connector.HAVE_CEXT)
+
 
 class MySQLConnectionPoolBuilder:
     def __init__(self, params: PoolConfig | None = None):
@@ -64,17 +96,194 @@ class MySQLConnectionPoolBuilder:
         self._pool_config['port'] = data
         return self
 
+    def allow_local_infile(self, data: bool) -> Self:
+        self._pool_config['allow_local_infile'] = data
+        return self
+
+    def host(self, data: str) -> Self:
+        self._pool_config['host'] = data
+        return self
+
+    def pool_name(self, data: str) -> Self:
+        self._pool_config['pool_name'] = data
+        return self
+
+    def connection_timeout(self, data: int) -> Self:
+        self._pool_config['connection_timeout'] = data
+        return self
+
+    def autocommit(self, data: bool) -> Self:
+        self._pool_config['autocommit'] = data
+        return self
+
+    def use_pure(self, data: bool) -> Self:
+        self._pool_config['use_pure'] = data
+        return self
+
+    def compress(self, data: bool) -> Self:
+        self._pool_config['compress'] = data
+        return self
+
+    def buffered(self, data: bool) -> Self:
+        self._pool_config['buffered'] = data
+        return self
+
+    def charset(self, data: str) -> Self:
+        self._pool_config['charset'] = data
+        return self
+
+    def init_command(self, data: str) -> Self:
+        self._pool_config['init_command'] = data
+        return self
+
+    def connection_budget(self, max_connections: int, processes: int, reserved: int = 0) -> Self:
+        self._pool_config['pool_size'] = pool_size_for_budget(max_connections, processes, reserved)
+        return self
+
+    def config(self, params: PoolConfig) -> Self:
+        self._pool_config.update(params)
+        return self
+
     def build(self) -> MySQLConnectionPool:
-        return MySQLConnectionPool(**self._pool_config)
+        from mysql.connector.pooling import MySQLConnectionPool
+        return MySQLConnectionPool(**self.driver_config())
+
+    def driver_config(self) -> PoolConfig:
+        """Pool configuration with the driver chosen explicitly.
+
+        Without `use_pure` the C extension is used when it is installed. A request for
+        the C extension falls back to the pure Python protocol when it is missing.
+        """
+        config: PoolConfig = {**self._pool_config}
+        available = c_extension_available()
+        if 'use_pure' not in config:
+            config['use_pure'] = not available
+        elif not config['use_pure'] and not available:
+            logging.warning('mysql-connector C extension is not available, using pure Python driver')
+            config['use_pure'] = True
+        return config
+
+    def build_lazy(self) -> LazyConnectionPool:
+        return LazyConnectionPool(self)
 
     @classmethod
     def builder(cls) -> Self:
         return cls()
 
+    @classmethod
+    def from_env(cls, env: dict[str, str] | None = None) -> Self:
+        """Builder configured from MYSQL_* variables (the same names as in docker-compose.yml)."""
+        from app.persistence.settings import load_pool_config
+        return cls(load_pool_config('default', env=env))
+
+    @classmethod
+    def from_profile(cls, profile: str, path: str | None = None, env: dict[str, str] | None = None) -> Self:
+        """Builder configured from a named profile (see app.persistence.settings)."""
+        from app.persistence.settings import load_pool_config
+        return cls(load_pool_config(profile, path, env))
+
+
+# Pule odziedziczone po fork() - trzymamy referencje, zeby GC w dziecku nie zamknal
+# (przez __del__) gniazd, ktorych nadal uzywa proces rodzica
+_inherited_pools: list[Any] = []
+_lazy_pools: weakref.WeakSet[LazyConnectionPool] = weakref.WeakSet()
+
+
+class LazyConnectionPool:
+    """Pool that opens its connections on the first get_connection() instead of at import time.
+
+    The pool belongs to the process that built it. After fork() the child never
+    reuses the parent's connections - it builds its own pool on first use.
+    """
+
+    def __init__(self, builder: MySQLConnectionPoolBuilder):
+        self._builder = builder
+        self._pool: MySQLConnectionPool | None = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        _lazy_pools.add(self)
+
+    @property
+    def pool_size(self) -> int:
+        return self._builder._pool_config['pool_size']
+
+    @property
+    def init_command(self) -> str | None:
+        return self._builder._pool_config.get('init_command')
+
+    @property
+    def is_built(self) -> bool:
+        return self._pool is not None
+
+    def pool(self) -> MySQLConnectionPool:
+        if self._pid != os.getpid():
+            self._after_fork()
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    logging.info(f'Creating connection pool {self._builder._pool_config["pool_name"]} '
+                                 f'in process {os.getpid()}')
+                    self._pool = self._builder.build()
+        return self._pool
+
+    def get_connection(self) -> PooledMySQLConnection:
+        return self.pool().get_connection()
+
+    def _after_fork(self) -> None:
+        if self._pool is not None:
+            _inherited_pools.append(self._pool)
+        self._pool = None
+        self._pid = os.getpid()
+        # Lock mogl zostac skopiowany w stanie zablokowanym przez inny watek rodzica
+        self._lock = threading.Lock()
+
+
+def _reset_pools_after_fork() -> None:
+    for pool in list(_lazy_pools):
+        pool._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+# mysql.connector.pooling.CNX_POOL_MAXSIZE
+MAX_POOL_SIZE = 32
 
-connection_pool = MySQLConnectionPoolBuilder.builder().port(3307).build()
 
-def create_tables(connection_pool: MySQLConnectionPool) -> None:
+def pool_size_for_budget(max_connections: int, processes: int, reserved: int = 0) -> int:
+    """Per-process pool size so that all worker processes stay within `max_connections`.
+
+    `reserved` connections are left for admin tools, migrations, replication etc.
+    """
+    available = max_connections - reserved
+    if processes < 1 or available < processes:
+        raise ValueError(f'Cannot split {available} connections between {processes} processes')
+    return min(available // processes, MAX_POOL_SIZE)
+
+
+class PinnedConnectionPool:
+    """Pool-like wrapper that always hands out the same, already checked-out connection.
+
+    Repositories built on it run on that single connection. The connection is not
+    closed here - it is returned to its pool by whoever checked it out.
+    """
+
+    def __init__(self, connection: Any):
+        self._connection = connection
+
+    @property
+    def pool_size(self) -> int:
+        return 1
+
+    @contextmanager
+    def get_connection(self) -> Iterator[Any]:
+        yield self._connection
+
+
+connection_pool = MySQLConnectionPoolBuilder.from_env().build_lazy()
+
+def create_tables(connection_pool: ConnectionPool) -> None:
     with connection_pool.get_connection() as conn:
         cursor = conn.cursor()
 
@@ -98,11 +307,33 @@ def create_tables(connection_pool: MySQLConnectionPool) -> None:
         cursor.execute(teams_table_sql)
         cursor.execute(players_table_sql)
 
-def drop_tables(connection_pool: MySQLConnectionPool) -> None:
+def drop_tables(connection_pool: ConnectionPool) -> None:
     with connection_pool.get_connection() as conn:
         cursor = conn.cursor()
 
         drop_players_table_sql = "drop table if exists players;"
         drop_teams_table_sql = "drop table if exists teams;"
         cursor.execute(drop_players_table_sql)
-        cursor.execute(drop_teams_table_sql)
\ No newline at end of file
+        cursor.execute(drop_teams_table_sql)
+
+def create_team_stats_table(connection_pool: ConnectionPool) -> None:
+    # Podsumowanie utrzymywane przez PlayerRepository.with_summary(TeamStatsSummary(...)), wypelniane przez rebuild()
+    with connection_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+                create table if not exists team_stats (
+                    team_id integer primary key,
+                    players integer not null default 0,
+                    goals integer not null default 0,
+                    foreign key (team_id) references teams(id_) on delete cascade on update cascade
+                );
+            ''')
+
+
+def create_archive_table(connection_pool: ConnectionPool, table: str, archive_table: str | None = None) -> str:
+    # Ta sama struktura co tabela zrodlowa, ale bez kluczy obcych (create table ... like ich nie kopiuje)
+    archive_table = archive_table or f'{table}_archive'
+    with connection_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'create table if not exists {archive_table} like {table}')
+    return archive_table
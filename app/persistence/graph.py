@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import contextlib
+from typing import Any
+
+from app.persistence.ids import HiLoIdAllocator
+from app.persistence.relationship import relationships_of
+from app.persistence.repository import CrudRepository
+
+
+# --------------------------------------------------
+# OBJECT GRAPH WRITES
+# --------------------------------------------------
+class GraphWriter:
+    """Inserts a graph of new entities (e.g. teams with their players) in one transaction.
+
+    Ids come from hi/lo allocators, so foreign keys (Player.team_id) are filled in
+    memory before anything is sent - no waiting for lastrowid between tables. The
+    graph is then written with one multi-row insert per table and a single commit.
+    All repositories must use the same database.
+    """
+
+    def __init__(self, repositories: list[CrudRepository], allocators: dict[Any, HiLoIdAllocator]):
+        if not repositories:
+            raise ValueError('Graph writer needs at least one repository')
+        self._repositories = {repository._entity: repository for repository in repositories}
+        self._allocators = allocators
+
+    def flush(self, roots: list[Any]) -> dict[Any, list[Any]]:
+        """Assign ids, link foreign keys and insert every entity reachable from `roots`.
+
+        Returns the written entities per type, in insert order.
+        """
+        by_type = self._collect(roots)
+        order = self._insert_order(by_type)
+        for entity in order:
+            items = by_type[entity]
+            if any(item.id_ is None for item in items):
+                if entity not in self._allocators:
+                    raise ValueError(f'No id allocator for {entity.__name__}')
+                self._allocators[entity].assign(items)
+        for items in by_type.values():
+            for item in items:
+                GraphWriter._link(item)
+
+        repositories = [self._repository(entity) for entity in order]
+        policy = repositories[0]._retry_policy
+
+        def write() -> None:
+            with repositories[0]._connection_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    conn.start_transaction()
+                    for repository in repositories:
+                        repository._insert_rows(cursor, by_type[repository._entity])
+                    conn.commit()
+                except Exception:
+                    with contextlib.suppress(Exception):
+                        conn.rollback()
+                    raise
+
+        # Id sa juz nadane - po deadlocku cala transakcja jest powtarzana z tymi samymi wartosciami
+        if policy is None:
+            write()
+        else:
+            policy.run(write, idempotent=False)
+        for repository in repositories:
+            repository._invalidate()
+            repository._notify(repository._after_insert, by_type[repository._entity])
+        return {entity: by_type[entity] for entity in order}
+
+    def _repository(self, entity: Any) -> CrudRepository:
+        if entity not in self._repositories:
+            raise ValueError(f'No repository for {entity.__name__}')
+        return self._repositories[entity]
+
+    @staticmethod
+    def _collect(roots: list[Any]) -> dict[Any, list[Any]]:
+        by_type: dict[Any, list[Any]] = {}
+        seen: set[int] = set()
+        stack = list(reversed(roots))
+        while stack:
+            item = stack.pop()
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            by_type.setdefault(type(item), []).append(item)
+            for name, relationship in relationships_of(type(item)).items():
+                related = getattr(item, name)
+                if related is None:
+                    continue
+                stack.extend(reversed(related) if relationship.many else [related])
+        return by_type
+
+    @staticmethod
+    def _insert_order(by_type: dict[Any, list[Any]]) -> list[Any]:
+        # Tabela nadrzedna (z kluczem glownym) przed tabela z kluczem obcym
+        parents: dict[Any, set[Any]] = {entity: set() for entity in by_type}
+        for entity in by_type:
+            for relationship in relationships_of(entity).values():
+                target = relationship.target_type(entity)
+                if target not in by_type:
+                    continue
+                if relationship.many:
+                    parents[target].add(entity)
+                else:
+                    parents[entity].add(target)
+        order: list[Any] = []
+        while parents:
+            ready = [entity for entity, required in parents.items() if not required - set(order)]
+            if not ready:
+                raise ValueError('Cyclic foreign keys between ' + ', '.join(entity.__name__ for entity in parents))
+            for entity in ready:
+                order.append(entity)
+                del parents[entity]
+        return order
+
+    @staticmethod
+    def _link(item: Any) -> None:
+        for name, relationship in relationships_of(type(item)).items():
+            related = getattr(item, name)
+            if related is None:
+                continue
+            if relationship.many:
+                for child in related:
+                    setattr(child, relationship.remote_key, getattr(item, relationship.local_key))
+            else:
+                setattr(item, relationship.local_key, getattr(related, relationship.remote_key))
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, TYPE_CHECKING
+
+from app.persistence.retry import error_code
+
+if TYPE_CHECKING:
+    from app.persistence.connection import ConnectionPool
+
+# --------------------------------------------------------------------------------------
+# Globalnie unikalne id (hi/lo) - niezalezne od auto_increment pojedynczej bazy / sharda.
+# Jedno zapytanie rezerwuje blok `block_size` kolejnych id, ktore potem sa nadawane
+# lokalnie bez kontaktu z baza.
+# --------------------------------------------------------------------------------------
+
+SEQUENCE_TABLE = 'id_sequences'
+# ER_NO_SUCH_TABLE
+_NO_SUCH_TABLE = 1146
+
+
+def create_sequence_table(connection_pool: ConnectionPool) -> None:
+    with connection_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            create table if not exists {SEQUENCE_TABLE} (
+                name varchar(50) primary key,
+                next_id bigint not null
+            );
+        ''')
+
+
+def seed_sequence(connection_pool: ConnectionPool, sequence: str, table: str) -> None:
+    """Start `sequence` above the ids already in `table` (no-op when the sequence exists).
+
+    Once a table gets ids from the allocator, all writers should use it - rows
+    inserted with auto_increment can take ids from blocks reserved but not used yet
+    (see CrudRepository.with_id_allocator).
+    """
+    with connection_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f'insert ignore into {SEQUENCE_TABLE} (name, next_id) '
+            f'select %s, coalesce(max(id_), 0) + 1 from {table}',
+            (sequence,)
+        )
+        conn.commit()
+
+
+class HiLoIdAllocator:
+    """Hands out ids from blocks reserved in the sequence table.
+
+    A reserved block is never handed out twice, also across processes and shards.
+    Ids not used before the process exits are skipped (gaps are expected).
+
+    With `table` the first reservation creates the sequence table if it is missing
+    and seeds the sequence above `max(id_)` of that table, so an existing database
+    does not get ids that are already taken.
+    """
+
+    def __init__(self, connection_pool: Any, sequence: str, block_size: int = 100, table: str | None = None):
+        if block_size < 1:
+            raise ValueError('Block size must be positive')
+        self._connection_pool = connection_pool
+        self._sequence = sequence
+        self._block_size = block_size
+        self._table = table
+        self._seeded = table is None
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return self.next_ids(1)[0]
+
+    def next_ids(self, count: int) -> list[int]:
+        ids: list[int] = []
+        with self._lock:
+            while len(ids) < count:
+                if self._next >= self._end:
+                    # Brakujace id w jednym bloku - jedno zapytanie nawet dla duzych paczek
+                    self._next, self._end = self._reserve(max(self._block_size, count - len(ids)))
+                take = min(count - len(ids), self._end - self._next)
+                ids.extend(range(self._next, self._next + take))
+                self._next += take
+        return ids
+
+    def assign(self, items: list[Any]) -> list[Any]:
+        """Set id_ on items that do not have one yet (one reservation for the whole list)."""
+        missing = [item for item in items if item.id_ is None]
+        for item, id_ in zip(missing, self.next_ids(len(missing))):
+            item.id_ = id_
+        return items
+
+    def _reserve(self, size: int) -> tuple[int, int]:
+        if not self._seeded:
+            self._seed()
+        # last_insert_id(expr) trafia do pakietu OK jako insert id - cursor.lastrowid bez dodatkowego selecta
+        with self._connection_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'insert into {SEQUENCE_TABLE} (name, next_id) values (%s, last_insert_id(%s)) '
+                f'on duplicate key update next_id = last_insert_id(next_id + %s)',
+                (self._sequence, 1 + size, size)
+            )
+            end = int(cursor.lastrowid)
+            conn.commit()
+        return end - size, end
+
+    def _seed(self) -> None:
+        assert self._table is not None
+        try:
+            seed_sequence(self._connection_pool, self._sequence, self._table)
+        except Exception as e:
+            if error_code(e) != _NO_SUCH_TABLE:
+                raise
+            # DDL tylko gdy tabeli sekwencji jeszcze nie ma (create table konczy biezaca transakcje)
+            create_sequence_table(self._connection_pool)
+            seed_sequence(self._connection_pool, self._sequence, self._table)
+        self._seeded = True
@@ -0,0 +1,64 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Hashable
+
+
+# --------------------------------------------------
+# IN-MEMORY INDEXES
+# --------------------------------------------------
+class HashIndex:
+    """Exact-match index: column value -> ids of rows with that value."""
+
+    def __init__(self) -> None:
+        self._ids: dict[Hashable, set[int]] = {}
+
+    def add(self, value: Any, id_: int) -> None:
+        self._ids.setdefault(value, set()).add(id_)
+
+    def remove(self, value: Any, id_: int) -> None:
+        ids = self._ids.get(value)
+        if ids is not None:
+            ids.discard(id_)
+            if not ids:
+                del self._ids[value]
+
+    def find(self, value: Any) -> list[int]:
+        return sorted(self._ids.get(value, ()))
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+
+class SortedIndex:
+    """Range index: (value, id) pairs kept sorted, looked up with bisect in O(log n).
+
+    NULL values are not indexed - `between` never matches them.
+    """
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[Any, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, value: Any, id_: int) -> None:
+        if value is not None:
+            insort(self._entries, (value, id_))
+
+    def remove(self, value: Any, id_: int) -> None:
+        if value is None:
+            return
+        i = bisect_left(self._entries, (value, id_))
+        if i < len(self._entries) and self._entries[i] == (value, id_):
+            del self._entries[i]
+
+    def load(self, entries: list[tuple[Any, int]]) -> None:
+        self._entries = sorted(entry for entry in entries if entry[0] is not None)
+
+    def between(self, low: Any, high: Any) -> list[int]:
+        # (low,) jest mniejsze od kazdej pary (low, id), a (high, inf) wieksze od kazdej (high, id)
+        start = bisect_left(self._entries, (low,))
+        end = bisect_right(self._entries, (high, float('inf')))
+        return [id_ for _, id_ in self._entries[start:end]]
+
+    def clear(self) -> None:
+        self._entries.clear()
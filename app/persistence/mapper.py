@@ -0,0 +1,162 @@
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from dataclasses import fields, MISSING
+from types import UnionType
+from typing import Any, Callable, Iterable, Sequence, get_args, get_type_hints
+
+# --------------------------------------------------
+# ROW -> ENTITY
+# --------------------------------------------------
+# Zamiast entity(*row) dla kazdego wiersza generujemy raz funkcje dla pary
+# (encja, kolumny z cursor.description), ktora:
+# - przypisuje wartosci po nazwach kolumn, a nie po kolejnosci pol dataclass
+# - konwersje typu (np. DECIMAL -> int) wybiera raz na kolumne, a nie per wartosc
+# - dla calego wyniku rozpakowuje wiersze w jednym list comprehension
+
+RowMapper = Callable[[Sequence[Any]], Any]
+RowsMapper = Callable[[Iterable[Sequence[Any]]], list[Any]]
+
+_mappers: dict[tuple[Any, tuple[tuple[str, int], ...], bool], tuple[RowMapper, RowsMapper]] = {}
+_lock = threading.Lock()
+
+# Kody typow z mysql.connector.constants.FieldType - bez importu connectora
+DECIMAL_TYPES = {0, 246}
+INTEGER_TYPES = {1, 2, 3, 8, 9, 13}
+FLOAT_TYPES = {4, 5}
+DATE_TYPES = {10, 14}
+DATETIME_TYPES = {7, 12}
+TEXT_TYPES = {15, 247, 248, 249, 250, 251, 252, 253, 254}
+
+
+# int() i float() przyjmuja bytes / bytearray bezposrednio
+def _decode(value: Any) -> str:
+    return str(value.decode())
+
+
+def _raw_decimal(value: Any) -> Decimal:
+    return Decimal(value.decode())
+
+
+def _raw_decimal_int(value: Any) -> int:
+    return int(Decimal(value.decode()))
+
+
+def _raw_datetime(value: Any) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+def _raw_date(value: Any) -> date:
+    return date.fromisoformat(value.decode())
+
+
+def field_types(entity: Any) -> dict[str, tuple[Any, ...]]:
+    hints = get_type_hints(entity)
+    return {name: get_args(hint) if isinstance(hint, UnionType) else (hint,) for name, hint in hints.items()}
+
+
+def _raw_converter(types: tuple[Any, ...], type_code: int) -> Callable[[Any], Any] | None:
+    # Kursor raw=True zwraca surowe bajty z protokolu - konwersja wybrana raz na kolumne
+    if type_code in INTEGER_TYPES:
+        return int
+    if type_code in FLOAT_TYPES:
+        return float
+    if type_code in DECIMAL_TYPES:
+        if int in types:
+            return _raw_decimal_int
+        if float in types:
+            return float
+        return _raw_decimal
+    if type_code in DATETIME_TYPES:
+        return _raw_datetime
+    if type_code in DATE_TYPES:
+        return _raw_date
+    if type_code in TEXT_TYPES:
+        return _decode
+    return None
+
+
+def _converter(types: tuple[Any, ...], type_code: int, raw: bool = False) -> Callable[[Any], Any] | None:
+    if raw:
+        return _raw_converter(types, type_code)
+    if type_code in DECIMAL_TYPES:
+        # sum(...) i kolumny DECIMAL przychodza jako Decimal
+        if int in types:
+            return int
+        if float in types:
+            return float
+    return None
+
+
+def _generate(entity: Any, columns: tuple[tuple[str, int], ...], raw: bool) -> tuple[RowMapper, RowsMapper]:
+    types = field_types(entity)
+    namespace: dict[str, Any] = {'_cls': entity}
+    positions = {name: i for i, (name, _) in enumerate(columns)}
+    entity_fields = [f for f in fields(entity) if f.init]
+    # Pola za ostatnia pobrana kolumna zostawiamy dataclass (wartosci domyslne)
+    last = max((i for i, f in enumerate(entity_fields) if f.name in positions), default=-1)
+
+    arguments = []
+    for f in entity_fields[:last + 1]:
+        if f.name in positions:
+            i = positions[f.name]
+            convert = _converter(types.get(f.name, ()), columns[i][1], raw)
+            if convert is None:
+                arguments.append(f'c{i}')
+            else:
+                namespace[f'_convert_{i}'] = convert
+                arguments.append(f'(None if c{i} is None else _convert_{i}(c{i}))')
+        elif f.default is not MISSING:
+            namespace[f'_default_{f.name}'] = f.default
+            arguments.append(f'_default_{f.name}')
+        elif f.default_factory is not MISSING:
+            namespace[f'_factory_{f.name}'] = f.default_factory
+            arguments.append(f'_factory_{f.name}()')
+        else:
+            raise ValueError(f'Column {f.name} of {entity.__name__} is missing in the result set')
+    missing = [f.name for f in entity_fields[last + 1:] if f.default is MISSING and f.default_factory is MISSING]
+    if missing:
+        raise ValueError(f'Column {missing[0]} of {entity.__name__} is missing in the result set')
+
+    unpack = ', '.join(f'c{i}' for i in range(len(columns))) + ','
+    call = f'_cls({", ".join(arguments)})'
+    source = (
+        'def map_row(row):\n'
+        f'    {unpack} = row\n'
+        f'    return {call}\n'
+        '\n'
+        'def map_rows(rows):\n'
+        f'    return [{call} for {unpack} in rows]\n'
+    )
+    exec(source, namespace)
+    return namespace['map_row'], namespace['map_rows']
+
+
+def _mappers_for(entity: Any, description: Sequence[Sequence[Any]] | None,
+                 raw: bool = False) -> tuple[RowMapper, RowsMapper] | None:
+    columns = tuple((column[0], column[1]) for column in description or ())
+    if not columns:
+        return None
+    key = (entity, columns, raw)
+    mappers = _mappers.get(key)
+    if mappers is None:
+        with _lock:
+            mappers = _mappers.get(key)
+            if mappers is None:
+                mappers = _mappers[key] = _generate(entity, columns, raw)
+    return mappers
+
+
+def row_mapper(entity: Any, description: Sequence[Sequence[Any]] | None, raw: bool = False) -> RowMapper:
+    """Return a cached row -> entity function for the columns described by `cursor.description`.
+
+    With `raw` the values are bytes from a raw cursor and every column is converted.
+    Without a description (e.g. a mocked cursor) rows are mapped positionally.
+    """
+    mappers = _mappers_for(entity, description, raw)
+    return mappers[0] if mappers else lambda row: entity(*row)
+
+
+def map_rows(entity: Any, cursor: Any, rows: Iterable[Sequence[Any]], raw: bool = False) -> list[Any]:
+    mappers = _mappers_for(entity, cursor.description, raw)
+    return mappers[1](rows) if mappers else [entity(*row) for row in rows]
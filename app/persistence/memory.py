@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import operator
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterator, Self, TYPE_CHECKING
+
+from app.persistence.columnar import ColumnarBuilder
+from app.persistence.concurrency import OptimisticLockError, version_column_of
+from app.persistence.indexes import HashIndex, SortedIndex
+from app.persistence.model import Player, Team
+from app.persistence.relationship import LoadStrategy, Relationship, column_names, column_values, relationships_of
+from app.persistence.repository import CrudRepository
+from app.persistence.retention import id_ranges, soft_delete_column_of
+from app.persistence.retry import RetryPolicy
+from app.persistence.summary import Summary
+from app.persistence.timeouts import QueryTimeouts
+
+if TYPE_CHECKING:
+    from app.persistence.team_index import TeamIndex
+
+# --------------------------------------------------------------------------------------
+# Silnik w pamieci z tym samym interfejsem co CrudRepository - do testow jednostkowych
+# i symulacji obciazenia bez bazy. Odwzorowuje schemat z connection.create_tables:
+# auto_increment, klucze obce z on delete cascade, indeksy i transakcje.
+# --------------------------------------------------------------------------------------
+
+
+# Warunki archive_batch rozumiane w pamieci: `kolumna <op> %s` polaczone przez and
+_COMPARISON = re.compile(r'^\s*(\w+)\s*(<=|>=|<|>|=)\s*%s\s*$')
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    '<': operator.lt, '<=': operator.le, '=': operator.eq, '>=': operator.ge, '>': operator.gt,
+}
+
+
+def _integrity_error(msg: str, errno: int) -> Exception:
+    # Ten sam wyjatek co z MySQL, zeby kod serwisow dzialal identycznie
+    from mysql.connector import errors
+    return errors.IntegrityError(msg=msg, errno=errno)
+
+
+class MemoryTable:
+    def __init__(self, database: MemoryDatabase, entity: Any, hash_indexes: tuple[str, ...] = (),
+                 sorted_indexes: tuple[str, ...] = (), foreign_keys: dict[str, MemoryTable] | None = None,
+                 name: str | None = None):
+        self.database = database
+        self.entity = entity
+        self.name = name or CrudRepository._table_name_of(entity)
+        self.columns = column_names(entity)
+        self.rows: dict[int, dict[str, Any]] = {}
+        self.auto_increment = 1
+        self.indexes: dict[str, HashIndex | SortedIndex] = {
+            **{column: HashIndex() for column in hash_indexes},
+            **{column: SortedIndex() for column in sorted_indexes},
+        }
+        # kolumna -> tabela nadrzedna (on delete cascade)
+        self.foreign_keys = foreign_keys or {}
+
+    def insert_row(self, values: dict[str, Any]) -> int:
+        id_ = values.get('id_')
+        if id_ is None:
+            id_ = self.auto_increment
+        elif id_ in self.rows:
+            raise _integrity_error(f"Duplicate entry '{id_}' for key '{self.name}.PRIMARY'", 1062)
+        self._check_foreign_keys(values)
+        # Jak w InnoDB: wycofany insert nie cofa licznika auto_increment
+        self.auto_increment = max(self.auto_increment, id_ + 1)
+        self._put(id_, {**values, 'id_': id_})
+        self.database._log(lambda: self._drop(id_))
+        return id_
+
+    def update_row(self, id_: int, changes: dict[str, Any]) -> None:
+        old = self.rows[id_]
+        self._check_foreign_keys(changes)
+        self._drop(id_)
+        self._put(id_, {**old, **changes})
+
+        def undo() -> None:
+            self._drop(id_)
+            self._put(id_, old)
+        self.database._log(undo)
+
+    def delete_row(self, id_: int) -> bool:
+        row = self.rows.get(id_)
+        if row is None:
+            return False
+        for child, column in self.database._references_to(self):
+            for child_id in child.lookup(column, id_):
+                child.delete_row(child_id)
+        self._drop(id_)
+        self.database._log(lambda: self._put(id_, row))
+        return True
+
+    def lookup(self, column: str, value: Any) -> list[int]:
+        if column == 'id_':
+            return [value] if value in self.rows else []
+        index = self.indexes.get(column)
+        if isinstance(index, HashIndex):
+            return index.find(value)
+        return sorted(id_ for id_, row in self.rows.items() if row[column] == value)
+
+    def between(self, column: str, low: Any, high: Any) -> list[int]:
+        index = self.indexes.get(column)
+        if isinstance(index, SortedIndex):
+            return index.between(low, high)
+        return [id_ for id_, row in self.rows.items() if row[column] is not None and low <= row[column] <= high]
+
+    def _check_foreign_keys(self, values: dict[str, Any]) -> None:
+        for column, parent in self.foreign_keys.items():
+            value = values.get(column)
+            if value is not None and value not in parent.rows:
+                raise _integrity_error(f'Cannot add or update a child row: {self.name}.{column}={value} '
+                                       f'not found in {parent.name}', 1452)
+
+    def _put(self, id_: int, row: dict[str, Any]) -> None:
+        self.rows[id_] = row
+        for column, index in self.indexes.items():
+            index.add(row[column], id_)
+
+    def _drop(self, id_: int) -> None:
+        row = self.rows.pop(id_)
+        for column, index in self.indexes.items():
+            index.remove(row[column], id_)
+
+
+class MemoryDatabase:
+    """Tables kept in dicts. Every change runs in a transaction with an undo log.
+
+    Transactions are serialized by one lock. A nested transaction works like a
+    savepoint: its failure undoes only its own changes.
+    """
+
+    def __init__(self) -> None:
+        self._tables: dict[Any, MemoryTable] = {}
+        # Tabele archiwum (archive_batch) - te same kolumny, bez indeksow i kluczy obcych
+        self._archives: dict[str, MemoryTable] = {}
+        self._lock = threading.RLock()
+        self._undo: list[Callable[[], None]] | None = None
+
+    def create_table(self, entity: Any, hash_indexes: tuple[str, ...] = (), sorted_indexes: tuple[str, ...] = (),
+                     foreign_keys: dict[str, Any] | None = None) -> MemoryTable:
+        references = {column: self.table(parent) for column, parent in (foreign_keys or {}).items()}
+        table = MemoryTable(self, entity, hash_indexes, sorted_indexes, references)
+        self._tables[entity] = table
+        return table
+
+    def table(self, entity: Any) -> MemoryTable:
+        if entity not in self._tables:
+            raise ValueError(f'No table for {entity.__name__}')
+        return self._tables[entity]
+
+    def archive(self, entity: Any, name: str) -> MemoryTable:
+        if name not in self._archives:
+            self._archives[name] = MemoryTable(self, entity, name=name)
+        return self._archives[name]
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            outer = self._undo is None
+            if outer:
+                self._undo = []
+            assert self._undo is not None
+            savepoint = len(self._undo)
+            try:
+                yield
+            except BaseException:
+                self._rollback_to(savepoint)
+                raise
+            finally:
+                if outer:
+                    self._undo = None
+
+    def _log(self, undo: Callable[[], None]) -> None:
+        if self._undo is not None:
+            self._undo.append(undo)
+
+    def _rollback_to(self, savepoint: int) -> None:
+        assert self._undo is not None
+        while len(self._undo) > savepoint:
+            self._undo.pop()()
+
+    def _references_to(self, parent: MemoryTable) -> list[tuple[MemoryTable, str]]:
+        return [
+            (table, column)
+            for table in self._tables.values()
+            for column, referenced in table.foreign_keys.items()
+            if referenced is parent
+        ]
+
+
+def league_database() -> MemoryDatabase:
+    """Empty database with the tables, indexes and foreign keys of connection.create_tables."""
+    database = MemoryDatabase()
+    database.create_table(Team, hash_indexes=('name',), sorted_indexes=('points',))
+    database.create_table(Player, hash_indexes=('team_id',), foreign_keys={'team_id': Team})
+    return database
+
+
+# --------------------------------------------------
+# REPOSITORIES
+# --------------------------------------------------
+class MemoryCrudRepository:
+    """Drop-in replacement for CrudRepository (same methods, arguments and results)."""
+
+    def __init__(self, database: MemoryDatabase, entity: Any):
+        self._database = database
+        self._entity = entity
+        self._entity_type = entity
+        self._table = database.table(entity)
+        self._after_insert: list[Callable[[list[Any]], None]] = []
+        self._after_update: list[Callable[[dict[int, Any]], None]] = []
+        self._after_delete: list[Callable[[list[int] | None], None]] = []
+
+    def insert(self, item: Any) -> int:
+        with self._database.transaction():
+            id_ = self._table.insert_row(self._insert_values(item))
+        CrudRepository._notify(self._after_insert, [item])
+        return id_
+
+    def insert_many(self, items: list[Any]) -> int:
+        CrudRepository._has_preset_ids(items)
+        with self._database.transaction():
+            ids = [self._table.insert_row(self._insert_values(item)) for item in items]
+        CrudRepository._notify(self._after_insert, items)
+        # Jak cursor.lastrowid po insercie wielu wierszy - pierwsze nadane id
+        return ids[0] if ids else 0
+
+    def insert_batch(self, items: list[Any]) -> int:
+        self.insert_many(items)
+        return len(items)
+
+    def update(self, id_: int, item: Any) -> int:
+        CrudRepository._check_updated_values({id_: item})
+        version = version_column_of(self._entity)
+        changes = CrudRepository._updated_values(item)
+        with self._database.transaction():
+            row = self._table.rows.get(id_)
+            if version is not None:
+                expected = getattr(item, version)
+                if row is None or row[version] != expected:
+                    raise OptimisticLockError(f'{self._entity.__name__} {id_} was modified or deleted '
+                                              f'(expected version {expected})')
+                changes[version] = expected + 1
+            if row is not None:
+                self._table.update_row(id_, changes)
+        if version is not None:
+            setattr(item, version, expected + 1)
+        CrudRepository._notify(self._after_update, {id_: item})
+        return id_
+
+    def update_many(self, items: dict[int, Any]) -> int:
+        if not items:
+            return 0
+        if version_column_of(self._entity) is not None:
+            raise ValueError(f'{self._entity.__name__} has a version column, use update')
+        CrudRepository._check_updated_values(items)
+        with self._database.transaction():
+            updated = [id_ for id_ in items if id_ in self._table.rows]
+            for id_ in updated:
+                self._table.update_row(id_, CrudRepository._updated_values(items[id_]))
+        CrudRepository._notify(self._after_update, items)
+        return len(updated)
+
+    def load_data(self, path: str, with_id: bool = False) -> int:
+        # Ten sam format pliku co LOAD DATA w CrudRepository (kolumny jak w insert, \N = NULL)
+        items = CrudRepository._load_file_items(self._entity, path, with_id)
+        self.insert_many(items)
+        return len(items)
+
+    def with_retry(self, policy: RetryPolicy | None) -> Self:
+        # W pamieci nie ma bledow przejsciowych
+        return self
+
+    def with_summary(self, summary: Summary) -> Self:
+        # Tabele podsumowan sa w MySQL - w pamieci agregaty liczy sie wprost z wierszy
+        return self
+
+    def with_timeouts(self, timeouts: QueryTimeouts | None) -> Self:
+        # Zapytania w pamieci nie czekaja na blokady serwera - nie ma czego przerywac
+        return self
+
+    def timeout(self, seconds: float) -> Self:
+        return self
+
+    def raw_reads(self, enabled: bool = True) -> Self:
+        return self
+
+    def after_insert(self, hook: Callable[[list[Any]], None]) -> Self:
+        self._after_insert.append(hook)
+        return self
+
+    def after_update(self, hook: Callable[[dict[int, Any]], None]) -> Self:
+        self._after_update.append(hook)
+        return self
+
+    def after_delete(self, hook: Callable[[list[int] | None], None]) -> Self:
+        self._after_delete.append(hook)
+        return self
+
+    def find_all(self) -> list[Any]:
+        with self._database.transaction():
+            return self._entities(sorted(self._table.rows))
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Any]:
+        with self._database.transaction():
+            ids = sorted(self._table.rows)
+        for start in range(0, len(ids), batch_size):
+            # Lock tylko na czas budowy paczki - nie na czas przetwarzania jej przez wywolujacego
+            with self._database.transaction():
+                batch = self._entities([id_ for id_ in ids[start:start + batch_size] if id_ in self._table.rows])
+            yield from batch
+
+    def find_page(self, after_id: int = 0, limit: int = 100) -> list[Any]:
+        with self._database.transaction():
+            ids = sorted(id_ for id_, row in self._table.rows.items() if id_ > after_id and self._is_live(row))
+            return self._entities(ids[:limit])
+
+    def find_all_columnar(self, batch_size: int = 10000, use_numpy: bool | None = None) -> dict[str, Any]:
+        builder = ColumnarBuilder(self._entity, [(column, None) for column in self._table.columns])
+        with self._database.transaction():
+            rows = self._table.rows
+            builder.add([tuple(rows[id_][column] for column in self._table.columns)
+                         for id_ in sorted(rows) if self._is_live(rows[id_])])
+        return builder.result(use_numpy)
+
+    def find_by_id(self, id_: int) -> Any:
+        # Jak CrudRepository.find_by_id - surowy wiersz (krotka), a nie encja
+        with self._database.transaction():
+            row = self._table.rows.get(id_)
+            if row is None or not self._is_live(row):
+                return None
+            return tuple(row[column] for column in self._table.columns)
+
+    def delete(self, id_: int) -> int:
+        with self._database.transaction():
+            self._delete_row(id_)
+        CrudRepository._notify(self._after_delete, [id_])
+        return id_
+
+    def delete_all(self, batch_size: int = 10000) -> int:
+        deleted = 0
+        with self._database.transaction():
+            ids = sorted(self._table.rows)
+        if ids:
+            for start, end in id_ranges(ids[0], ids[-1], batch_size):
+                with self._database.transaction():
+                    for id_ in [id_ for id_ in self._table.rows if start <= id_ <= end]:
+                        deleted += self._delete_row(id_)
+        CrudRepository._notify(self._after_delete, None)
+        return deleted
+
+    def restore(self, id_: int) -> int:
+        column = self._soft_delete_column()
+        with self._database.transaction():
+            if id_ in self._table.rows:
+                self._table.update_row(id_, {column: None})
+            restored = self._entities([id_]) if id_ in self._table.rows else []
+        # Jak CrudRepository.restore - dla obserwatorow przywrocony wiersz pojawia sie na nowo
+        CrudRepository._notify(self._after_insert, restored)
+        return id_
+
+    def archive_batch(self, condition: str, params: tuple[Any, ...] = (), batch_size: int = 1000,
+                      archive_table: str | None = None) -> int:
+        matches = self._condition(condition, params)
+        with self._database.transaction():
+            selected = sorted(id_ for id_, row in self._table.rows.items() if matches(row))[:batch_size]
+            archive = self._database.archive(self._entity, archive_table or f'{self._table.name}_archive')
+            for id_ in selected:
+                archive.insert_row(dict(self._table.rows[id_]))
+                self._table.delete_row(id_)
+        if selected:
+            CrudRepository._notify(self._after_delete, selected)
+        return len(selected)
+
+    def find_all_with(self, *names: str, strategy: LoadStrategy = LoadStrategy.SELECT_IN) -> list[Any]:
+        # W pamieci obie strategie daja ten sam wynik bez dodatkowych kosztow
+        if strategy is LoadStrategy.JOINED and len(names) != 1:
+            raise ValueError('Joined strategy loads exactly one relationship')
+        with self._database.transaction():
+            items = self.find_all()
+            for name in names:
+                self.load_relationship(items, name)
+            return items
+
+    def load_relationship(self, items: list[Any], name: str) -> list[Any]:
+        relationship = self._relationship(name)
+        target = self._database.table(relationship.target_type(self._entity))
+        with self._database.transaction():
+            for item in items:
+                key = getattr(item, relationship.local_key)
+                ids = target.lookup(relationship.remote_key, key) if key is not None else []
+                related = [
+                    target.entity(**target.rows[id_]) for id_ in ids
+                    if MemoryCrudRepository._is_live_in(target, target.rows[id_])
+                ]
+                setattr(item, name, related if relationship.many else next(iter(related), None))
+        return items
+
+    def _table_name(self) -> str:
+        return self._table.name
+
+    def _insert_values(self, item: Any) -> dict[str, Any]:
+        values = column_values(item)
+        deleted = soft_delete_column_of(self._entity)
+        if deleted is not None:
+            values[deleted] = None
+        return values
+
+    def _delete_row(self, id_: int) -> int:
+        if id_ not in self._table.rows:
+            return 0
+        column = soft_delete_column_of(self._entity)
+        if column is None:
+            return int(self._table.delete_row(id_))
+        if not self._is_live(self._table.rows[id_]):
+            # Juz usuniety - zachowujemy pierwotny czas usuniecia
+            return 0
+        self._table.update_row(id_, {column: datetime.now()})
+        return 1
+
+    def _entities(self, ids: list[int]) -> list[Any]:
+        rows = self._table.rows
+        return [self._entity(**rows[id_]) for id_ in ids if self._is_live(rows[id_])]
+
+    def _is_live(self, row: dict[str, Any]) -> bool:
+        return MemoryCrudRepository._is_live_in(self._table, row)
+
+    @staticmethod
+    def _is_live_in(table: MemoryTable, row: dict[str, Any]) -> bool:
+        column = soft_delete_column_of(table.entity)
+        return column is None or row[column] is None
+
+    def _soft_delete_column(self) -> str:
+        column = soft_delete_column_of(self._entity)
+        if column is None:
+            raise ValueError(f'{self._entity.__name__} has no soft delete column')
+        return column
+
+    def _condition(self, condition: str, params: tuple[Any, ...]) -> Callable[[dict[str, Any]], bool]:
+        parts = re.split(r'\s+and\s+', condition, flags=re.IGNORECASE)
+        comparisons = [_COMPARISON.match(part) for part in parts]
+        tests = [(match.group(1), _OPERATORS[match.group(2)], value)
+                 for match, value in zip(comparisons, params) if match and match.group(1) in self._table.columns]
+        if len(tests) != len(parts) or len(params) != len(parts):
+            raise ValueError(f'Condition not supported by the in-memory engine: {condition}')
+        # Jak w SQL: porownanie z NULL nigdy nie jest prawdziwe
+        return lambda row: all(row[column] is not None and compare(row[column], value) for column, compare, value in tests)
+
+    def _relationship(self, name: str) -> Relationship:
+        relationships = relationships_of(self._entity)
+        if name not in relationships:
+            raise ValueError(f'{self._entity.__name__} has no relationship {name}')
+        return relationships[name]
+
+
+class MemoryTeamRepository(MemoryCrudRepository):
+    def __init__(self, database: MemoryDatabase):
+        super().__init__(database, Team)
+        self._index: TeamIndex | None = None
+
+    def use_index(self, index: TeamIndex | None) -> Self:
+        self._index = index
+        return self
+
+    def find_all_by_points_between(self, points_from: int, points_to: int) -> list[Team]:
+        if self._index is not None:
+            return self._index.find_all_by_points_between(points_from, points_to)
+        with self._database.transaction():
+            return self._entities(sorted(self._table.between('points', points_from, points_to)))
+
+    def find_by_name(self, name: str) -> Team | None:
+        if self._index is not None:
+            return self._index.find_by_name(name)
+        with self._database.transaction():
+            teams = self._entities(self._table.lookup('name', name))
+            return teams[0] if teams else None
+
+
+class MemoryPlayerRepository(MemoryCrudRepository):
+    def __init__(self, database: MemoryDatabase):
+        super().__init__(database, Player)
+
+    def find_all_by_team(self, team_id: int) -> list[Player]:
+        with self._database.transaction():
+            return self._entities(self._table.lookup('team_id', team_id))
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from app.persistence.relationship import relationship
 
 # --------------------------------------------------
 # ENTITIES
@@ -8,6 +9,7 @@ class Team:
     id_: int | None = None
     name: str | None = None
     points: int | None = 0
+    players: list['Player'] | None = relationship('Player', local_key='id_', remote_key='team_id', many=True)
 
     def has_points_between(self, points_from: int, points_to: int) -> bool:
         if self.points is None:
@@ -21,6 +23,7 @@ class Player:
     name: str | None = None
     goals: int | None = 0
     team_id: int | None = None
+    team: Team | None = relationship('Team', local_key='team_id', remote_key='id_')
 
 
 # --------------------------------------------------
@@ -32,4 +35,34 @@ class PlayerWithTeamView:
     player_name: str
     player_goals: int
     team_id: int
-    team_name: str
\ No newline at end of file
+    team_name: str
+
+@dataclass
+class TeamGoalsView:
+    team_id: int
+    team_name: str
+    goals: int
+
+
+@dataclass
+class TeamStats:
+    # Wiersz tabeli podsumowania team_stats (app.persistence.summary)
+    team_id: int
+    players: int = 0
+    goals: int = 0
+
+
+@dataclass
+class TopScorerView:
+    player_id: int
+    player_name: str
+    goals: int
+    team_name: str | None
+
+
+@dataclass
+class TeamRankingView:
+    position: int
+    team_id: int
+    team_name: str
+    points: int
@@ -0,0 +1,62 @@
+import sys
+from dataclasses import dataclass, field, fields, Field
+from enum import Enum
+from typing import Any
+
+
+# --------------------------------------------------
+# RELATIONSHIPS
+# --------------------------------------------------
+class LoadStrategy(Enum):
+    # Jedno dodatkowe zapytanie "where ... in (...)" dla calej strony wynikow
+    SELECT_IN = 'select_in'
+    # Jedno zapytanie z left join, wyniki sa rozdzielane po stronie aplikacji
+    JOINED = 'joined'
+
+
+@dataclass(frozen=True)
+class Relationship:
+    """Declaration of a relationship between two entities.
+
+    For a many-to-one relationship (Player.team) `local_key` is the foreign key
+    column on the owning entity and `remote_key` is the primary key of the target.
+    For a one-to-many relationship (Team.players) `local_key` is the primary key
+    of the owning entity and `remote_key` is the foreign key column on the target.
+    """
+    target: str
+    local_key: str
+    remote_key: str
+    many: bool = False
+
+    def target_type(self, owner: type) -> Any:
+        return getattr(sys.modules[owner.__module__], self.target)
+
+
+def relationship(target: str, local_key: str, remote_key: str = 'id_', many: bool = False) -> Any:
+    """Declare a relationship attribute on a dataclass entity.
+
+    The attribute is not a column: it is skipped in inserts and updates and stays
+    None until it is loaded by the repository.
+    """
+    return field(
+        default=None,
+        repr=False,
+        compare=False,
+        metadata={'relationship': Relationship(target, local_key, remote_key, many)}
+    )
+
+
+def is_column(f: Field[Any]) -> bool:
+    return 'relationship' not in f.metadata
+
+
+def column_names(entity: Any) -> list[str]:
+    return [f.name for f in fields(entity) if is_column(f)]
+
+
+def column_values(item: Any) -> dict[str, Any]:
+    return {f.name: getattr(item, f.name) for f in fields(item) if is_column(f)}
+
+
+def relationships_of(entity: Any) -> dict[str, Relationship]:
+    return {f.name: f.metadata['relationship'] for f in fields(entity) if not is_column(f)}
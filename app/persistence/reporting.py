@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterator, TYPE_CHECKING
+
+from app.persistence.cache import TtlCache, copy_rows
+from app.persistence.columnar import fetch_columnar
+from app.persistence.mapper import map_rows
+from app.persistence.model import TeamGoalsView, TopScorerView, TeamRankingView
+
+if TYPE_CHECKING:
+    from app.persistence.connection import ConnectionPool
+
+
+# --------------------------------------------------------------------------------------
+# Raporty liczone po stronie bazy (group by / order by ... limit) - do aplikacji trafiaja
+# tylko gotowe, male wiersze wynikowe
+# --------------------------------------------------------------------------------------
+@dataclass
+class ReportingRepository:
+    connection_pool: ConnectionPool
+    # Czas zycia wynikow w sekundach, None - bez cache
+    cache_ttl: float | None = None
+    # Sumy goli z tabeli team_stats (app.persistence.summary) zamiast sum() po wszystkich zawodnikach
+    use_team_stats: bool = False
+    # Najwyzej tyle roznych zapytan (z parametrami) w cache
+    cache_max_entries: int = 1024
+    _cache: TtlCache | None = field(init=False, default=None, repr=False)
+
+    GOALS_PER_TEAM_SQL = (
+        'select t.id_ as team_id, t.name as team_name, coalesce(sum(p.goals), 0) as goals from teams t '
+        'left join players p on p.team_id = t.id_ '
+        'group by t.id_, t.name order by 3 desc, t.id_'
+    )
+    GOALS_PER_TEAM_FROM_STATS_SQL = (
+        'select t.id_ as team_id, t.name as team_name, coalesce(s.goals, 0) as goals from teams t '
+        'left join team_stats s on s.team_id = t.id_ '
+        'order by 3 desc, t.id_'
+    )
+    TOP_SCORERS_SQL = (
+        'select p.id_ as player_id, p.name as player_name, p.goals, t.name as team_name from players p '
+        'left join teams t on t.id_ = p.team_id '
+        'order by p.goals desc, p.id_ limit %s'
+    )
+    # Ranking wszystkich druzyn w tabeli pochodnej - where obok rank() zawezalby ranking do zakresu punktow
+    TEAMS_RANKED_BY_POINTS_SQL = (
+        'select r.position, r.team_id, r.team_name, r.points from ('
+        'select rank() over (order by t.points desc) as position, t.id_ as team_id, t.name as team_name, t.points '
+        'from teams t'
+        ') r '
+        'where r.points between %s and %s order by r.points desc, r.team_id'
+    )
+
+    def __post_init__(self) -> None:
+        if self.cache_ttl is not None:
+            self._cache = TtlCache(self.cache_ttl, max_entries=self.cache_max_entries)
+
+    def goals_per_team(self) -> list[TeamGoalsView]:
+        return self._query(self._goals_per_team_sql(), (), TeamGoalsView)
+
+    def iter_goals_per_team(self, batch_size: int = 1000) -> Iterator[TeamGoalsView]:
+        return self._stream(self._goals_per_team_sql(), (), TeamGoalsView, batch_size)
+
+    def top_scorers(self, n: int) -> list[TopScorerView]:
+        return self._query(self.TOP_SCORERS_SQL, (n,), TopScorerView)
+
+    def teams_ranked_by_points(self, points_from: int, points_to: int) -> list[TeamRankingView]:
+        return self._query(self.TEAMS_RANKED_BY_POINTS_SQL, (points_from, points_to), TeamRankingView)
+
+    def iter_teams_ranked_by_points(self, points_from: int, points_to: int,
+                                    batch_size: int = 1000) -> Iterator[TeamRankingView]:
+        return self._stream(self.TEAMS_RANKED_BY_POINTS_SQL, (points_from, points_to), TeamRankingView, batch_size)
+
+    def goals_per_team_columnar(self, use_numpy: bool | None = None) -> dict[str, Any]:
+        return self._columnar(self._goals_per_team_sql(), (), TeamGoalsView, use_numpy)
+
+    def top_scorers_columnar(self, n: int, use_numpy: bool | None = None) -> dict[str, Any]:
+        return self._columnar(self.TOP_SCORERS_SQL, (n,), TopScorerView, use_numpy)
+
+    def teams_ranked_by_points_columnar(self, points_from: int, points_to: int,
+                                        use_numpy: bool | None = None) -> dict[str, Any]:
+        return self._columnar(self.TEAMS_RANKED_BY_POINTS_SQL, (points_from, points_to), TeamRankingView, use_numpy)
+
+    def _goals_per_team_sql(self) -> str:
+        return self.GOALS_PER_TEAM_FROM_STATS_SQL if self.use_team_stats else self.GOALS_PER_TEAM_SQL
+
+    def _query(self, sql: str, params: tuple[Any, ...], view: Any) -> list[Any]:
+        def load() -> list[Any]:
+            with self.connection_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                return map_rows(view, cursor, cursor.fetchall())
+
+        if self._cache is None:
+            return load()
+        return copy_rows(self._cache.get_or_load((sql, params), load))
+
+    def _stream(self, sql: str, params: tuple[Any, ...], view: Any, batch_size: int) -> Iterator[Any]:
+        with self.connection_pool.get_connection() as conn:
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(sql, params)
+            while rows := cursor.fetchmany(batch_size):
+                yield from map_rows(view, cursor, rows)
+
+    def _columnar(self, sql: str, params: tuple[Any, ...], view: Any, use_numpy: bool | None,
+                  batch_size: int = 10000) -> dict[str, Any]:
+        with self.connection_pool.get_connection() as conn:
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(sql, params)
+            return fetch_columnar(view, cursor, batch_size, use_numpy)
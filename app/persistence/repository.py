@@ -1,120 +1,753 @@
-from mysql.connector import Error
-from typing import Any, Self
-from mysql.connector.pooling import MySQLConnectionPool
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator, Protocol, Self, TYPE_CHECKING, cast, get_args, get_type_hints
+from functools import cache
+from contextlib import contextmanager
+import copy
+import csv
 from datetime import date, datetime
 from app.persistence.model import Team, Player, PlayerWithTeamView
+from app.persistence.cache import QueryCache, copy_rows
+from app.persistence.concurrency import OptimisticLockError, version_column_of
+from app.persistence.columnar import fetch_columnar
+from app.persistence.mapper import map_rows, row_mapper
+from app.persistence.retry import RetryPolicy, retryable
+from app.persistence.timeouts import QueryTimeouts
+from app.persistence.summary import Summary
+from app.persistence.retention import id_ranges, live_condition, soft_delete_column_of
+from app.persistence.relationship import LoadStrategy, Relationship, column_names, column_values, relationships_of
 from dataclasses import dataclass
-import inflection
 import logging
 from abc import ABC
 
+if TYPE_CHECKING:
+    from app.persistence.connection import ConnectionPool
+    from app.persistence.ids import HiLoIdAllocator
+    from app.persistence.team_index import TeamIndex
+
 # >> pipenv install inflection
 
 logging.basicConfig(level=logging.INFO)
 
 
+@dataclass(frozen=True)
+class ReadQuery:
+    """SQL of a finder and the conversion of its rows, so it can also run inside a QueryBatch."""
+    sql: str
+    params: tuple[Any, ...]
+    # (cursor, rows, raw) -> wynik findera
+    convert: Callable[[Any, list[Any], bool], Any]
+    # Finder potrzebuje tylko pierwszego wiersza (fetchone)
+    one: bool = False
+
+
+class RepositoryProtocol(Protocol):
+    """Interface shared by CrudRepository (MySQL) and MemoryCrudRepository - type services against it."""
+
+    def insert(self, item: Any) -> int: ...
+    def insert_many(self, items: list[Any]) -> int: ...
+    def insert_batch(self, items: list[Any]) -> int: ...
+    def load_data(self, path: str, with_id: bool = False) -> int: ...
+    def update(self, id_: int, item: Any) -> int: ...
+    def update_many(self, items: dict[int, Any]) -> int: ...
+    def after_insert(self, hook: Callable[[list[Any]], None]) -> Self: ...
+    def after_update(self, hook: Callable[[dict[int, Any]], None]) -> Self: ...
+    def after_delete(self, hook: Callable[[list[int] | None], None]) -> Self: ...
+    def with_retry(self, policy: RetryPolicy | None) -> Self: ...
+    def with_summary(self, summary: Summary) -> Self: ...
+    def with_timeouts(self, timeouts: QueryTimeouts | None) -> Self: ...
+    def timeout(self, seconds: float) -> Self: ...
+    def raw_reads(self, enabled: bool = True) -> Self: ...
+    def find_all(self) -> list[Any]: ...
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Any]: ...
+    def find_page(self, after_id: int = 0, limit: int = 100) -> list[Any]: ...
+    def find_all_columnar(self, batch_size: int = 10000, use_numpy: bool | None = None) -> dict[str, Any]: ...
+    def find_by_id(self, id_: int) -> Any: ...
+    def delete(self, id_: int) -> int: ...
+    def delete_all(self, batch_size: int = 10000) -> int: ...
+    def restore(self, id_: int) -> int: ...
+    def archive_batch(self, condition: str, params: tuple[Any, ...] = (), batch_size: int = 1000,
+                      archive_table: str | None = None) -> int: ...
+    def find_all_with(self, *names: str, strategy: LoadStrategy = LoadStrategy.SELECT_IN) -> list[Any]: ...
+    def load_relationship(self, items: list[Any], name: str) -> list[Any]: ...
+
+
+class TeamRepositoryProtocol(RepositoryProtocol, Protocol):
+    def use_index(self, index: TeamIndex | None) -> Self: ...
+    def find_all_by_points_between(self, points_from: int, points_to: int) -> list[Team]: ...
+    def find_by_name(self, name: str) -> Team | None: ...
+
+
+class PlayerRepositoryProtocol(RepositoryProtocol, Protocol):
+    def find_all_by_team(self, team_id: int) -> list[Player]: ...
+
+
+@cache
+def _tableize(class_name: str) -> str:
+    # inflection importujemy dopiero przy pierwszym uzyciu (szybszy start aplikacji i testow)
+    import inflection
+    return str(inflection.tableize(class_name))
+
+
 class CrudRepository(ABC):
 
-    def __init__(self, connection_pool: MySQLConnectionPool, entity: Any):
+    def __init__(self, connection_pool: ConnectionPool, entity: Any, query_cache: QueryCache | None = None):
         self._connection_pool = connection_pool
         self._entity = entity
         self._entity_type = type(entity())
+        self._query_cache = query_cache
+        self._raw_reads = False
+        self._retry_policy: RetryPolicy | None = None
+        self._timeouts: QueryTimeouts | None = None
+        self._summaries: list[Summary] = []
+        self._id_allocator: HiLoIdAllocator | None = None
+        self._after_insert: list[Callable[[list[Any]], None]] = []
+        self._after_update: list[Callable[[dict[int, Any]], None]] = []
+        self._after_delete: list[Callable[[list[int] | None], None]] = []
         # self._create_tables()
 
+    @retryable(idempotent=False)
     def insert(self, item: Any) -> int:
-        with self._connection_pool.get_connection() as conn:
+        self._assign_ids([item])
+        # Id nadane po stronie klienta (np. app.persistence.ids) zapisujemy zamiast auto_increment
+        with_id = item.id_ is not None
+        with self._connection(write=True) as conn:
             cursor = conn.cursor()
-            sql = (f'insert into {self._table_name()} ({self._column_names_for_insert()}) '
-                   f'values ({self._column_values_for_insert(item)})')
+            sql = (f'insert into {self._table_name()} ({self._column_names_for_insert(with_id)}) '
+                   f'values ({self._column_values_for_insert(item, with_id)})')
             cursor.execute(sql)
+            # lastrowid przed zapisem podsumowan - ich insert nadpisuje go w kursorze
+            id_ = item.id_ if with_id else cursor.lastrowid
+            for summary in self._summaries:
+                summary.inserted(cursor, [item])
             conn.commit()
-            return cursor.lastrowid
+            self._invalidate()
+            self._notify(self._after_insert, [item])
+            return id_
 
     # Albo przejdz na typ zwracany None albo mozesz zwracac list[int] id
     # elementow
+    @retryable(idempotent=False)
     def insert_many(self, items: list[Any]) -> int:
-        with self._connection_pool.get_connection() as conn:
+        self._assign_ids(items)
+        with self._connection(write=True) as conn:
             cursor = conn.cursor()
-            values = ", ".join([f'({CrudRepository._column_values_for_insert(item)})' for item in items])
-            sql = (f'insert into {self._table_name()} ({self._column_names_for_insert()}) '
-                   f'values {values}')
+            last_id = self._insert_rows(cursor, items)
+            conn.commit()
+            self._invalidate()
+            self._notify(self._after_insert, items)
+            return last_id
+
+    @retryable(idempotent=False)
+    def insert_batch(self, items: list[Any]) -> int:
+        """Like insert_many, but values go as query parameters (executemany) - for untrusted data such as imports.
+
+        Quotes are never interpreted as SQL and None is written as NULL. Returns the number of inserted rows.
+        """
+        self._assign_ids(items)
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            self._insert_rows_params(cursor, items)
+            inserted = int(cursor.rowcount)
+            conn.commit()
+            self._invalidate()
+            self._notify(self._after_insert, items)
+            return inserted
+
+    @retryable(idempotent=False)
+    def load_data(self, path: str, with_id: bool = False) -> int:
+        """Bulk load a CSV file (columns as in insert, NULL written as \\N) with LOAD DATA LOCAL INFILE.
+
+        With `with_id` the first column is id_ (\\N lets auto_increment assign it).
+        Requires `allow_local_infile` on the pool and `local_infile=1` on the server.
+        The file is also parsed here: summaries and insert hooks see the loaded rows, and a load
+        that skipped rows (LOCAL turns errors into warnings) is rolled back with ValueError.
+        """
+        items = CrudRepository._load_file_items(self._entity, path, with_id)
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            sql = (f"load data local infile '{path}' into table {self._table_name()} "
+                   f"fields terminated by ',' optionally enclosed by '\"' lines terminated by '\\n' "
+                   f"({self._column_names_for_insert(with_id)})")
             cursor.execute(sql)
+            loaded = int(cursor.rowcount)
+            if loaded != len(items):
+                # LOCAL pomija bledne wiersze z ostrzezeniem - wywolujacy liczylby wiersze, ktorych nie ma
+                conn.rollback()
+                raise ValueError(f'LOAD DATA loaded {loaded} of {len(items)} rows from {path}, rolled back')
+            for summary in self._summaries:
+                summary.inserted(cursor, items)
             conn.commit()
-            return cursor.lastrowid
+            self._invalidate()
+            self._notify(self._after_insert, items)
+            return loaded
 
+    @retryable()
     def update(self, id_: int, item: Any) -> int:
-        with self._connection_pool.get_connection() as conn:
+        CrudRepository._check_updated_values({id_: item})
+        version = version_column_of(self._entity)
+        with self._connection(write=True) as conn:
             cursor = conn.cursor()
             sql = f'update {self._table_name()} set {CrudRepository._column_names_and_values_for_update(item)} where id_={id_}'
+            if version is not None:
+                # Optimistic locking: zapis tylko jezeli nikt nie zmienil wiersza od odczytu
+                expected = getattr(item, version)
+                sql = (f'update {self._table_name()} set {CrudRepository._column_names_and_values_for_update(item)}, '
+                       f'{version}={version}+1 where id_={id_} and {version}={expected}')
             logging.info('***')
             logging.info(sql)
             logging.info('***')
+            captured = self._capture(cursor, f'id_={int(id_)}')
             cursor.execute(sql)
+            if version is not None and cursor.rowcount == 0:
+                conn.rollback()
+                raise OptimisticLockError(f'{self._entity_type.__name__} {id_} was modified or deleted (expected version {expected})')
+            self._summarize(cursor, f'id_={int(id_)}', captured)
             conn.commit()
+            self._invalidate()
+            if version is not None:
+                setattr(item, version, expected + 1)
+            self._notify(self._after_update, {id_: item})
             return id_
 
-    def find_all(self) -> list[Any]:
-        with self._connection_pool.get_connection() as conn:
+    @retryable()
+    def update_many(self, items: dict[int, Any]) -> int:
+        """Update many rows (id_ -> item) with one statement and one commit.
+
+        As in update, None values are left unchanged. Not available for entities
+        with a version column - each row needs its own version check.
+        """
+        if not items:
+            return 0
+        if version_column_of(self._entity) is not None:
+            raise ValueError(f'{self._entity_type.__name__} has a version column, use update')
+        CrudRepository._check_updated_values(items)
+        with self._connection(write=True) as conn:
             cursor = conn.cursor()
-            sql = f'select * from {self._table_name()}'
+            where = f'id_ in ({", ".join(str(int(id_)) for id_ in items)})'
+            sql = f'update {self._table_name()} set {CrudRepository._case_assignments(items)} where {where}'
+            captured = self._capture(cursor, where)
             cursor.execute(sql)
-            return [self._entity(*row) for row in cursor.fetchall()]
+            self._summarize(cursor, where, captured)
+            conn.commit()
+            self._invalidate()
+            self._notify(self._after_update, items)
+            return int(cursor.rowcount)
 
-    def find_by_id(self, id_: int) -> Any:
+    def after_insert(self, hook: Callable[[list[Any]], None]) -> Self:
+        """Call `hook(items)` after every committed insert / insert_many."""
+        self._after_insert.append(hook)
+        return self
+
+    def after_update(self, hook: Callable[[dict[int, Any]], None]) -> Self:
+        """Call `hook({id_: item})` after every committed update / update_many."""
+        self._after_update.append(hook)
+        return self
+
+    def after_delete(self, hook: Callable[[list[int] | None], None]) -> Self:
+        """Call `hook(ids)` after every committed delete / archive_batch, `hook(None)` after delete_all."""
+        self._after_delete.append(hook)
+        return self
+
+    def with_retry(self, policy: RetryPolicy | None) -> Self:
+        """Retry transient MySQL errors (deadlock, lock wait timeout, lost connection) with backoff.
+
+        Inserts are repeated only after errors that rolled the transaction back.
+        """
+        self._retry_policy = policy
+        return self
+
+    def with_id_allocator(self, allocator: HiLoIdAllocator | None) -> Self:
+        """Give new rows ids from a hi/lo allocator (app.persistence.ids) instead of auto_increment.
+
+        Required on every repository writing a table that also gets ids from the
+        allocator (GraphWriter, ShardedPlayerRepository) - an auto_increment insert
+        could take an id from a block already reserved by another writer.
+        """
+        self._id_allocator = allocator
+        return self
+
+    def on_pool(self, connection_pool: ConnectionPool) -> Self:
+        """Copy of this repository writing through another pool (e.g. a PinnedConnectionPool).
+
+        Summaries, query cache, retry policy, timeouts, id allocator and hooks are shared with the original.
+        """
+        repository = copy.copy(self)
+        repository._connection_pool = connection_pool
+        return repository
+
+    def with_summary(self, summary: Summary) -> Self:
+        """Maintain a summary table (e.g. TeamStatsSummary) in the same transaction as every write.
+
+        Costs an extra locking select before and after each update / delete.
+        """
+        self._summaries.append(summary)
+        return self
+
+    def with_timeouts(self, timeouts: QueryTimeouts | None) -> Self:
+        """Limit query time: MAX_EXECUTION_TIME for selects, innodb_lock_wait_timeout for writes.
+
+        With a canceller, a query still running after the deadline is stopped with KILL QUERY.
+        Either way the caller gets QueryTimeoutError and the connection goes back to the pool.
+        """
+        self._timeouts = timeouts
+        return self
+
+    def timeout(self, seconds: float) -> Self:
+        """Copy of the repository limited to `seconds` per query, e.g. `team_repository.timeout(0.5).find_all()`."""
+        canceller = self._timeouts.canceller if self._timeouts is not None else None
+        return copy.copy(self).with_timeouts(QueryTimeouts.of(seconds, canceller))
+
+    def raw_reads(self, enabled: bool = True) -> Self:
+        """Use raw cursors in find_all / iter_all and convert values with generated mappers.
+
+        Skips the connector's per-value type conversion, which dominates read CPU
+        with the pure Python driver.
+        """
+        self._raw_reads = enabled
+        return self
+
+    @retryable()
+    def find_all(self) -> list[Any]:
+        rows: list[Any] = self._read(self._find_all_query(), raw=True)
+        return rows
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Any]:
+        # Kursor niebuforowany (server-side): w pamieci jest co najwyzej batch_size wierszy.
+        # Bez limitow czasu - iteracja trwa tyle, ile przetwarzanie po stronie wywolujacego
         with self._connection_pool.get_connection() as conn:
-            cursor = conn.cursor()
-            sql = f'select * from {self._table_name()} where id_={id_}'
+            cursor = self._read_cursor(conn, buffered=False)
+            sql = f'select * from {self._table_name()}{self._live_filter()} order by id_'
             cursor.execute(sql)
-            return cursor.fetchone()
+            while rows := cursor.fetchmany(batch_size):
+                yield from map_rows(self._entity, cursor, rows, self._raw_reads)
 
+    @retryable()
+    def find_page(self, after_id: int = 0, limit: int = 100) -> list[Any]:
+        """Keyset page: up to `limit` rows with id_ greater than `after_id`, ordered by id_."""
+        rows: list[Any] = self._read(self._find_page_query(after_id, limit), raw=True)
+        return rows
+
+    @retryable()
+    def find_all_columnar(self, batch_size: int = 10000, use_numpy: bool | None = None) -> dict[str, Any]:
+        """Read the whole table into one container per column (NumPy arrays or array.array)."""
+        with self._connection() as conn:
+            cursor = conn.cursor(buffered=False)
+            sql = self._sql(f'select * from {self._table_name()}{self._live_filter()} order by id_')
+            cursor.execute(sql)
+            return fetch_columnar(self._entity, cursor, batch_size, use_numpy)
+
+    @retryable()
+    def find_by_id(self, id_: int) -> Any:
+        return self._read(self._find_by_id_query(id_))
+
+    @retryable()
     def delete(self, id_: int) -> int:
-        with self._connection_pool.get_connection() as conn:
+        with self._connection(write=True) as conn:
             cursor = conn.cursor()
-            sql = f'delete from {self._table_name()} where id_={id_}'
+            sql = self._delete_sql(f'id_={id_}')
+            captured = self._capture(cursor, f'id_={int(id_)}')
             cursor.execute(sql)
+            self._summarize(cursor, f'id_={int(id_)}', captured)
             conn.commit()
+            self._invalidate()
+            self._notify(self._after_delete, [id_])
             # TODO Czy mozna przechwycic id usunietego bytu
             return id_
 
-    def delete_all(self) -> None:
-        with self._connection_pool.get_connection() as conn:
+    @retryable()
+    def delete_all(self, batch_size: int = 10000) -> int:
+        """Delete (or soft delete) every row in id ranges of `batch_size`, one short transaction per range.
+
+        A single `delete` of a large table locks all of its rows and fills the undo log
+        until commit. Returns the number of affected rows.
+        """
+        deleted = 0
+        with self._connection(write=True) as conn:
             cursor = conn.cursor()
-            sql = f'delete from {self._table_name()} where id_>0'
+            cursor.execute(f'select min(id_), max(id_) from {self._table_name()}')
+            min_id, max_id = cursor.fetchone() or (None, None)
+            if min_id is not None and max_id is not None:
+                # Zakres ustalony na starcie - wiersze dodane w trakcie nie sa usuwane
+                for start, end in id_ranges(int(min_id), int(max_id), batch_size):
+                    where = f'id_ between {start} and {end}'
+                    captured = self._capture(cursor, where)
+                    cursor.execute(self._delete_sql(where))
+                    deleted += int(cursor.rowcount)
+                    self._summarize(cursor, where, captured)
+                    conn.commit()
+        self._invalidate()
+        self._notify(self._after_delete, None)
+        return deleted
+
+    @retryable()
+    def restore(self, id_: int) -> int:
+        """Bring back a soft deleted row."""
+        column = self._soft_delete_column()
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            sql = f'update {self._table_name()} set {column}=null where id_={id_}'
+            captured = self._capture(cursor, f'id_={int(id_)}')
             cursor.execute(sql)
+            self._summarize(cursor, f'id_={int(id_)}', captured)
+            restored = self._restored(cursor, f'id_={int(id_)}') if self._after_insert else []
             conn.commit()
+            self._invalidate()
+            # Dla obserwatorow przywrocony wiersz pojawia sie na nowo
+            self._notify(self._after_insert, restored)
+            return id_
+
+    @retryable()
+    def archive_batch(self, condition: str, params: tuple[Any, ...] = (), batch_size: int = 1000,
+                      archive_table: str | None = None) -> int:
+        """Move up to `batch_size` rows matching `condition` to the archive table in one transaction.
+
+        The archive table has the same columns (see connection.create_archive_table).
+        Returns the number of moved rows - 0 means there is nothing left to archive.
+        """
+        table = self._table_name()
+        archive_table = archive_table or f'{table}_archive'
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            try:
+                conn.start_transaction()
+                sql = f'select id_ from {table} where {condition} order by id_ limit {int(batch_size)} for update'
+                cursor.execute(sql, params)
+                selected = [int(row[0]) for row in cursor.fetchall()]
+                if not selected:
+                    conn.rollback()
+                    return 0
+                ids = ', '.join(map(str, selected))
+                captured = self._capture(cursor, f'id_ in ({ids})')
+                cursor.execute(f'insert into {archive_table} select * from {table} where id_ in ({ids})')
+                cursor.execute(f'delete from {table} where id_ in ({ids})')
+                moved = int(cursor.rowcount)
+                self._summarize(cursor, f'id_ in ({ids})', captured)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._invalidate()
+        self._notify(self._after_delete, selected)
+        return moved
+
+    # --------------------------------------------------------------------
+    # Ladowanie relacji (Player.team, Team.players) bez zapytan per wiersz
+    # --------------------------------------------------------------------
+
+    def find_all_with(self, *names: str, strategy: LoadStrategy = LoadStrategy.SELECT_IN) -> list[Any]:
+        if strategy is LoadStrategy.JOINED:
+            if len(names) != 1:
+                raise ValueError('Joined strategy loads exactly one relationship')
+            return self._find_all_joined(names[0])
+        items = self.find_all()
+        for name in names:
+            self.load_relationship(items, name)
+        return items
+
+    @retryable()
+    def load_relationship(self, items: list[Any], name: str) -> list[Any]:
+        """Load relationship `name` for a page of entities with one `in (...)` query."""
+        relationship = self._relationship(name)
+        target = relationship.target_type(self._entity)
+        keys = sorted({getattr(item, relationship.local_key) for item in items} - {None})
+        related: dict[Any, Any] = {}
+        if keys:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                sql = self._sql(f'select * from {CrudRepository._table_name_of(target)} '
+                                f'where {relationship.remote_key} in ({", ".join(str(int(key)) for key in keys)})'
+                                f'{self._live_filter("and", target)}')
+                cursor.execute(sql)
+                for entity in map_rows(target, cursor, cursor.fetchall()):
+                    key = getattr(entity, relationship.remote_key)
+                    if relationship.many:
+                        related.setdefault(key, []).append(entity)
+                    else:
+                        related[key] = entity
+        for item in items:
+            key = getattr(item, relationship.local_key)
+            setattr(item, name, related.get(key, []) if relationship.many else related.get(key))
+        return items
+
+    @retryable()
+    def _find_all_joined(self, name: str) -> list[Any]:
+        relationship = self._relationship(name)
+        target = relationship.target_type(self._entity)
+        own_columns = column_names(self._entity)
+        target_columns = column_names(target)
+        columns = ', '.join([f'o.{column}' for column in own_columns] + [f't.{column}' for column in target_columns])
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            sql = self._sql(f'select {columns} from {self._table_name()} o '
+                            f'left join {CrudRepository._table_name_of(target)} t '
+                            f'on o.{relationship.local_key} = t.{relationship.remote_key}{self._live_filter("and", target, "t")}'
+                            f'{self._live_filter("where", alias="o")} order by o.id_')
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+
+        items: dict[Any, Any] = {}
+        id_index = own_columns.index('id_')
+        for row in rows:
+            own_row, target_row = row[:len(own_columns)], row[len(own_columns):]
+            item = items.get(own_row[id_index])
+            if item is None:
+                item = self._entity(*own_row)
+                setattr(item, name, [] if relationship.many else None)
+                items[own_row[id_index]] = item
+            if all(value is None for value in target_row):
+                continue
+            if relationship.many:
+                getattr(item, name).append(target(*target_row))
+            else:
+                setattr(item, name, target(*target_row))
+        return list(items.values())
+
+    def _relationship(self, name: str) -> Relationship:
+        relationships = relationships_of(self._entity)
+        if name not in relationships:
+            raise ValueError(f'{self._entity_type.__name__} has no relationship {name}')
+        return relationships[name]
+
+    # --------------------------------------------------------------------
+    # Soft delete
+    # --------------------------------------------------------------------
+
+    def _soft_delete_column(self) -> str:
+        column = soft_delete_column_of(self._entity)
+        if column is None:
+            raise ValueError(f'{self._entity_type.__name__} has no soft delete column')
+        return column
+
+    def _delete_sql(self, where: str) -> str:
+        # Przy soft delete wiersz zostaje w tabeli - oznaczamy go i pomijamy w finderach
+        column = soft_delete_column_of(self._entity)
+        if column is None:
+            return f'delete from {self._table_name()} where {where}'
+        # Tylko zywe wiersze - ponowne oznaczenie przesuneloby je poza archive_deleted(older_than)
+        return f'update {self._table_name()} set {column}=now() where {where}{self._live_filter("and")}'
+
+    def _live_filter(self, keyword: str = 'where', entity: Any = None, alias: str = '') -> str:
+        condition = live_condition(entity or self._entity, alias)
+        return f' {keyword} {condition}' if condition else ''
+
+    def _insert_rows(self, cursor: Any, items: list[Any]) -> int:
+        # Sam insert bez commita - np. kilka tabel w jednej transakcji (app.persistence.graph)
+        with_id = CrudRepository._has_preset_ids(items)
+        values = ", ".join([f'({CrudRepository._column_values_for_insert(item, with_id)})' for item in items])
+        sql = (f'insert into {self._table_name()} ({self._column_names_for_insert(with_id)}) '
+               f'values {values}')
+        cursor.execute(sql)
+        last_id: int = cursor.lastrowid
+        for summary in self._summaries:
+            summary.inserted(cursor, items)
+        return last_id
+
+    def _capture(self, cursor: Any, where: str) -> list[dict[Any, Any]]:
+        return [summary.capture(cursor, where) for summary in self._summaries]
+
+    def _summarize(self, cursor: Any, where: str, captured: list[dict[Any, Any]]) -> None:
+        # Po zapisie te same wiersze jeszcze raz - usuniete (takze soft delete) juz nie pasuja
+        for summary, before in zip(self._summaries, captured):
+            summary.apply(cursor, before, summary.capture(cursor, where))
+
+    def _insert_rows_params(self, cursor: Any, items: list[Any]) -> None:
+        with_id = CrudRepository._has_preset_ids(items)
+        columns = self._insert_columns(with_id)
+        sql = (f'insert into {self._table_name()} ({", ".join(columns)}) '
+               f'values ({", ".join(["%s"] * len(columns))})')
+        # Connector laczy executemany dla insert ... values w jeden wielowierszowy insert
+        cursor.executemany(sql, [tuple(column_values(item)[column] for column in columns) for item in items])
+        for summary in self._summaries:
+            summary.inserted(cursor, items)
+
+    def _restored(self, cursor: Any, where: str) -> list[Any]:
+        cursor.execute(f'select * from {self._table_name()} where {where}')
+        return map_rows(self._entity, cursor, cursor.fetchall())
+
+    def _assign_ids(self, items: list[Any]) -> None:
+        if self._id_allocator is not None:
+            self._id_allocator.assign(items)
+
+    @staticmethod
+    def _load_file_items(entity: Any, path: str, with_id: bool = False) -> list[Any]:
+        # Te same wiersze, ktore wczyta LOAD DATA (kolumny jak w insert, \N = NULL)
+        columns = CrudRepository._insert_columns_of(entity, with_id)
+        hints = get_type_hints(entity)
+        with open(path, newline='', encoding='utf-8') as f:
+            return [
+                entity(**{column: CrudRepository._load_value(value, hints[column]) for column, value in zip(columns, row)})
+                for row in csv.reader(f)
+            ]
+
+    @staticmethod
+    def _load_value(value: str, hint: Any) -> Any:
+        if value == '\\N':
+            return None
+        return int(value) if int in (get_args(hint) or (hint,)) else value
+
+    @staticmethod
+    def _notify(hooks: list[Callable[[Any], None]], changes: Any) -> None:
+        # Zapis jest juz zatwierdzony - blad hooka nie moze go "cofnac" w oczach wywolujacego
+        for hook in hooks:
+            try:
+                hook(changes)
+            except Exception:
+                logging.exception(f'Change hook {hook!r} failed')
+
+    # --------------------------------------------------------------------
+    # Zapytania finderow (wspolne dla wywolan bezposrednich i QueryBatch)
+    # --------------------------------------------------------------------
+
+    def _find_all_query(self) -> ReadQuery:
+        return ReadQuery(f'select * from {self._table_name()}{self._live_filter()}', (), self._map_all)
+
+    def _find_page_query(self, after_id: int = 0, limit: int = 100) -> ReadQuery:
+        sql = f'select * from {self._table_name()} where id_ > %s{self._live_filter("and")} order by id_ limit %s'
+        return ReadQuery(sql, (after_id, limit), self._map_all)
+
+    def _find_by_id_query(self, id_: int) -> ReadQuery:
+        # find_by_id zwraca surowy wiersz (krotke), jak cursor.fetchone()
+        sql = f'select * from {self._table_name()} where id_={int(id_)}{self._live_filter("and")}'
+        return ReadQuery(sql, (), lambda cursor, rows, raw: rows[0] if rows else None, one=True)
+
+    def _map_all(self, cursor: Any, rows: list[Any], raw: bool) -> list[Any]:
+        return map_rows(self._entity, cursor, rows, raw)
+
+    def _read(self, query: ReadQuery, raw: bool = False) -> Any:
+        # raw=True - finder moze czytac surowym kursorem, jezeli wlaczono raw_reads
+        with self._connection() as conn:
+            cursor = self._read_cursor(conn) if raw else conn.cursor()
+            if query.params:
+                cursor.execute(self._sql(query.sql), query.params)
+            else:
+                cursor.execute(self._sql(query.sql))
+            if query.one:
+                row = cursor.fetchone()
+                return query.convert(cursor, [row] if row else [], False)
+            return query.convert(cursor, cursor.fetchall(), raw and self._raw_reads)
+
+    @contextmanager
+    def _connection(self, write: bool = False) -> Iterator[Any]:
+        # Polaczenie z puli z limitami czasu repozytorium (with_timeouts / timeout)
+        with self._connection_pool.get_connection() as conn:
+            if self._timeouts is None:
+                yield conn
+            else:
+                with self._timeouts.guard(conn, write):
+                    yield conn
+
+    def _sql(self, sql: str) -> str:
+        return sql if self._timeouts is None else self._timeouts.sql(sql)
+
+    def _read_cursor(self, conn: Any, **options: Any) -> Any:
+        if self._raw_reads:
+            options['raw'] = True
+        return conn.cursor(**options)
+
+    # --------------------------------------------------------------------
+    # Cache wynikow zapytan
+    # --------------------------------------------------------------------
+
+    def _cached_query(self, sql: str, params: tuple[Any, ...], tables: tuple[str, ...],
+                      load: Callable[[], list[Any]]) -> list[Any]:
+        if self._query_cache is None:
+            return load()
+        # Kopia listy i encji, zeby wywolujacy nie zmienil zawartosci cache
+        return copy_rows(self._query_cache.get_or_load(sql, params, tables, load))
+
+    def _invalidate(self) -> None:
+        if self._query_cache is not None:
+            self._query_cache.invalidate(self._table_name(), *self._dependent_tables())
+
+    def _dependent_tables(self) -> list[str]:
+        # Tabele kolekcji (np. Team.players) zmieniaja sie razem z nami przez on delete/update cascade
+        return [
+            CrudRepository._table_name_of(relationship.target_type(self._entity))
+            for relationship in relationships_of(self._entity).values()
+            if relationship.many
+        ]
 
     # --------------------------------------------------------------------
     # Metody pomocnicze do generowania fragmentow SQL
     # --------------------------------------------------------------------
 
     def _table_name(self) -> str:
-        return inflection.tableize(self._entity_type.__name__)
+        return CrudRepository._table_name_of(self._entity_type)
+
+    @staticmethod
+    def _table_name_of(entity: Any) -> str:
+        return _tableize(entity.__name__)
 
     def _field_names(self) -> list[str]:
-        # TODO Tutaj nastapilo rzutowanie do list i wczesniej tego nie bylo
-        return list(self._entity().__dict__.keys())
+        # Atrybuty relacji (np. Player.team) nie sa kolumnami tabeli
+        return column_names(self._entity)
 
     # name, age
-    def _column_names_for_insert(self) -> str:
-        fields = [field for field in self._field_names() if field.lower() != 'id_']
-        return ', '.join(fields)
+    def _column_names_for_insert(self, with_id: bool = False) -> str:
+        return ', '.join(self._insert_columns(with_id))
+
+    def _insert_columns(self, with_id: bool = False) -> list[str]:
+        return CrudRepository._insert_columns_of(self._entity, with_id)
+
+    @staticmethod
+    def _insert_columns_of(entity: Any, with_id: bool = False) -> list[str]:
+        # Kolumna soft delete ma w bazie domyslnie null
+        return [field for field in column_names(entity)
+                if (with_id or field.lower() != 'id_') and field != soft_delete_column_of(entity)]
+
+    @staticmethod
+    def _has_preset_ids(items: list[Any]) -> bool:
+        preset = [item.id_ is not None for item in items]
+        if any(preset) and not all(preset):
+            raise ValueError('Either all or none of the inserted items must have id_ set')
+        return any(preset)
 
     @staticmethod
     def _to_str(value: Any) -> str:
         return f"'{value}'" if isinstance(value, (str, datetime, date)) else str(value)
 
     @staticmethod
-    def _column_values_for_insert(item: Any) -> str:
-        return ', '.join([CrudRepository._to_str(value) for field, value in item.__dict__.items() if field.lower() != 'id_'])
+    def _column_values_for_insert(item: Any, with_id: bool = False) -> str:
+        deleted = soft_delete_column_of(type(item))
+        return ', '.join([
+            CrudRepository._to_str(value)
+            for field, value in column_values(item).items()
+            if (with_id or field.lower() != 'id_') and field != deleted
+        ])
 
     @staticmethod
     def _column_names_and_values_for_update(item: Any) -> str:
         return ', '.join([
             f'{field}={CrudRepository._to_str(value)}'
-            for field, value in item.__dict__.items()
-            if field.lower() != 'id_' and value is not None
+            for field, value in CrudRepository._updated_values(item).items()
         ])
 
+    # name=case id_ when 1 then 'A' when 2 then 'B' else name end, ...
+    @staticmethod
+    def _case_assignments(items: dict[int, Any]) -> str:
+        columns: dict[str, list[str]] = {}
+        for id_, item in items.items():
+            for field, value in CrudRepository._updated_values(item).items():
+                columns.setdefault(field, []).append(f'when {int(id_)} then {CrudRepository._to_str(value)}')
+        return ', '.join(f'{field}=case id_ {" ".join(cases)} else {field} end' for field, cases in columns.items())
+
+    @staticmethod
+    def _check_updated_values(items: dict[int, Any]) -> None:
+        # Same None dalyby "set  where" albo "set , version=version+1" - niepoprawny SQL
+        empty = [str(id_) for id_, item in items.items() if not CrudRepository._updated_values(item)]
+        if empty:
+            raise ValueError(f'Nothing to update for id_ {", ".join(empty)}: all values are None')
+
+    @staticmethod
+    def _updated_values(item: Any) -> dict[str, Any]:
+        return {
+            field: value
+            for field, value in column_values(item).items()
+            if field.lower() != 'id_' and field not in (version_column_of(type(item)), soft_delete_column_of(type(item)))
+            and value is not None
+        }
+
     # TODO [KRZYSZTOF MA TO POKAZAC] UWAGA!!!
     # Ta metoda tworzy tabele, ale jest tylko po to zebym mogl szybko utworzyc strukture DB, zeby
     # testowac repozytoria. Logika tworzenia tabel i zarzadzania ich struktura zostanie przeniesiona
@@ -146,46 +779,89 @@ class CrudRepository(ABC):
 
 
 class TeamRepository(CrudRepository):
-    def __init__(self, connection_pool: MySQLConnectionPool):
-        super().__init__(connection_pool, Team)
+    def __init__(self, connection_pool: ConnectionPool, query_cache: QueryCache | None = None):
+        super().__init__(connection_pool, Team, query_cache)
+        self._index: TeamIndex | None = None
 
     # TeamRepository ma wszystkie metody z CrudRepository, ktore sa gotowe pracowac
     # z typem Team. Jezeli potrzebujesz jeszcze jakies dodatkowe metody konkretnie dla
     # Team, to piszesz jej w tym miejscu.
 
+    def use_index(self, index: TeamIndex | None) -> Self:
+        """Answer find_all_by_points_between / find_by_name from an in-process index (see TeamIndex.attach)."""
+        self._index = index
+        return self
+
+    @retryable()
     def find_all_by_points_between(self, points_from: int, points_to: int) -> list[Team]:
-        with self._connection_pool.get_connection() as conn:
-            cursor = conn.cursor()
-            # sql injection
-            sql = f'select * from teams t where t.points bewteen {points_from} and {points_to};'
-            cursor.execute(sql)
-            return [self._entity(*row) for row in cursor.fetchall()]
+        if self._index is not None:
+            return self._index.find_all_by_points_between(points_from, points_to)
+        query = cast(ReadQuery, self._find_all_by_points_between_query(points_from, points_to))
+        return self._cached_query(query.sql, query.params, ('teams',), lambda: self._read(query))
 
+    @retryable()
     def find_by_name(self, name: str) -> Team | None:
-        with self._connection_pool.get_connection() as conn:
-            cursor = conn.cursor()
-            # sql injection
-            sql = f"select * from teams t where t.name = '{name}';"
-            cursor.execute(sql)
-            res = cursor.fetchone()
-            return Team(*res) if res else res
+        if self._index is not None:
+            return self._index.find_by_name(name)
+        team: Team | None = self._read(cast(ReadQuery, self._find_by_name_query(name)))
+        return team
+
+    def _find_all_by_points_between_query(self, points_from: int, points_to: int) -> ReadQuery | None:
+        if self._index is not None:
+            # Odpowiedz z indeksu w pamieci - nie ma czego wysylac do bazy
+            return None
+        sql = f'select * from teams t where t.points between %s and %s{self._live_filter("and", alias="t")}'
+        return ReadQuery(sql, (points_from, points_to), self._map_all)
+
+    def _find_by_name_query(self, name: str) -> ReadQuery | None:
+        if self._index is not None:
+            return None
+        sql = f"select * from teams t where t.name = %s{self._live_filter('and', alias='t')}"
+        return ReadQuery(sql, (name,), lambda cursor, rows, raw: row_mapper(Team, cursor.description)(rows[0]) if rows else None,
+                         one=True)
 
 class PlayerRepository(CrudRepository):
-    def __init__(self, connection_pool: MySQLConnectionPool):
-        super().__init__(connection_pool, Player)
+    def __init__(self, connection_pool: ConnectionPool, query_cache: QueryCache | None = None):
+        super().__init__(connection_pool, Player, query_cache)
+
+    @retryable()
+    def find_all_by_team(self, team_id: int) -> list[Player]:
+        players: list[Player] = self._read(self._find_all_by_team_query(team_id), raw=True)
+        return players
+
+    def _find_all_by_team_query(self, team_id: int) -> ReadQuery:
+        sql = f'select * from players p where p.team_id = %s{self._live_filter("and", alias="p")} order by p.id_'
+        return ReadQuery(sql, (team_id,), self._map_all)
 
 # --------------------------------------------------------------------------------------
 
 # Moze byc tak, ze masz w Twojej db konkretny widok np reprezentujacy graczy oraz ich druzyny
 # Nie chcesz calego cruda tylko wygodna funkcjonalnosc pozwalajaca na pobranie danych z tego widoku
+def _live_filters(*entities: tuple[Any, str]) -> str:
+    return ''.join(f' and {condition}' for entity, alias in entities if (condition := live_condition(entity, alias)))
+
+
 @dataclass
 class PlayerWithTeamRepository:
-    connection_pool: MySQLConnectionPool
+    connection_pool: ConnectionPool
+    query_cache: QueryCache | None = None
 
     def find_all_players_with_teams(self, points_from: int, points_to: int) -> list[PlayerWithTeamView]:
-        with self.connection_pool.get_connection() as conn:
-            cursor = conn.cursor()
-            return []
+        sql = ('select p.id_ as player_id, p.name as player_name, p.goals as player_goals, '
+               't.id_ as team_id, t.name as team_name from players p '
+               'join teams t on t.id_ = p.team_id '
+               f'where t.points between %s and %s{_live_filters((Player, "p"), (Team, "t"))} order by p.id_')
+        params = (points_from, points_to)
+
+        def load() -> list[PlayerWithTeamView]:
+            with self.connection_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                return map_rows(PlayerWithTeamView, cursor, cursor.fetchall())
+
+        if self.query_cache is None:
+            return load()
+        return copy_rows(self.query_cache.get_or_load(sql, params, ('players', 'teams'), load))
 
 # --------------------------------------------------------------------------------------
 # Repository, ktore moze zawierac nawet kilka metod wymagajacych wykonywania kilku operacji
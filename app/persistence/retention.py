@@ -0,0 +1,33 @@
+from dataclasses import field, fields
+from typing import Any
+
+
+# --------------------------------------------------
+# SOFT DELETE
+# --------------------------------------------------
+def soft_delete_column() -> Any:
+    """Declare a nullable `deleted_at` style column on a dataclass entity.
+
+    CrudRepository then marks rows as deleted instead of removing them and
+    every finder skips rows where the column is set.
+    """
+    return field(default=None, metadata={'soft_delete': True})
+
+
+def soft_delete_column_of(entity: Any) -> str | None:
+    return next((f.name for f in fields(entity) if f.metadata.get('soft_delete')), None)
+
+
+def live_condition(entity: Any, alias: str = '') -> str | None:
+    """SQL condition selecting rows that are not soft deleted (None when the entity has no such column)."""
+    column = soft_delete_column_of(entity)
+    if column is None:
+        return None
+    return f'{alias}.{column} is null' if alias else f'{column} is null'
+
+
+def id_ranges(min_id: int, max_id: int, size: int) -> list[tuple[int, int]]:
+    """Split [min_id, max_id] into consecutive inclusive ranges of `size` ids."""
+    if size < 1:
+        raise ValueError('Range size must be positive')
+    return [(start, min(start + size - 1, max_id)) for start in range(min_id, max_id + 1, size)]
@@ -0,0 +1,148 @@
+import contextlib
+import functools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
+
+T = TypeVar('T')
+
+# --------------------------------------------------
+# TRANSIENT ERRORS
+# --------------------------------------------------
+# Po tych bledach serwer wycofal transakcje - mozna ja bezpiecznie powtorzyc w calosci
+ROLLED_BACK_ERRORS = {
+    1213: 'deadlock',
+    1205: 'lock wait timeout',
+}
+# Zerwane polaczenie - nie wiadomo, czy zapis doszedl, wiec powtarzamy tylko operacje idempotentne
+CONNECTION_ERRORS = {
+    2006: 'server has gone away',
+    2013: 'lost connection during query',
+}
+
+
+def error_code(error: BaseException) -> int | None:
+    # mysql.connector.Error ma atrybut errno - bez importu connectora
+    errno = getattr(error, 'errno', None)
+    return errno if isinstance(errno, int) else None
+
+
+@dataclass
+class RetryMetrics:
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    budget_exhausted: int = 0
+    errors: Counter[int] = field(default_factory=Counter)
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of calls.
+
+    Every call deposits `ratio` tokens and every retry costs one, so under a
+    sustained outage retries stop instead of multiplying the load.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0):
+        self._ratio = ratio
+        self._capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + self._ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 2.0
+    budget: RetryBudget | None = field(default_factory=RetryBudget)
+    metrics: RetryMetrics = field(default_factory=RetryMetrics)
+    sleep: Callable[[float], None] = time.sleep
+    jitter: Callable[[], float] = random.random
+    # Jedna polityka jest wspolna dla wszystkich repozytoriow i watkow - liczniki zmieniamy pod lockiem
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def is_retryable(self, error: BaseException, idempotent: bool) -> bool:
+        code = error_code(error)
+        return code in ROLLED_BACK_ERRORS or (idempotent and code in CONNECTION_ERRORS)
+
+    def delay(self, attempt: int) -> float:
+        # Exponential backoff z "full jitter"
+        return self.jitter() * min(self.max_delay, self.base_delay * 2.0 ** (attempt - 1))
+
+    def run(self, operation: Callable[[], T], idempotent: bool = True) -> T:
+        with self._lock:
+            self.metrics.calls += 1
+        if self.budget:
+            self.budget.deposit()
+        attempt = 1
+        while True:
+            with self._lock:
+                self.metrics.attempts += 1
+            try:
+                return operation()
+            except Exception as e:
+                if not self.is_retryable(e, idempotent) or attempt >= self.max_attempts:
+                    with self._lock:
+                        self.metrics.failures += 1
+                    raise
+                code = error_code(e)
+                with self._lock:
+                    self.metrics.errors[code or 0] += 1
+                if self.budget and not self.budget.withdraw():
+                    with self._lock:
+                        self.metrics.budget_exhausted += 1
+                        self.metrics.failures += 1
+                    raise
+                delay = self.delay(attempt)
+                logging.warning(f'Transient MySQL error {code}, retry {attempt}/{self.max_attempts - 1} in {delay:.3f}s')
+                with self._lock:
+                    self.metrics.retries += 1
+                self.sleep(delay)
+                attempt += 1
+
+    def transaction(self, connection_pool: Any, work: Callable[[Any], T]) -> T:
+        """Run `work(conn)` as one transaction and repeat the whole block on transient errors."""
+        def attempt() -> T:
+            with connection_pool.get_connection() as conn:
+                try:
+                    conn.start_transaction()
+                    result = work(conn)
+                    conn.commit()
+                    return result
+                except Exception:
+                    # Po zerwanym polaczeniu rollback tez sie nie uda - zglaszamy pierwotny blad
+                    with contextlib.suppress(Exception):
+                        conn.rollback()
+                    raise
+
+        return self.run(attempt, idempotent=False)
+
+
+def retryable(idempotent: bool = True) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Run a repository method through the repository's retry policy, if it has one."""
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+            policy: RetryPolicy | None = getattr(self, '_retry_policy', None)
+            if policy is None:
+                return method(self, *args, **kwargs)
+            return policy.run(lambda: method(self, *args, **kwargs), idempotent)
+        return wrapper
+    return decorator
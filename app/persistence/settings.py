@@ -0,0 +1,101 @@
+import os
+import tomllib
+from typing import Any, Mapping, cast, get_type_hints
+
+from app.persistence.connection import PoolConfig
+from app.persistence.timeouts import lock_wait_sql
+
+# --------------------------------------------------------------------------------------
+# Konfiguracja puli: wbudowane profile < plik TOML < zmienne srodowiskowe
+#
+# Przykladowy plik (sciezka w MYSQL_CONFIG albo przekazana jawnie):
+#
+#   [pool]
+#   host = "db.local"
+#   database = "league"
+#
+#   [profiles.bulk]
+#   pool_size = 8
+#
+# Zmienne MYSQL_<KLUCZ> (np. MYSQL_HOST) dotycza wszystkich profili,
+# MYSQL_<PROFIL>_<KLUCZ> (np. MYSQL_BULK_POOL_SIZE) tylko jednego.
+# MYSQL_QUERY_TIMEOUT ustawia innodb_lock_wait_timeout w init_command (o ile nie podano wlasnego).
+# --------------------------------------------------------------------------------------
+
+PROFILES: dict[str, PoolConfig] = {
+    'default': {},
+    # API: male pule, krotkie timeouty - wolne zapytanie ma szybko zwolnic polaczenie
+    'oltp': {
+        'pool_size': 10,
+        'connection_timeout': 3,
+        'read_timeout': 10,
+        'write_timeout': 10,
+        'compress': False,
+    },
+    # Importy / eksporty: malo polaczen, duze paczki danych, kompresja, LOAD DATA
+    'bulk': {
+        'pool_size': 4,
+        'connection_timeout': 30,
+        'read_timeout': 600,
+        'write_timeout': 600,
+        'compress': True,
+        'allow_local_infile': True,
+    },
+    # Polaczenia pomocnicze (KILL QUERY) - musza byc dostepne, gdy glowna pula jest wyczerpana
+    'control': {
+        'pool_size': 1,
+        'connection_timeout': 3,
+        'read_timeout': 5,
+        'write_timeout': 5,
+    },
+}
+
+_TYPES: dict[str, Any] = get_type_hints(PoolConfig)
+
+
+def _coerce(key: str, value: Any) -> Any:
+    if key not in _TYPES:
+        raise ValueError(f'Unknown pool option {key}')
+    if not isinstance(value, str) or _TYPES[key] is str:
+        return value
+    if _TYPES[key] is bool:
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return _TYPES[key](value)
+
+
+def env_pool_config(env: Mapping[str, str] | None = None, prefix: str = 'MYSQL_') -> PoolConfig:
+    env = os.environ if env is None else env
+    config: dict[str, Any] = {}
+    for key in _TYPES:
+        name = f'{prefix}{key.upper()}'
+        if name in env:
+            config[key] = _coerce(key, env[name])
+    return cast(PoolConfig, config)
+
+
+def load_pool_config(profile: str = 'default', path: str | None = None,
+                     env: Mapping[str, str] | None = None) -> PoolConfig:
+    env = os.environ if env is None else env
+    path = path or env.get('MYSQL_CONFIG')
+    file_config: dict[str, Any] = {}
+    if path:
+        with open(path, 'rb') as f:
+            file_config = tomllib.load(f)
+    file_profiles = file_config.get('profiles', {})
+    if profile not in PROFILES and profile not in file_profiles:
+        raise ValueError(f'Unknown pool profile {profile}')
+
+    # 3307 - port MySQL wystawiony w docker-compose.yml
+    config: dict[str, Any] = {'port': 3307}
+    if profile != 'default':
+        # Kazdy profil ma wlasna pule, a connector wymaga unikalnych nazw pul
+        config['pool_name'] = f'{profile}_pool'
+    config.update(PROFILES.get(profile, {}))
+    for section in (file_config.get('pool', {}), file_profiles.get(profile, {})):
+        config.update({key: _coerce(key, value) for key, value in section.items()})
+    config.update(env_pool_config(env))
+    config.update(env_pool_config(env, prefix=f'MYSQL_{profile.upper()}_'))
+    if env.get('MYSQL_QUERY_TIMEOUT') and 'init_command' not in config:
+        # Raz na polaczenie zamiast SET przed kazdym zapisem - connector powtarza init_command po resecie sesji
+        config['init_command'] = lock_wait_sql(float(env['MYSQL_QUERY_TIMEOUT']))
+    return cast(PoolConfig, config)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any, Callable, TypeVar
+
+from app.persistence.cache import QueryCache
+from app.persistence.ids import HiLoIdAllocator
+from app.persistence.model import Player
+from app.persistence.repository import PlayerRepository
+
+T = TypeVar('T')
+
+
+# --------------------------------------------------
+# SHARD MAP
+# --------------------------------------------------
+@dataclass
+class ShardMap:
+    """Maps a row to one of `pools` by the value of its `key` column.
+
+    Values listed in `overrides` (e.g. a big club moved to its own shard) win over
+    the hash. crc32 is used instead of hash() so every process routes the same way.
+    """
+    pools: list[Any]
+    key: str = 'team_id'
+    overrides: dict[Any, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.pools:
+            raise ValueError('Shard map needs at least one pool')
+        if any(not 0 <= shard < len(self.pools) for shard in self.overrides.values()):
+            raise ValueError('Override points to unknown shard')
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+    def shard_for(self, value: Any) -> int:
+        if value is None:
+            raise ValueError(f'Cannot route a row without {self.key}')
+        if value in self.overrides:
+            return self.overrides[value]
+        return zlib.crc32(str(value).encode()) % len(self.pools)
+
+    def shard_of(self, item: Any) -> int:
+        return self.shard_for(getattr(item, self.key))
+
+
+# --------------------------------------------------
+# SHARDED REPOSITORY
+# --------------------------------------------------
+class ShardedPlayerRepository:
+    """PlayerRepository spread over several databases.
+
+    Writes and point reads go to one shard. When the map is keyed by team_id, a
+    lookup by id_ alone does not know the shard and asks all shards in parallel.
+    find_all / find_page scatter to all shards and merge the id_-ordered results.
+    Ids come from a shared hi/lo sequence, never from per-shard auto_increment.
+    """
+
+    def __init__(self, shard_map: ShardMap, id_allocator: HiLoIdAllocator, query_cache: QueryCache | None = None):
+        self._shard_map = shard_map
+        self._id_allocator = id_allocator
+        self._shards = [PlayerRepository(pool, query_cache) for pool in shard_map.pools]
+        self._executor = ThreadPoolExecutor(max_workers=len(self._shards), thread_name_prefix='shard')
+
+    @property
+    def shards(self) -> list[PlayerRepository]:
+        return self._shards
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def insert(self, item: Player) -> int:
+        if item.id_ is None:
+            item.id_ = self._id_allocator.next_id()
+        return self._shards[self._shard_map.shard_of(item)].insert(item)
+
+    def insert_many(self, items: list[Player]) -> list[int]:
+        self._id_allocator.assign(items)
+        by_shard: dict[int, list[Player]] = {}
+        for item in items:
+            by_shard.setdefault(self._shard_map.shard_of(item), []).append(item)
+        list(self._executor.map(lambda shard: self._shards[shard].insert_many(by_shard[shard]), by_shard))
+        return [item.id_ for item in items if item.id_ is not None]
+
+    def update(self, id_: int, item: Player) -> int:
+        shard = self._locate(id_)
+        if shard is None:
+            return id_
+        if getattr(item, self._shard_map.key) is not None and self._shard_map.shard_of(item) != shard:
+            raise ValueError(f'Player {id_} would move to another shard - delete and insert it instead')
+        return self._shards[shard].update(id_, item)
+
+    def find_by_id(self, id_: int) -> Any:
+        shard = self._locate(id_)
+        return None if shard is None else self._shards[shard].find_by_id(id_)
+
+    def delete(self, id_: int) -> int:
+        shard = self._locate(id_)
+        if shard is not None:
+            self._shards[shard].delete(id_)
+        return id_
+
+    def delete_all(self, batch_size: int = 10000) -> int:
+        return sum(self._scatter(lambda repository: repository.delete_all(batch_size)))
+
+    def find_all(self) -> list[Player]:
+        by_id = attrgetter('id_')
+        results = self._scatter(lambda repository: sorted(repository.find_all(), key=by_id))
+        return list(heapq.merge(*results, key=by_id))
+
+    def find_page(self, after_id: int = 0, limit: int = 100) -> list[Player]:
+        # Kazdy shard zwraca swoje pierwsze `limit` wierszy - po scaleniu bierzemy `limit` najmniejszych
+        results = self._scatter(lambda repository: repository.find_page(after_id, limit))
+        return list(heapq.merge(*results, key=attrgetter('id_')))[:limit]
+
+    def find_all_by_team(self, team_id: int) -> list[Player]:
+        if self._shard_map.key == 'team_id':
+            return self._shards[self._shard_map.shard_for(team_id)].find_all_by_team(team_id)
+        results = self._scatter(lambda repository: repository.find_all_by_team(team_id))
+        return list(heapq.merge(*results, key=attrgetter('id_')))
+
+    def _locate(self, id_: int) -> int | None:
+        if self._shard_map.key == 'id_':
+            return self._shard_map.shard_for(id_)
+        rows = self._scatter(lambda repository: repository.find_by_id(id_))
+        return next((shard for shard, row in enumerate(rows) if row is not None), None)
+
+    def _scatter(self, operation: Callable[[PlayerRepository], T]) -> list[T]:
+        # Wyniki w kolejnosci shardow; wyjatek z dowolnego sharda przerywa operacje
+        return list(self._executor.map(operation, self._shards))
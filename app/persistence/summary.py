@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, TYPE_CHECKING
+
+from app.persistence.mapper import map_rows
+from app.persistence.model import Player, TeamStats
+from app.persistence.retention import live_condition
+
+if TYPE_CHECKING:
+    from app.persistence.connection import ConnectionPool
+
+
+# --------------------------------------------------
+# SUMMARY TABLES
+# --------------------------------------------------
+class Summary(ABC):
+    """Aggregate table kept up to date by a repository inside its own write transactions.
+
+    Around an update / delete the repository calls capture() for the affected rows
+    before and after the statement and passes both to apply(), so the summary only
+    adds the difference - it never rescans the source table.
+    """
+
+    @abstractmethod
+    def capture(self, cursor: Any, where: str) -> dict[Any, Any]:
+        """Aggregates of the source rows matching `where`, locked until commit."""
+
+    @abstractmethod
+    def apply(self, cursor: Any, before: dict[Any, Any], after: dict[Any, Any]) -> None:
+        """Add `after - before` to the summary rows."""
+
+    @abstractmethod
+    def inserted(self, cursor: Any, items: list[Any]) -> None:
+        """Add newly inserted entities."""
+
+
+@dataclass
+class TeamStatsMismatch:
+    team_id: int
+    expected: TeamStats
+    actual: TeamStats
+
+
+class TeamStatsSummary(Summary):
+    """Number of players and total goals per team in the `team_stats` table.
+
+    >>> stats = TeamStatsSummary(connection_pool)
+    >>> player_repository.with_summary(stats)
+    >>> stats.find(team_id)      # primary key lookup instead of sum() over players
+
+    Enable it on every PlayerRepository that writes players, then run rebuild() once
+    to backfill. check() compares the table with a full aggregation of players.
+    """
+    TABLE = 'team_stats'
+
+    def __init__(self, connection_pool: ConnectionPool):
+        self._connection_pool = connection_pool
+
+    def find(self, team_id: int) -> TeamStats:
+        with self._connection_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'select team_id, players, goals from {self.TABLE} where team_id = %s', (team_id,))
+            row = cursor.fetchone()
+        # Druzyna bez zawodnikow moze nie miec jeszcze wiersza
+        return TeamStats(*row) if row else TeamStats(team_id)
+
+    def find_all(self) -> list[TeamStats]:
+        with self._connection_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'select team_id, players, goals from {self.TABLE} order by team_id')
+            return map_rows(TeamStats, cursor, cursor.fetchall())
+
+    # --------------------------------------------------------------------
+    # Utrzymanie przyrostowe (wywolywane przez CrudRepository)
+    # --------------------------------------------------------------------
+
+    def capture(self, cursor: Any, where: str) -> dict[Any, Any]:
+        # for update: odczyt biezacej wersji wierszy (nie snapshotu), ktore zaraz zmienimy
+        cursor.execute(f'select team_id, count(*), coalesce(sum(goals), 0) from players '
+                       f'where ({where}) and team_id is not null{TeamStatsSummary._live("and")} '
+                       f'group by team_id for update')
+        return {int(team_id): (int(players), int(goals)) for team_id, players, goals in cursor.fetchall()}
+
+    def apply(self, cursor: Any, before: dict[Any, Any], after: dict[Any, Any]) -> None:
+        deltas = []
+        # Stala kolejnosc kluczy - dwie transakcje nie zablokuja wierszy team_stats na krzyz
+        for team_id in sorted(before.keys() | after.keys()):
+            players_before, goals_before = before.get(team_id, (0, 0))
+            players_after, goals_after = after.get(team_id, (0, 0))
+            delta = (players_after - players_before, goals_after - goals_before)
+            if delta != (0, 0):
+                deltas.append(f'({int(team_id)}, {delta[0]}, {delta[1]})')
+        if not deltas:
+            return
+        cursor.execute(f'insert into {self.TABLE} (team_id, players, goals) values {", ".join(deltas)} as delta '
+                       f'on duplicate key update players = {self.TABLE}.players + delta.players, '
+                       f'goals = {self.TABLE}.goals + delta.goals')
+
+    def inserted(self, cursor: Any, items: list[Any]) -> None:
+        after: dict[int, tuple[int, int]] = {}
+        for item in items:
+            if item.team_id is None:
+                continue
+            players, goals = after.get(item.team_id, (0, 0))
+            after[item.team_id] = (players + 1, goals + (item.goals or 0))
+        self.apply(cursor, {}, after)
+
+    # --------------------------------------------------------------------
+    # Backfill i kontrola spojnosci
+    # --------------------------------------------------------------------
+
+    def rebuild(self) -> int:
+        """Recompute the whole table from players in one transaction. Returns the number of teams.
+
+        insert ... select locks the scanned players rows, so writes maintaining the
+        summary wait until the rebuild commits instead of being lost.
+        """
+        with self._connection_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                conn.start_transaction()
+                cursor.execute(f'delete from {self.TABLE}')
+                cursor.execute(f'insert into {self.TABLE} (team_id, players, goals) {self._aggregate_sql()}')
+                rebuilt = int(cursor.rowcount)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        logging.info(f'Rebuilt {self.TABLE} for {rebuilt} teams')
+        return rebuilt
+
+    def check(self) -> list[TeamStatsMismatch]:
+        """Teams whose summary row differs from the aggregate of their players (a missing row counts as zeros)."""
+        with self._connection_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self._aggregate_sql())
+            expected = {int(team_id): TeamStats(int(team_id), int(players), int(goals))
+                        for team_id, players, goals in cursor.fetchall()}
+            cursor.execute(f'select team_id, players, goals from {self.TABLE}')
+            actual = {int(team_id): TeamStats(int(team_id), int(players), int(goals))
+                      for team_id, players, goals in cursor.fetchall()}
+        mismatches = []
+        for team_id in sorted(expected.keys() | actual.keys()):
+            should_be = expected.get(team_id, TeamStats(team_id))
+            stored = actual.get(team_id, TeamStats(team_id))
+            if should_be != stored:
+                mismatches.append(TeamStatsMismatch(team_id, should_be, stored))
+        if mismatches:
+            logging.warning(f'{self.TABLE} differs from players for {len(mismatches)} teams')
+        return mismatches
+
+    @staticmethod
+    def _aggregate_sql() -> str:
+        return (f'select team_id, count(*), coalesce(sum(goals), 0) from players '
+                f'where team_id is not null{TeamStatsSummary._live("and")} group by team_id')
+
+    @staticmethod
+    def _live(keyword: str) -> str:
+        condition = live_condition(Player)
+        return f' {keyword} {condition}' if condition else ''
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, TYPE_CHECKING
+
+from app.persistence.indexes import HashIndex, SortedIndex
+from app.persistence.model import Team
+from app.persistence.relationship import column_values
+
+if TYPE_CHECKING:
+    from app.persistence.repository import TeamRepository
+
+
+# --------------------------------------------------
+# TEAM INDEX
+# --------------------------------------------------
+def _name_key(name: str | None) -> str | None:
+    # Jak domyslna kolacja MySQL (utf8mb4_0900_ai_ci) - bez rozrozniania wielkosci liter i akcentow
+    if name is None:
+        return None
+    return ''.join(c for c in unicodedata.normalize('NFKD', name.casefold()) if not unicodedata.combining(c))
+
+
+class TeamIndex:
+    """All teams held in process: points kept sorted for bisect range queries, names hashed.
+
+    Loaded with one query on first use and kept up to date from the repository's
+    change hooks. Teams inserted without id_ are fetched with one keyset query
+    (ids above the highest known one) on the next lookup. Names are matched
+    like the column collation (see _name_key), so find_by_name gives the same
+    team with and without the index.
+
+    Only writes made through the attached repository are seen right away.
+    Changes made by other processes or through other repository instances
+    (e.g. bulk_team_repository) are seen after `max_age` seconds, when the
+    index reloads itself.
+    """
+
+    def __init__(self, repository: TeamRepository, max_age: float | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._repository = repository
+        self._max_age = max_age
+        self._clock = clock
+        self._teams: dict[int, Team] = {}
+        self._points = SortedIndex()
+        self._names = HashIndex()
+        self._loaded_at: float | None = None
+        self._max_id = 0
+        self._missing_inserts = False
+        self._lock = threading.RLock()
+        self.loads = 0
+
+    def __len__(self) -> int:
+        self._ensure_current()
+        return len(self._teams)
+
+    def attach(self) -> TeamIndex:
+        """Route the repository's find_all_by_points_between / find_by_name through this index."""
+        self._repository.after_insert(self._on_insert).after_update(self._on_update).after_delete(self._on_delete)
+        self._repository.use_index(self)
+        return self
+
+    def load(self) -> None:
+        teams = self._repository.find_all()
+        with self._lock:
+            self._teams = {}
+            self._names.clear()
+            self._points.load([(team.points, team.id_) for team in teams if team.id_ is not None])
+            for team in teams:
+                if team.id_ is not None:
+                    self._teams[team.id_] = team
+                    self._names.add(_name_key(team.name), team.id_)
+            self._max_id = max(self._teams, default=0)
+            self._missing_inserts = False
+            self._loaded_at = self._clock()
+            self.loads += 1
+
+    def find_all_by_points_between(self, points_from: int, points_to: int) -> list[Team]:
+        """Teams with points in [points_from, points_to], ordered by points."""
+        self._ensure_current()
+        with self._lock:
+            return [self._copy(id_) for id_ in self._points.between(points_from, points_to)]
+
+    def find_by_name(self, name: str) -> Team | None:
+        self._ensure_current()
+        with self._lock:
+            ids = self._names.find(_name_key(name))
+            return self._copy(ids[0]) if ids else None
+
+    def _ensure_current(self) -> None:
+        with self._lock:
+            expired = self._loaded_at is None or (
+                self._max_age is not None and self._clock() - self._loaded_at >= self._max_age
+            )
+            if expired:
+                self.load()
+            elif self._missing_inserts:
+                self._fetch_new()
+
+    def _fetch_new(self) -> None:
+        self._missing_inserts = False
+        while teams := self._repository.find_page(after_id=self._max_id, limit=1000):
+            for team in teams:
+                self._put(team)
+
+    def _copy(self, id_: int) -> Team:
+        # Kopia - wywolujacy nie moze zmienic zawartosci indeksu
+        return dataclasses.replace(self._teams[id_])
+
+    def _put(self, team: Team) -> None:
+        assert team.id_ is not None
+        self._remove(team.id_)
+        self._teams[team.id_] = team
+        self._points.add(team.points, team.id_)
+        self._names.add(_name_key(team.name), team.id_)
+        self._max_id = max(self._max_id, team.id_)
+
+    def _remove(self, id_: int) -> None:
+        team = self._teams.pop(id_, None)
+        if team is not None:
+            self._points.remove(team.points, id_)
+            self._names.remove(_name_key(team.name), id_)
+
+    # Hooki repozytorium - wywolywane po commicie
+
+    def _on_insert(self, items: list[Any]) -> None:
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for item in items:
+                if item.id_ is None:
+                    # Id z auto_increment nie wraca w encji - dociagamy nowe wiersze przy nastepnym odczycie
+                    self._missing_inserts = True
+                else:
+                    self._put(dataclasses.replace(item))
+
+    def _on_update(self, items: dict[int, Any]) -> None:
+        with self._lock:
+            for id_, item in items.items():
+                if id_ in self._teams:
+                    # Jak w update: wartosci None nie zmieniaja kolumny
+                    changes = {field: value for field, value in column_values(item).items()
+                               if value is not None and field != 'id_'}
+                    self._put(dataclasses.replace(self._teams[id_], **changes))
+
+    def _on_delete(self, ids: list[int] | None) -> None:
+        with self._lock:
+            if ids is None:
+                self._loaded_at = None
+                return
+            for id_ in ids:
+                self._remove(id_)
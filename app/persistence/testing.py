@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Any, Iterator, TYPE_CHECKING
+
+from app.persistence.connection import (ConnectionPool, MySQLConnectionPoolBuilder, PinnedConnectionPool, create_tables,
+                                        create_team_stats_table)
+from app.persistence.ids import create_sequence_table
+
+if TYPE_CHECKING:
+    from mysql.connector.pooling import MySQLConnectionPool
+
+# --------------------------------------------------------------------------------------
+# Izolacja testow integracyjnych bez DDL na kazdy test:
+# - schemat (baza + tabele) tworzony raz na sesje, osobny dla kazdego workera pytest-xdist
+# - kazdy test dziala w transakcji wycofywanej po tescie
+# - repozytoria z rejestru dzialaja na tym jednym polaczeniu (registry.use_pool)
+# DDL w tescie (create / drop / truncate) robi niejawny commit i psuje izolacje.
+# --------------------------------------------------------------------------------------
+
+SAVEPOINT = 'test_case'
+
+
+def worker_schema(base: str = 'test_db', env: dict[str, str] | None = None) -> str:
+    """Schema name for the current pytest-xdist worker (test_db_gw0, ...) or `base` without xdist."""
+    env = dict(os.environ) if env is None else env
+    worker = env.get('PYTEST_XDIST_WORKER')
+    return f'{base}_{worker}' if worker else base
+
+
+def create_test_schema(builder: MySQLConnectionPoolBuilder, schema: str) -> MySQLConnectionPool:
+    """Create database `schema` (if needed) with the application tables and return a pool bound to it."""
+    import mysql.connector
+    config: dict[str, Any] = {
+        key: value for key, value in builder.driver_config().items()
+        if key not in ('pool_name', 'pool_size', 'database')
+    }
+    conn = mysql.connector.connect(**config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'create database if not exists {schema}')
+    finally:
+        conn.close()
+    pool = builder.database(schema).pool_name(f'{schema}_pool').build()
+    create_tables(pool)
+    create_team_stats_table(pool)
+    # Tu, a nie przy pierwszej rezerwacji id - DDL zatwierdzilby transakcje testu (rollback_transaction)
+    create_sequence_table(pool)
+    return pool
+
+
+def drop_test_schema(connection_pool: ConnectionPool, schema: str) -> None:
+    with connection_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'drop database if exists {schema}')
+
+
+class SavepointConnection:
+    """Connection wrapper for code running inside a test transaction.
+
+    commit() only moves the savepoint and rollback() returns to it, so repository
+    code that commits after every statement runs unchanged, while everything it
+    wrote is rolled back together with the outer transaction after the test.
+    """
+
+    def __init__(self, connection: Any):
+        self._connection = connection
+
+    def start_transaction(self, *args: Any, **kwargs: Any) -> None:
+        # Transakcja jest juz otwarta przez rollback_transaction
+        pass
+
+    def commit(self) -> None:
+        self._execute(f'savepoint {SAVEPOINT}')
+
+    def rollback(self) -> None:
+        self._execute(f'rollback to savepoint {SAVEPOINT}')
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def _execute(self, sql: str) -> None:
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+
+@contextmanager
+def rollback_transaction(connection_pool: ConnectionPool) -> Iterator[PinnedConnectionPool]:
+    """Pin one connection, open a transaction on it and roll it back on exit."""
+    with connection_pool.get_connection() as conn:
+        conn.start_transaction()
+        savepoint_connection = SavepointConnection(conn)
+        savepoint_connection.commit()
+        try:
+            yield PinnedConnectionPool(savepoint_connection)
+        finally:
+            conn.rollback()
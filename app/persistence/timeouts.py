@@ -0,0 +1,159 @@
+import contextlib
+import heapq
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Self
+
+from app.persistence.retry import error_code
+
+# --------------------------------------------------
+# QUERY TIMEOUT ERRORS
+# --------------------------------------------------
+# 3024 - przekroczony MAX_EXECUTION_TIME, 1317 - zapytanie przerwane przez KILL QUERY
+TIMEOUT_ERRORS = {
+    3024: 'maximum statement execution time exceeded',
+    1317: 'query execution was interrupted',
+}
+
+_SELECT = re.compile(r'^\s*select\b', re.IGNORECASE)
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query was stopped by the server or cancelled after its deadline."""
+
+
+def max_execution_time(sql: str, seconds: float | None) -> str:
+    """Add the MAX_EXECUTION_TIME optimizer hint to a SELECT (other statements are returned unchanged)."""
+    if seconds is None or not _SELECT.match(sql):
+        return sql
+    # Hint musi stac zaraz po slowie select - serwer ignoruje go w innym miejscu
+    return _SELECT.sub(lambda m: f'{m.group(0)} /*+ MAX_EXECUTION_TIME({max(1, int(seconds * 1000))}) */', sql, count=1)
+
+
+def lock_wait_sql(seconds: float) -> str:
+    """SET statement for innodb_lock_wait_timeout (whole seconds, at least 1)."""
+    return f'set session innodb_lock_wait_timeout = {max(1, math.ceil(seconds))}'
+
+
+@dataclass(eq=False)
+class Watch:
+    """Deadline of one guarded block, checked by the QueryCanceller watchdog."""
+    connection_id: int
+    deadline: float
+    # active - blok jeszcze trwa (polaczenie nie wrocilo do puli), expired - wyslano KILL QUERY
+    active: bool = True
+    expired: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class QueryCanceller:
+    """Issues KILL QUERY for a connection whose client-side deadline expired.
+
+    KILL goes through a separate pool (a connection or two is enough), so it still
+    works when the application pool is exhausted by the very queries to cancel.
+
+    Deadlines of all guarded blocks sit in one heap served by a single watchdog
+    thread. The watchdog kills under the watch lock and only while the block is
+    still active, and release() takes the same lock - a connection is never handed
+    back to the pool (and to another query) with a KILL for it in flight.
+    """
+
+    def __init__(self, connection_pool: Any, clock: Callable[[], float] = time.monotonic):
+        self._connection_pool = connection_pool
+        self._clock = clock
+        self._watches: list[tuple[float, int, Watch]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, connection_id: int, seconds: float) -> Watch:
+        watch = Watch(connection_id, self._clock() + seconds)
+        with self._condition:
+            heapq.heappush(self._watches, (watch.deadline, next(self._sequence), watch))
+            # Watek nie przezywa fork() - w procesie potomnym startuje od nowa
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='query-watchdog', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return watch
+
+    @staticmethod
+    def release(watch: Watch) -> None:
+        # Czeka na KILL w toku - po wyjsciu watchdog nie dotknie juz tego polaczenia
+        with watch.lock:
+            watch.active = False
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._watches or self._watches[0][0] > self._clock():
+                    self._condition.wait(self._watches[0][0] - self._clock() if self._watches else None)
+                _, _, watch = heapq.heappop(self._watches)
+            with watch.lock:
+                if watch.active:
+                    watch.expired = True
+                    self.kill_query(watch.connection_id)
+
+    def kill_query(self, connection_id: int) -> None:
+        try:
+            with self._connection_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'kill query {int(connection_id)}')
+            logging.warning(f'Killed query on connection {connection_id} after its deadline')
+        except Exception:
+            # Zapytanie moglo sie wlasnie zakonczyc albo polaczenie zniknelo - nie ma czego przerywac
+            logging.exception(f'Could not kill query on connection {connection_id}')
+
+
+@dataclass(frozen=True)
+class QueryTimeouts:
+    # Limit czasu SELECT-ow po stronie serwera (hint MAX_EXECUTION_TIME)
+    select: float | None = None
+    # innodb_lock_wait_timeout sesji dla zapisow (w sekundach, co najmniej 1)
+    lock_wait: int | None = None
+    # Po tylu sekundach od pobrania polaczenia wysylamy KILL QUERY (wymaga canceller)
+    deadline: float | None = None
+    canceller: QueryCanceller | None = None
+    # Pula ustawia juz lock_wait w init_command (connector powtarza go po resecie sesji) -
+    # guard nie wysyla wtedy SET przed kazdym zapisem
+    lock_wait_on_connect: bool = False
+
+    @classmethod
+    def of(cls, seconds: float, canceller: QueryCanceller | None = None, grace: float = 1.0) -> Self:
+        """Same limit for reads and lock waits; KILL QUERY `grace` seconds later if the server did not stop."""
+        return cls(seconds, max(1, math.ceil(seconds)), seconds + grace if canceller else None, canceller)
+
+    def sql(self, sql: str) -> str:
+        return max_execution_time(sql, self.select)
+
+    def init_command(self) -> str | None:
+        """Pool init_command applying lock_wait once per connection instead of before every write."""
+        return lock_wait_sql(self.lock_wait) if self.lock_wait is not None else None
+
+    @contextlib.contextmanager
+    def guard(self, conn: Any, write: bool = False) -> Iterator[Any]:
+        """Apply the limits to a checked-out connection for the duration of the block.
+
+        Server-side timeouts and killed queries surface as QueryTimeoutError. The
+        session variable is dropped when the pool resets the session on return.
+        """
+        if write and self.lock_wait is not None and not self.lock_wait_on_connect:
+            conn.cursor().execute(lock_wait_sql(self.lock_wait))
+        watch: Watch | None = None
+        if self.deadline is not None and self.canceller is not None:
+            watch = self.canceller.watch(conn.connection_id, self.deadline)
+        try:
+            yield conn
+        except Exception as e:
+            if error_code(e) in TIMEOUT_ERRORS:
+                reason = 'deadline expired' if watch is not None and watch.expired else TIMEOUT_ERRORS[error_code(e) or 0]
+                raise QueryTimeoutError(f'Query cancelled: {reason}') from e
+            raise
+        finally:
+            if watch is not None:
+                QueryCanceller.release(watch)
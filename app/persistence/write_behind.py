@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import atexit
+import dataclasses
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, TYPE_CHECKING
+
+from app.persistence.relationship import column_values
+
+if TYPE_CHECKING:
+    from app.persistence.repository import CrudRepository
+
+
+# --------------------------------------------------
+# WRITE-BEHIND
+# --------------------------------------------------
+class WriteBehindBuffer:
+    """Collects updates in memory and writes them with CrudRepository.update_many.
+
+    Updates of the same id_ are merged (later non-None values win), so a burst of
+    goal events for one player becomes a single row in the next batch. The buffer
+    is flushed every `flush_interval` seconds (after start()), when `max_pending`
+    ids are waiting and on close() / interpreter exit.
+
+    Buffered changes are lost if the process dies before a flush - use it only for
+    data that can be recomputed or tolerates a short window of loss.
+
+    The repository does not see buffered changes until they are flushed. Reads that
+    feed another update (e.g. goals + 1) must go through find_by_id / pending,
+    which merge the buffered values over the row - otherwise the increment starts
+    from a stale row and the buffered goals are lost.
+
+    After fork() the child gets an empty buffer (the parent flushes its own changes)
+    and restarts the flush thread on its first update.
+    """
+
+    def __init__(self, repository: CrudRepository, flush_interval: float = 1.0, max_pending: int = 500,
+                 clock: Callable[[], float] = time.monotonic):
+        self._repository = repository
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._clock = clock
+        self._pending: dict[int, Any] = {}
+        # Paczka zapisywana wlasnie przez flush() - do commitu jeszcze niewidoczna w bazie
+        self._flushing: dict[int, Any] = {}
+        self._lock = threading.Lock()
+        # Osobny lock na zapis - kolejne flush() nie wyprzedzaja sie w bazie
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_flush = clock()
+        self._restart = False
+        self.flushes = 0
+        self.coalesced = 0
+        _buffers.add(self)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __enter__(self) -> WriteBehindBuffer:
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def update(self, id_: int, item: Any) -> None:
+        if self._restart:
+            self._restart = False
+            self.start()
+        # Tu, a nie dopiero w flush - pusta zmiana wracalaby do bufora po kazdym nieudanym zapisie
+        self._repository._check_updated_values({id_: item})
+        with self._lock:
+            previous = self._pending.get(id_)
+            if previous is not None:
+                self.coalesced += 1
+                item = _merged(previous, item)
+            self._pending[id_] = item
+            full = len(self._pending) >= self._max_pending
+        if full:
+            self.flush()
+
+    def pending(self, id_: int) -> Any | None:
+        """Buffered (not yet committed) changes of `id_`, None when there are none."""
+        with self._lock:
+            flushing, pending = self._flushing.get(id_), self._pending.get(id_)
+        if flushing is not None and pending is not None:
+            return _merged(flushing, pending)
+        item = pending if pending is not None else flushing
+        return dataclasses.replace(item) if item is not None else None
+
+    def find_by_id(self, id_: int) -> Any | None:
+        """repository.find_by_id with the buffered changes of `id_` applied."""
+        item = self._repository.find_by_id(id_)
+        changes = self.pending(id_)
+        if item is None or changes is None:
+            return item
+        return _merged(item, changes)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+                self._last_flush = self._clock()
+            if not batch:
+                return 0
+            try:
+                self._repository.update_many(batch)
+            except Exception:
+                self._requeue(batch)
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            self.flushes += 1
+            logging.info(f'Write-behind flush of {len(batch)} rows into {self._repository._table_name()}')
+            return len(batch)
+
+    def start(self) -> WriteBehindBuffer:
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        self.flush()
+
+    def _run(self) -> None:
+        stopped = self._stopped
+        while not stopped.wait(self._flush_interval / 4):
+            if self._clock() - self._last_flush >= self._flush_interval:
+                try:
+                    self.flush()
+                except Exception:
+                    logging.exception('Write-behind flush failed, changes will be retried')
+
+    def _requeue(self, batch: dict[int, Any]) -> None:
+        # Zmiany, ktore przyszly w trakcie nieudanego zapisu, sa nowsze - nie nadpisujemy ich
+        with self._lock:
+            for id_, item in batch.items():
+                if id_ in self._pending:
+                    item = _merged(item, self._pending[id_])
+                self._pending[id_] = item
+
+    def _after_fork(self) -> None:
+        # Zmiany rodzica zapisze rodzic - dziecko zapisaloby je drugi raz
+        self._pending = {}
+        self._flushing = {}
+        # Locki mogly zostac skopiowane w stanie zablokowanym przez inny watek rodzica
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # Watek flush nie przezywa fork() - uruchamiamy go ponownie przy pierwszym update w dziecku
+        self._restart = self._thread is not None
+        self._thread = None
+        self._stopped = threading.Event()
+
+
+def _merged(item: Any, changes: Any) -> Any:
+    # Jak w update: wartosci None nie zmieniaja kolumny
+    return dataclasses.replace(item, **{field: value for field, value in column_values(changes).items()
+                                        if value is not None})
+
+
+_buffers: weakref.WeakSet[WriteBehindBuffer] = weakref.WeakSet()
+
+
+def _reset_buffers_after_fork() -> None:
+    for buffer in list(_buffers):
+        buffer._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_buffers_after_fork)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, TypeVar
+from contextlib import contextmanager
+
+from app.persistence.timeouts import QueryTimeoutError
+
+T = TypeVar('T')
+
+
+class OverloadedError(Exception):
+    """Raised instead of queueing when the service is over its admission limits."""
+
+
+@dataclass(frozen=True)
+class OperationClass:
+    name: str
+    # Mniejsza liczba = wazniejszy pas; wolne miejsce dostaje najpierw najwazniejszy czekajacy
+    priority: int
+    # Gorny limit rownoczesnych operacji tej klasy (niezaleznie od limitu wspolnego)
+    max_concurrency: int | None = None
+    # Oczekiwany czas operacji tej klasy (None - target_latency limitu)
+    target_latency: float | None = None
+    # Czy czasy tej klasy steruja limitem wspolnym - paczki importu sa z natury wolne
+    # i nie moga sciagac limitu zapytan uzytkownikow w dol
+    adaptive: bool = True
+
+
+# Zapytania uzytkownikow wyprzedzaja zapisy, a importy nigdy nie zajmuja wiecej niz jednego polaczenia
+DEFAULT_CLASSES = (
+    OperationClass('read', 0),
+    OperationClass('write', 1, target_latency=0.2),
+    OperationClass('bulk', 2, max_concurrency=1, adaptive=False),
+)
+
+
+@dataclass
+class AdaptiveLimit:
+    """AIMD concurrency limit driven by observed latency.
+
+    Each fast completion adds 1/limit (about +1 per round of `limit` operations),
+    each slow or timed out one multiplies the limit by `backoff`.
+    """
+    initial: int = 5
+    min_limit: int = 1
+    max_limit: int = 32
+    target_latency: float = 0.1
+    backoff: float = 0.9
+    limit: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.limit = float(self.initial)
+
+    @property
+    def current(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def record(self, latency: float, overloaded: bool = False, target_latency: float | None = None) -> None:
+        if overloaded or latency > (target_latency or self.target_latency):
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+
+@dataclass
+class AdmissionMetrics:
+    admitted: Counter[str] = field(default_factory=Counter)
+    rejected: Counter[str] = field(default_factory=Counter)
+    timed_out: Counter[str] = field(default_factory=Counter)
+
+
+class AdmissionController:
+    """Bounds concurrent service operations in front of the connection pool.
+
+    >>> admission = AdmissionController(AdaptiveLimit(initial=5, max_limit=5))
+    >>> with admission.admit('read'):
+    ...     team_repository.find_all()
+
+    At most `limit.current` operations run at once, each class also within its
+    own max_concurrency. The limit follows the latency of adaptive classes, each
+    measured against its own target. Waiting operations are admitted by priority (FIFO within
+    a class). When `max_queue` operations already wait, or a wait exceeds
+    `max_wait` seconds, OverloadedError is raised right away - callers fail fast
+    instead of piling up on the pool.
+    """
+
+    def __init__(self, limit: AdaptiveLimit | None = None, classes: tuple[OperationClass, ...] = DEFAULT_CLASSES,
+                 max_queue: int = 50, max_wait: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit or AdaptiveLimit()
+        self.metrics = AdmissionMetrics()
+        self._classes = {operation_class.name: operation_class for operation_class in classes}
+        self._max_queue = max_queue
+        self._max_wait = max_wait
+        self._clock = clock
+        self._running: Counter[str] = Counter()
+        self._waiting: deque[tuple[int, int, str]] = deque()
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._running.values())
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    @contextmanager
+    def admit(self, name: str) -> Iterator[None]:
+        operation_class = self._classes[name]
+        self._acquire(name)
+        started = self._clock()
+        overloaded = False
+        try:
+            yield
+        except QueryTimeoutError:
+            overloaded = True
+            raise
+        finally:
+            with self._condition:
+                if operation_class.adaptive:
+                    self.limit.record(self._clock() - started, overloaded, operation_class.target_latency)
+                self._running[name] -= 1
+                self._condition.notify_all()
+
+    def _acquire(self, name: str) -> None:
+        operation_class = self._classes[name]
+        with self._condition:
+            if not self._waiting and self._can_run(operation_class):
+                self._admitted(name)
+                return
+            if len(self._waiting) >= self._max_queue:
+                self.metrics.rejected[name] += 1
+                raise OverloadedError(f'Too many queued operations ({len(self._waiting)}), rejecting {name}')
+            self._sequence += 1
+            ticket = (operation_class.priority, self._sequence, name)
+            self._waiting.append(ticket)
+            deadline = self._clock() + self._max_wait
+            while self._next() != ticket or not self._can_run(operation_class):
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self.metrics.timed_out[name] += 1
+                    # Kolejny czekajacy mogl czekac tylko na nas
+                    self._condition.notify_all()
+                    raise OverloadedError(f'{name} waited more than {self._max_wait}s for admission')
+                self._condition.wait(remaining)
+            self._waiting.remove(ticket)
+            self._admitted(name)
+            self._condition.notify_all()
+
+    def _admitted(self, name: str) -> None:
+        self._running[name] += 1
+        self.metrics.admitted[name] += 1
+
+    def _can_run(self, operation_class: OperationClass) -> bool:
+        return (self.in_flight < self.limit.current
+                and (operation_class.max_concurrency is None
+                     or self._running[operation_class.name] < operation_class.max_concurrency))
+
+    def _next(self) -> tuple[int, int, str] | None:
+        # Najwazniejszy czekajacy, ktory moze ruszyc - klasa na swoim limicie nie blokuje pozostalych
+        runnable = [ticket for ticket in self._waiting if self._can_run(self._classes[ticket[2]])]
+        return min(runnable, default=None)
+
+
+def admitted(operation_class: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Run a service method through the service's admission controller, if it has one."""
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+            admission: AdmissionController | None = getattr(self, 'admission', None)
+            if admission is None:
+                return method(self, *args, **kwargs)
+            try:
+                with admission.admit(operation_class):
+                    return method(self, *args, **kwargs)
+            except OverloadedError:
+                logging.warning(f'{method.__qualname__} rejected by admission control')
+                raise
+        return wrapper
+    return decorator
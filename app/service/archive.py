@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+from app.persistence.repository import CrudRepository
+from app.persistence.retention import soft_delete_column_of
+
+
+@dataclass
+class ArchiveResult:
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class ArchiveJob:
+    """Moves old rows from a live table to its archive table in small batches.
+
+    Every batch is its own short transaction (see CrudRepository.archive_batch), so
+    the live table stays writable during e.g. a season rollover. `pause` between
+    batches gives replicas and the purge thread time to catch up.
+    """
+    repository: CrudRepository
+    batch_size: int = 1000
+    pause: float = 0.0
+    archive_table: str | None = None
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+
+    def run(self, condition: str, params: tuple[Any, ...] = (), max_batches: int | None = None) -> ArchiveResult:
+        result = ArchiveResult()
+        started = time.perf_counter()
+        while max_batches is None or result.batches < max_batches:
+            moved = self.repository.archive_batch(condition, params, self.batch_size, self.archive_table)
+            if moved == 0:
+                break
+            result.rows += moved
+            result.batches += 1
+            logging.info(f'Archived batch {result.batches} ({result.rows} rows) from {self.repository._table_name()}')
+            if moved < self.batch_size:
+                break
+            if self.pause:
+                self.sleep(self.pause)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def archive_deleted(self, older_than: datetime, max_batches: int | None = None) -> ArchiveResult:
+        """Archive rows soft deleted before `older_than`."""
+        column = soft_delete_column_of(self.repository._entity)
+        if column is None:
+            raise ValueError(f'{self.repository._entity.__name__} has no soft delete column')
+        return self.run(f'{column} < %s', (older_than,), max_batches)
@@ -0,0 +1,181 @@
+import csv
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, fields
+from itertools import islice
+from pathlib import Path
+from types import UnionType
+from typing import Any, Iterable, Iterator, get_args, get_type_hints
+
+from app.persistence.relationship import column_names, column_values, is_column
+from app.persistence.repository import CrudRepository
+from app.service.admission import AdmissionController, admitted
+
+
+# --------------------------------------------------
+# READERS
+# --------------------------------------------------
+def read_csv(path: str | Path) -> Iterator[dict[str, Any]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def read_ndjson(path: str | Path) -> Iterator[dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_rows(path: str | Path) -> Iterator[dict[str, Any]]:
+    return read_ndjson(path) if Path(path).suffix in ('.ndjson', '.jsonl') else read_csv(path)
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# --------------------------------------------------
+# ROW -> ENTITY
+# --------------------------------------------------
+def to_entity(entity: Any, row: dict[str, Any]) -> Any:
+    """Validate a raw row (CSV strings or NDJSON values) and convert it into an entity."""
+    hints = get_type_hints(entity)
+    columns = [f.name for f in fields(entity) if is_column(f)]
+    unknown = set(row) - set(columns)
+    if unknown:
+        raise ValueError(f'Unknown columns: {", ".join(sorted(unknown))}')
+
+    values: dict[str, Any] = {}
+    for column in columns:
+        if column not in row:
+            continue
+        value = row[column]
+        if value is None or value == '':
+            values[column] = None
+            continue
+        types = get_args(hints[column]) if isinstance(hints[column], UnionType) else (hints[column],)
+        values[column] = int(value) if int in types else value
+
+    item = entity(**values)
+    if getattr(item, 'name', '') is None:
+        raise ValueError('Name is required')
+    return item
+
+
+# --------------------------------------------------
+# CHECKPOINT
+# --------------------------------------------------
+@dataclass
+class Checkpoint:
+    """Number of input rows already written, persisted after every committed batch."""
+    path: str | Path
+
+    def load(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as f:
+            return int(json.load(f)['rows'])
+
+    def save(self, rows: int) -> None:
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': rows}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# --------------------------------------------------
+# IMPORT / EXPORT
+# --------------------------------------------------
+@dataclass
+class ImportResult:
+    rows: int = 0
+    batches: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class BulkImporter:
+    """Streams a CSV/NDJSON file into a repository in bounded batches.
+
+    Rows are pulled from the file only after the previous batch has been committed,
+    so at most `batch_size` rows are held in memory and a slow database naturally
+    slows down the reader.
+    """
+    repository: CrudRepository
+    batch_size: int = 1000
+    use_load_data: bool = False
+    checkpoint: Checkpoint | None = None
+    # Kazda paczka przechodzi przez pas 'bulk' - przy obciazeniu ustepuje zapytaniom uzytkownikow
+    admission: AdmissionController | None = None
+
+    def import_file(self, path: str | Path) -> ImportResult:
+        done = self.checkpoint.load() if self.checkpoint else 0
+        result = ImportResult(skipped=done)
+        rows = islice(read_rows(path), done, None)
+        for batch in batched(rows, self.batch_size):
+            items = [to_entity(self.repository._entity, row) for row in batch]
+            self._write(items)
+            done += len(items)
+            result.rows += len(items)
+            result.batches += 1
+            if self.checkpoint:
+                self.checkpoint.save(done)
+            logging.info(f'Imported batch {result.batches} ({done} rows) into {self.repository._table_name()}')
+        if self.checkpoint:
+            self.checkpoint.clear()
+        return result
+
+    @admitted('bulk')
+    def _write(self, items: list[Any]) -> None:
+        if not self.use_load_data:
+            # Dane z pliku sa niezaufane - tylko parametry, nigdy wartosci sklejane w SQL
+            self.repository.insert_batch(items)
+            return
+        # Z id_ jak w insert_batch - ponowny import eksportu zachowuje id i odwolania players.team_id.
+        # Wiersze bez id dostaja je z alokatora repozytorium albo z auto_increment (\N).
+        self.repository._assign_ids(items)
+        columns = CrudRepository._insert_columns_of(self.repository._entity, with_id=True)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            for item in items:
+                values = column_values(item)
+                writer.writerow(['\\N' if values[column] is None else values[column] for column in columns])
+        try:
+            loaded = self.repository.load_data(f.name, with_id=True)
+        finally:
+            os.remove(f.name)
+        if loaded != len(items):
+            # Checkpoint i ImportResult nie moga liczyc wierszy pominietych przez LOAD DATA
+            raise ValueError(f'LOAD DATA loaded {loaded} of {len(items)} rows')
+
+
+@dataclass
+class BulkExporter:
+    """Streams a whole table into a CSV/NDJSON file through a server-side cursor."""
+    repository: CrudRepository
+    batch_size: int = 1000
+
+    def export_file(self, path: str | Path) -> int:
+        rows = 0
+        columns = column_names(self.repository._entity)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if Path(path).suffix in ('.ndjson', '.jsonl'):
+                for item in self.repository.iter_all(self.batch_size):
+                    f.write(json.dumps(column_values(item)) + '\n')
+                    rows += 1
+            else:
+                writer = csv.DictWriter(f, fieldnames=columns, lineterminator='\n')
+                writer.writeheader()
+                for item in self.repository.iter_all(self.batch_size):
+                    writer.writerow(column_values(item))
+                    rows += 1
+        return rows
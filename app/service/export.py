@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TYPE_CHECKING
+
+from app.persistence.model import Player, Team
+from app.persistence.relationship import column_names
+from app.persistence.repository import CrudRepository
+from app.persistence.retention import id_ranges
+
+if TYPE_CHECKING:
+    from app.persistence.connection import ConnectionPool
+
+
+@dataclass
+class ExportChunk:
+    table: str
+    file: str
+    first_id: int
+    last_id: int
+    rows: int = 0
+    sha256: str = ''
+
+
+@dataclass
+class ExportManifest:
+    started_at: str
+    seconds: float = 0.0
+    # Liczba wierszy kazdej tabeli w snapshocie
+    tables: dict[str, int] = field(default_factory=dict)
+    chunks: list[ExportChunk] = field(default_factory=list)
+
+    def write(self, path: str | Path) -> None:
+        # Manifest zapisywany na koncu i atomowo - jego obecnosc oznacza kompletny eksport
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class SnapshotExporter:
+    """Exports whole tables in parallel from one point in time.
+
+    Every worker holds a pooled connection with START TRANSACTION WITH CONSISTENT
+    SNAPSHOT. With `lock_tables` the snapshots are opened while an extra connection
+    holds `lock tables ... read`, so no write commits in between and all workers
+    see the same state (teams and players agree). The lock is held only for the
+    moment it takes to open the snapshots.
+
+    Tables are split into id_ ranges of `chunk_rows` ids; each range is streamed
+    to its own gzip NDJSON file. `manifest.json` lists files, row counts and
+    sha256 checksums. Use a pool with long read timeouts (the 'bulk' profile).
+    """
+    connection_pool: ConnectionPool
+    directory: str | Path
+    entities: tuple[Any, ...] = (Team, Player)
+    chunk_rows: int = 100000
+    workers: int | None = None
+    lock_tables: bool = True
+    batch_size: int = 10000
+
+    def worker_count(self) -> int:
+        # Przy lock_tables jedno polaczenie z puli trzyma blokade tabel
+        available = self.connection_pool.pool_size - (1 if self.lock_tables else 0)
+        if available < 1:
+            raise ValueError('Snapshot export with lock_tables needs a pool of at least 2 connections')
+        return max(1, min(self.workers or available, available))
+
+    def export(self) -> ExportManifest:
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        manifest = ExportManifest(started_at=datetime.now(timezone.utc).isoformat())
+        tables = [CrudRepository._table_name_of(entity) for entity in self.entities]
+
+        pool: Any = self.connection_pool
+        with contextlib.ExitStack() as stack:
+            connections = [stack.enter_context(pool.get_connection()) for _ in range(self.worker_count())]
+            if self.lock_tables:
+                lock_connection = stack.enter_context(pool.get_connection())
+                self._open_snapshots_locked(lock_connection, connections, tables)
+            else:
+                for conn in connections:
+                    SnapshotExporter._open_snapshot(conn)
+            try:
+                for table in tables:
+                    manifest.chunks += self._plan(connections[0], table)
+                self._write_chunks(connections, manifest.chunks, dict(zip(tables, self.entities)))
+            finally:
+                for conn in connections:
+                    with contextlib.suppress(Exception):
+                        conn.rollback()
+
+        for table in tables:
+            manifest.tables[table] = sum(chunk.rows for chunk in manifest.chunks if chunk.table == table)
+        manifest.seconds = time.perf_counter() - started
+        manifest.write(directory / 'manifest.json')
+        logging.info(f'Exported {manifest.tables} in {len(manifest.chunks)} chunks, {manifest.seconds:.1f}s')
+        return manifest
+
+    def _open_snapshots_locked(self, lock_connection: Any, connections: list[Any], tables: list[str]) -> None:
+        lock_cursor = lock_connection.cursor()
+        lock_cursor.execute(f'lock tables {", ".join(f"{table} read" for table in tables)}')
+        try:
+            for conn in connections:
+                SnapshotExporter._open_snapshot(conn)
+        finally:
+            lock_cursor.execute('unlock tables')
+
+    @staticmethod
+    def _open_snapshot(conn: Any) -> None:
+        conn.cursor().execute('start transaction with consistent snapshot, read only')
+
+    def _plan(self, conn: Any, table: str) -> list[ExportChunk]:
+        cursor = conn.cursor()
+        cursor.execute(f'select min(id_), max(id_) from {table}')
+        min_id, max_id = cursor.fetchone() or (None, None)
+        if min_id is None or max_id is None:
+            return []
+        return [
+            ExportChunk(table, f'{table}.{number:05d}.ndjson.gz', start, end)
+            for number, (start, end) in enumerate(id_ranges(int(min_id), int(max_id), self.chunk_rows))
+        ]
+
+    def _write_chunks(self, connections: list[Any], chunks: list[ExportChunk], entities: dict[str, Any]) -> None:
+        pending: queue.Queue[ExportChunk] = queue.Queue()
+        for chunk in chunks:
+            pending.put(chunk)
+        failed = threading.Event()
+
+        def work(conn: Any) -> None:
+            while not failed.is_set():
+                try:
+                    chunk = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._write_chunk(conn, chunk, column_names(entities[chunk.table]))
+                except Exception:
+                    failed.set()
+                    raise
+
+        with ThreadPoolExecutor(max_workers=len(connections), thread_name_prefix='export') as executor:
+            futures = [executor.submit(work, conn) for conn in connections]
+            for future in futures:
+                future.result()
+
+    def _write_chunk(self, conn: Any, chunk: ExportChunk, columns: list[str]) -> None:
+        path = Path(self.directory) / chunk.file
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(f'select {", ".join(columns)} from {chunk.table} '
+                       f'where id_ between {chunk.first_id} and {chunk.last_id} order by id_')
+        # mtime=0 - ten sam snapshot daje identyczne pliki (i sumy kontrolne)
+        with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            while rows := cursor.fetchmany(self.batch_size):
+                f.write(''.join(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in rows).encode())
+                chunk.rows += len(rows)
+        with open(path, 'rb') as f:
+            chunk.sha256 = hashlib.file_digest(f, 'sha256').hexdigest()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Iterable, TYPE_CHECKING
+
+from app.persistence.connection import LazyConnectionPool, PinnedConnectionPool
+from app.persistence.repository import PlayerRepository, TeamRepository
+from app.service.dto import CreatePlayerWithTeamDto
+from app.service.players_with_teams import PlayersWithTeamsService
+
+if TYPE_CHECKING:
+    from mysql.connector.pooling import MySQLConnectionPool
+
+
+@dataclass
+class WorkerStats:
+    worker: int
+    items: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class ParallelImportResult:
+    # Id wstawionych graczy w kolejnosci wejsciowej
+    ids: list[int] = field(default_factory=list)
+    stats: list[WorkerStats] = field(default_factory=list)
+
+
+@dataclass
+class ParallelPlayerImporter:
+    """Imports CreatePlayerWithTeamDto items with several workers, each on its own pooled connection.
+
+    The number of workers never exceeds the pool size. Chunks go through a bounded
+    queue, so the producer blocks when the writers fall behind.
+
+    Workers write through copies of `player_repository` / `team_repository` (CrudRepository.on_pool),
+    so team_stats, query cache invalidation, retries and timeouts configured on them also apply
+    to imported rows. Without them workers use bare repositories.
+    """
+    # Potrzebne pool_size - pula z rejestru (profil 'bulk') jest leniwa
+    connection_pool: MySQLConnectionPool | LazyConnectionPool
+    workers: int | None = None
+    chunk_size: int = 100
+    queue_size_per_worker: int = 2
+    player_repository: PlayerRepository | None = None
+    team_repository: TeamRepository | None = None
+
+    def worker_count(self) -> int:
+        pool_size = self.connection_pool.pool_size
+        workers = self.workers or pool_size
+        if workers > pool_size:
+            logging.warning(f'Requested {workers} workers but pool has only {pool_size} connections')
+        return max(1, min(workers, pool_size))
+
+    def import_players(self, dtos: Iterable[CreatePlayerWithTeamDto]) -> ParallelImportResult:
+        workers = self.worker_count()
+        chunks: queue.Queue[tuple[int, list[CreatePlayerWithTeamDto]] | None] = queue.Queue(
+            maxsize=workers * self.queue_size_per_worker)
+        results: dict[int, list[int]] = {}
+        errors: list[Exception] = []
+        lock = threading.Lock()
+        stats = [WorkerStats(worker) for worker in range(workers)]
+
+        def work(worker_stats: WorkerStats) -> None:
+            with self.connection_pool.get_connection() as conn:
+                pinned_pool: Any = PinnedConnectionPool(conn)
+                player_repository = (self.player_repository.on_pool(pinned_pool) if self.player_repository
+                                     else PlayerRepository(pinned_pool))
+                team_repository = (self.team_repository.on_pool(pinned_pool) if self.team_repository
+                                   else TeamRepository(pinned_pool))
+                service = PlayersWithTeamsService(player_repository, team_repository)
+                while (chunk := chunks.get()) is not None:
+                    number, items = chunk
+                    if errors:
+                        # Po bledzie tylko oprozniamy kolejke, zeby producent sie nie zablokowal
+                        continue
+                    start = time.perf_counter()
+                    try:
+                        ids = [service.add_player_with_team(dto) for dto in items]
+                    except Exception as e:
+                        with lock:
+                            errors.append(e)
+                        continue
+                    worker_stats.seconds += time.perf_counter() - start
+                    worker_stats.items += len(items)
+                    worker_stats.chunks += 1
+                    with lock:
+                        results[number] = ids
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import') as executor:
+            futures = [executor.submit(work, worker_stats) for worker_stats in stats]
+
+            def put(item: tuple[int, list[CreatePlayerWithTeamDto]] | None) -> bool:
+                # False - wszyscy pracownicy padli (np. brak polaczenia) i nikt nie odbierze
+                while True:
+                    try:
+                        chunks.put(item, timeout=0.1)
+                        return True
+                    except queue.Full:
+                        if all(future.done() for future in futures):
+                            return False
+
+            try:
+                iterator = iter(dtos)
+                number = 0
+                # Po bledzie pracownika nie czytamy reszty wejscia
+                while not errors and (chunk := list(islice(iterator, self.chunk_size))):
+                    if not put((number, chunk)):
+                        break
+                    number += 1
+            except Exception as e:
+                # Blad zrodla danych - pracownicy tylko oprozniaja kolejke
+                with lock:
+                    errors.append(e)
+                raise
+            finally:
+                # Sentinel dla kazdego pracownika zawsze - inaczej wyjscie z executora czeka na nich w nieskonczonosc.
+                # Bez wyjatku tutaj, zeby nie przykryc oryginalnego bledu.
+                for _ in futures:
+                    if not put(None):
+                        break
+            # Blad pracownika poza obsluga paczek (np. get_connection)
+            for future in futures:
+                future.result()
+
+        if errors:
+            raise errors[0]
+        for worker_stats in stats:
+            logging.info(f'Import worker {worker_stats.worker}: {worker_stats.items} items, '
+                         f'{worker_stats.items_per_second:.1f} items/s')
+        return ParallelImportResult(
+            ids=[id_ for number in sorted(results) for id_ in results[number]],
+            stats=stats
+        )
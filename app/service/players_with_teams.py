@@ -1,15 +1,19 @@
 import logging
 
 from app.persistence.model import Player, Team
-from app.persistence.repository import PlayerRepository, TeamRepository
+from app.persistence.repository import PlayerRepositoryProtocol, TeamRepositoryProtocol
+from app.service.admission import AdmissionController, admitted
 from app.service.dto import CreatePlayerWithTeamDto
 from dataclasses import dataclass
 
 @dataclass
 class PlayersWithTeamsService:
-    player_repository: PlayerRepository
-    team_repository: TeamRepository
+    # CrudRepository (MySQL) albo MemoryCrudRepository - wystarczy wspolny interfejs
+    player_repository: PlayerRepositoryProtocol
+    team_repository: TeamRepositoryProtocol
+    admission: AdmissionController | None = None
 
+    @admitted('write')
     def add_player_with_team(self, createPlayerWithTeamDto: CreatePlayerWithTeamDto) -> int:
         team = self.team_repository.find_by_name(createPlayerWithTeamDto.team_name)
         if not team:
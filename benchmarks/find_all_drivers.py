@@ -0,0 +1,37 @@
+# Porownanie find_all dla kombinacji sterownika (C extension / pure Python) i kursora.
+# Wymaga dzialajacej bazy (docker compose up mysql) - dane w tabeli players musza juz istniec.
+# Uruchomienie: pipenv run python -m benchmarks.find_all_drivers [powtorzenia]
+import sys
+import time
+from typing import Any, Callable
+
+from app.persistence.connection import MySQLConnectionPoolBuilder, c_extension_available
+from app.persistence.repository import PlayerRepository
+
+
+def measure(name: str, repeat: int, read: Callable[[], list[Any]]) -> None:
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(read())
+        best = min(best, time.perf_counter() - start)
+    print(f'{name:<45} {best:8.3f} s  {rows / best:12,.0f} rows/s')
+
+
+def main() -> None:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    drivers = [True, False] if c_extension_available() else [True]
+    for use_pure in drivers:
+        driver = 'pure' if use_pure else 'cext'
+        pool = MySQLConnectionPoolBuilder.from_env().pool_name(f'bench_{driver}').pool_size(1).use_pure(use_pure).build()
+        repository = PlayerRepository(pool)
+        measure(f'{driver}: find_all (buffered cursor)', repeat, repository.find_all)
+        measure(f'{driver}: list(iter_all) (unbuffered cursor)', repeat, lambda: list(repository.iter_all(10000)))
+        repository.raw_reads()
+        measure(f'{driver}: find_all (raw cursor + mapper)', repeat, repository.find_all)
+        measure(f'{driver}: list(iter_all) (raw, unbuffered)', repeat, lambda: list(repository.iter_all(10000)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Porownanie mapowania wierszy na encje: dotychczasowe Player(*row) vs wygenerowany mapper.
+# Uruchomienie: pipenv run python -m benchmarks.row_mapping [liczba_wierszy]
+import sys
+import time
+from typing import Any, Callable
+from decimal import Decimal
+
+from mysql.connector.constants import FieldType
+
+from app.persistence.mapper import map_rows
+from app.persistence.model import Player, TeamGoalsView
+
+
+class Cursor:
+    def __init__(self, description: list[tuple]):
+        self.description = description
+
+
+def measure(name: str, rows: list[tuple], convert: Callable[[list[tuple]], list[Any]]) -> None:
+    start = time.perf_counter()
+    result = convert(rows)
+    elapsed = time.perf_counter() - start
+    print(f'{name:<40} {elapsed:8.3f} s  {len(result) / elapsed:12,.0f} rows/s')
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = [(i, f'Player {i}', i % 40, i % 20 + 1) for i in range(count)]
+    description = [(name, FieldType.LONG) for name in ('id_', 'name', 'goals', 'team_id')]
+
+    measure('[Player(*row) for row in rows]', rows, lambda rows: [Player(*row) for row in rows])
+    measure('map_rows(Player)', rows, lambda rows: map_rows(Player, Cursor(description), rows))
+    shuffled = [(row[3], row[2], row[1], row[0]) for row in rows]
+    shuffled_description = list(reversed(description))
+    measure('map_rows(Player), columns reordered', shuffled,
+            lambda rows: map_rows(Player, Cursor(shuffled_description), rows))
+
+    goals_rows = [(i, f'Team {i}', Decimal(i % 100)) for i in range(count)]
+    goals_description = [('team_id', FieldType.LONG), ('team_name', FieldType.VAR_STRING),
+                         ('goals', FieldType.NEWDECIMAL)]
+    measure('TeamGoalsView(id, name, int(goals))', goals_rows,
+            lambda rows: [TeamGoalsView(row[0], row[1], int(row[2]) if row[2] is not None else 0) for row in rows])
+    measure('map_rows(TeamGoalsView)', goals_rows, lambda rows: map_rows(TeamGoalsView, Cursor(goals_description), rows))
+
+
+if __name__ == '__main__':
+    main()
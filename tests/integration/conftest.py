@@ -1,25 +1,55 @@
+from typing import Iterator
 import pytest
 from mysql.connector.pooling import MySQLConnectionPool
-from app.persistence.connection import MySQLConnectionPoolBuilder, create_tables, drop_tables
+from app.persistence.configuration import registry
+from app.persistence.connection import MySQLConnectionPoolBuilder, PinnedConnectionPool
+from app.persistence.repository import PlayerRepository, PlayerWithTeamRepository, TeamRepository
+from app.persistence.testing import create_test_schema, drop_test_schema, rollback_transaction, worker_schema
 
 
 @pytest.fixture(scope="session")
-def test_database_pool() -> MySQLConnectionPool:
-    """Create a test database connection pool for integration tests."""
-    pool = MySQLConnectionPoolBuilder.builder().database("test_db").build()
-    return pool
+def test_database_pool() -> Iterator[MySQLConnectionPool]:
+    """Create the test schema once per session (one per xdist worker) and a pool bound to it."""
+    schema = worker_schema("test_db")
+    pool = create_test_schema(MySQLConnectionPoolBuilder.builder(), schema)
+    yield pool
+    drop_test_schema(pool, schema)
 
 
 @pytest.fixture(scope="function")
-def clean_database(test_database_pool: MySQLConnectionPool):
-    """Ensure clean database state for each test."""
-    # Setup: Create tables
-    create_tables(test_database_pool)
-    
-    yield test_database_pool
-    
-    # Teardown: Drop tables
-    drop_tables(test_database_pool)
+def clean_database(test_database_pool: MySQLConnectionPool) -> Iterator[PinnedConnectionPool]:
+    """Run the test in a transaction that is rolled back afterwards.
+
+    Repositories from the registry use the same pinned connection, so they see
+    the test's own writes and leave nothing behind.
+    """
+    with rollback_transaction(test_database_pool) as pinned_pool:
+        registry.use_pool(pinned_pool)
+        try:
+            yield pinned_pool
+        finally:
+            registry.reset()
+
+
+@pytest.fixture
+def team_repository(clean_database: PinnedConnectionPool) -> TeamRepository:
+    """Team repository bound to the test transaction."""
+    repository: TeamRepository = registry.get("team_repository")
+    return repository
+
+
+@pytest.fixture
+def player_repository(clean_database: PinnedConnectionPool) -> PlayerRepository:
+    """Player repository bound to the test transaction."""
+    repository: PlayerRepository = registry.get("player_repository")
+    return repository
+
+
+@pytest.fixture
+def player_with_team_repository(clean_database: PinnedConnectionPool) -> PlayerWithTeamRepository:
+    """Player with team repository bound to the test transaction."""
+    repository: PlayerWithTeamRepository = registry.get("player_with_team_repository")
+    return repository
 
 
 @pytest.fixture
@@ -1,14 +1,17 @@
+from typing import Any
 import pytest
 from mysql.connector.pooling import MySQLConnectionPool
-from app.persistence.configuration import team_repository, player_repository, player_with_team_repository
-from app.persistence.model import Team, Player
+from app.persistence.configuration import registry
+from app.persistence.model import Team, Player, TeamStats
+from app.persistence.reporting import ReportingRepository
+from app.persistence.repository import PlayerRepository, PlayerWithTeamRepository, TeamRepository
 
 
 @pytest.mark.skip(reason="Integration tests require actual MySQL server connection")
 class TestIntegration:
     """Integration tests for the complete application flow."""
     
-    def test_team_crud_operations(self, clean_database: MySQLConnectionPool):
+    def test_team_crud_operations(self, clean_database: MySQLConnectionPool, team_repository: TeamRepository) -> None:
         """Test complete CRUD operations for teams."""
         # Create a team
         team = Team(name="Test Team", points=10)
@@ -38,7 +41,8 @@ class TestIntegration:
         deleted_team = team_repository.find_by_id(team_id)
         assert deleted_team is None
     
-    def test_player_crud_operations(self, clean_database: MySQLConnectionPool):
+    def test_player_crud_operations(self, clean_database: MySQLConnectionPool, team_repository: TeamRepository,
+                                    player_repository: PlayerRepository) -> None:
         """Test complete CRUD operations for players."""
         # First create a team (required for foreign key)
         team = Team(name="Test Team", points=10)
@@ -73,7 +77,10 @@ class TestIntegration:
         deleted_player = player_repository.find_by_id(player_id)
         assert deleted_player is None
     
-    def test_player_with_team_view(self, clean_database: MySQLConnectionPool, sample_teams_data, sample_players_data):
+    def test_player_with_team_view(self, clean_database: MySQLConnectionPool, sample_teams_data: list[dict[str, Any]],
+                                   sample_players_data: list[dict[str, Any]], team_repository: TeamRepository,
+                                   player_repository: PlayerRepository,
+                                   player_with_team_repository: PlayerWithTeamRepository) -> None:
         """Test the player with team view integration."""
         # Create teams
         team_ids = []
@@ -94,7 +101,8 @@ class TestIntegration:
         # This test would need to be updated once the method is properly implemented
         assert isinstance(players_with_teams, list)
     
-    def test_team_points_filtering(self, clean_database: MySQLConnectionPool, sample_teams_data):
+    def test_team_points_filtering(self, clean_database: MySQLConnectionPool, sample_teams_data: list[dict[str, Any]],
+                                   team_repository: TeamRepository) -> None:
         """Test filtering teams by points range."""
         # Create teams
         for team_data in sample_teams_data:
@@ -111,3 +119,32 @@ class TestIntegration:
         assert "Team A" in team_names
         assert "Team B" in team_names
         assert "Team C" not in team_names  # Team C has 8 points
+
+    def test_teams_ranked_by_league_position(self, clean_database: MySQLConnectionPool,
+                                             team_repository: TeamRepository) -> None:
+        """Test that positions are league positions when the points range excludes the top team."""
+        team_repository.insert_many([Team(name="Top", points=30), Team(name="Team A", points=10),
+                                     Team(name="Team B", points=15), Team(name="Team C", points=8)])
+        reporting = ReportingRepository(clean_database)
+
+        ranking = reporting.teams_ranked_by_points(10, 20)
+
+        assert [(view.position, view.team_name) for view in ranking] == [(2, "Team B"), (3, "Team A")]
+
+    def test_team_stats_maintained_by_player_writes(self, clean_database: MySQLConnectionPool,
+                                                    team_repository: TeamRepository,
+                                                    player_repository: PlayerRepository) -> None:
+        """Test that team_stats follows inserts, updates and deletes of players."""
+        stats = registry.get("team_stats")
+        player_repository.with_summary(stats)
+        team_a = team_repository.insert(Team(name="Team A", points=10))
+        team_b = team_repository.insert(Team(name="Team B", points=5))
+        player_repository.insert_many([Player(name="P1", goals=5, team_id=team_a), Player(name="P2", goals=3, team_id=team_a)])
+        moved = player_repository.insert(Player(name="P3", goals=7, team_id=team_a))
+
+        player_repository.update(moved, Player(goals=9, team_id=team_b))
+        player_repository.delete(player_repository.find_all_by_team(team_a)[0].id_)
+
+        assert stats.find(team_a) == TeamStats(team_a, 1, 3)
+        assert stats.find(team_b) == TeamStats(team_b, 1, 9)
+        assert stats.check() == []
@@ -0,0 +1,118 @@
+import pytest
+from unittest.mock import Mock, MagicMock
+from mysql.connector import errors
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.batch import QueryBatch
+from app.persistence.model import Player, Team
+from app.persistence.repository import PlayerRepository, TeamRepository
+from app.persistence.team_index import TeamIndex
+
+TEAM_DESCRIPTION = [('id_', 3), ('name', 253), ('points', 3)]
+PLAYER_DESCRIPTION = [('id_', 3), ('name', 253), ('goals', 3), ('team_id', 3)]
+
+
+class TestQueryBatch:
+    """Tests for QueryBatch."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.team_repository = TeamRepository(self.mock_pool)
+        self.player_repository = PlayerRepository(self.mock_pool)
+
+    def result_sets(self, *sets):
+        """Make fetchall / description follow nextset() through the given (description, rows) sets."""
+        position = {'set': 0}
+
+        def nextset():
+            position['set'] += 1
+            self.mock_cursor.description = sets[position['set']][0]
+            return True
+
+        self.mock_cursor.description = sets[0][0]
+        self.mock_cursor.nextset.side_effect = nextset
+        self.mock_cursor.fetchall.side_effect = lambda: sets[position['set']][1]
+
+    def test_single_round_trip(self):
+        """Test that all queued finders are sent as one multi-statement request."""
+        self.result_sets(
+            (TEAM_DESCRIPTION, [(1, "Team A", 10)]),
+            (PLAYER_DESCRIPTION, [(5, "Ann", 3, 1)]),
+            (PLAYER_DESCRIPTION, [(5, "Ann", 3, 1), (6, "Bob", 0, 1)]),
+        )
+        batch = QueryBatch(self.mock_pool)
+
+        team = batch.submit(self.team_repository.find_by_name, "Team A")
+        player = batch.submit(self.player_repository.find_by_id, 5)
+        players = batch.submit(self.player_repository.find_all_by_team, 1)
+        batch.execute()
+
+        assert team.result() == Team(1, "Team A", 10)
+        assert player.result() == (5, "Ann", 3, 1)
+        assert [p.name for p in players.result()] == ["Ann", "Bob"]
+        self.mock_cursor.execute.assert_called_once_with(
+            "select * from teams t where t.name = %s;\n"
+            "select * from players where id_=5;\n"
+            "select * from players p where p.team_id = %s order by p.id_",
+            ("Team A", 1)
+        )
+        assert self.mock_pool.get_connection.call_count == 1
+
+    def test_pinned_connection_mode(self):
+        """Test sequential execution on one connection without multi statements."""
+        self.mock_cursor.description = PLAYER_DESCRIPTION
+        self.mock_cursor.fetchall.side_effect = [[(5, "Ann", 3, 1)], []]
+
+        with QueryBatch(self.mock_pool, multi_statement=False) as batch:
+            found = batch.submit(self.player_repository.find_by_id, 5)
+            missing = batch.submit(self.player_repository.find_by_id, 6)
+
+        assert found.result() == (5, "Ann", 3, 1)
+        assert missing.result() is None
+        assert self.mock_cursor.execute.call_count == 2
+        assert self.mock_pool.get_connection.call_count == 1
+
+    def test_error_fails_all_pending_futures(self):
+        """Test that a failed request propagates to every future."""
+        self.mock_cursor.execute.side_effect = errors.ProgrammingError(msg="Syntax", errno=1064)
+        batch = QueryBatch(self.mock_pool)
+        first = batch.submit(self.team_repository.find_all)
+        second = batch.submit(self.player_repository.find_page, 0, 10)
+
+        with pytest.raises(errors.ProgrammingError):
+            batch.execute()
+
+        assert isinstance(first.exception(), errors.ProgrammingError)
+        assert isinstance(second.exception(), errors.ProgrammingError)
+
+    def test_indexed_finder_resolved_without_query(self):
+        """Test that finders answered from the team index need no SQL."""
+        self.mock_cursor.description = TEAM_DESCRIPTION
+        self.mock_cursor.fetchall.return_value = [(1, "Team A", 10)]
+        TeamIndex(self.team_repository).attach()
+        batch = QueryBatch(self.mock_pool)
+
+        team = batch.submit(self.team_repository.find_by_name, "Team A")
+
+        assert team.result() == Team(1, "Team A", 10)
+        assert len(batch) == 0
+
+    def test_only_finders_can_be_batched(self):
+        """Test that writes are rejected."""
+        with pytest.raises(ValueError):
+            QueryBatch(self.mock_pool).submit(self.team_repository.delete, 1)
+
+    def test_empty_batch(self):
+        """Test that an empty batch does not check out a connection."""
+        QueryBatch(self.mock_pool).execute()
+
+        self.mock_pool.get_connection.assert_not_called()
@@ -0,0 +1,102 @@
+from app.persistence.cache import TtlCache, QueryCache
+
+
+class TestTtlCache:
+    """Tests for TtlCache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.now = 100.0
+        self.cache = TtlCache(10, clock=lambda: self.now)
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return [self.loads]
+
+    def test_value_is_cached_within_ttl(self):
+        """Test that a second lookup within ttl does not reload."""
+        assert self.cache.get_or_load('key', self.load) == [1]
+        self.now += 9
+        assert self.cache.get_or_load('key', self.load) == [1]
+        assert self.loads == 1
+
+    def test_value_expires_after_ttl(self):
+        """Test that an expired entry is reloaded."""
+        self.cache.get_or_load('key', self.load)
+        self.now += 10
+        assert self.cache.get_or_load('key', self.load) == [2]
+
+    def test_expired_entries_dropped_on_write(self):
+        """Test that writing a new key removes entries past their ttl."""
+        self.cache.get_or_load('old', self.load)
+        self.now += 10
+        self.cache.get_or_load('new', self.load)
+
+        assert len(self.cache) == 1
+
+    def test_number_of_entries_is_bounded(self):
+        """Test that the entry closest to expiring is evicted above max_entries."""
+        cache = TtlCache(10, clock=lambda: self.now, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.get_or_load(key, self.load)
+            self.now += 1
+
+        assert len(cache) == 2
+        assert cache.get_or_load('a', self.load) == [4]
+        assert cache.get_or_load('c', self.load) == [3]
+
+    def test_clear(self):
+        """Test that clear drops all entries."""
+        self.cache.get_or_load('key', self.load)
+        self.cache.clear()
+        self.cache.get_or_load('key', self.load)
+        assert self.loads == 2
+
+
+class TestQueryCache:
+    """Tests for QueryCache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.cache = QueryCache()
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return [self.loads]
+
+    def test_key_uses_normalized_statement_and_parameters(self):
+        """Test that whitespace differences share an entry but parameters do not."""
+        self.cache.get_or_load('select *  from teams\n where id_=%s;', (1,), ('teams',), self.load)
+        self.cache.get_or_load('select * from teams where id_=%s', (1,), ('teams',), self.load)
+        self.cache.get_or_load('select * from teams where id_=%s', (2,), ('teams',), self.load)
+
+        assert self.loads == 2
+
+    def test_invalidation_is_per_table(self):
+        """Test that bumping one table evicts only queries touching it."""
+        self.cache.get_or_load('select * from teams', (), ('teams',), self.load)
+        self.cache.get_or_load('select * from players', (), ('players',), self.load)
+
+        self.cache.invalidate('players')
+
+        assert self.cache.get_or_load('select * from teams', (), ('teams',), self.load) == [1]
+        assert self.cache.get_or_load('select * from players', (), ('players',), self.load) == [3]
+
+    def test_size_based_eviction(self):
+        """Test that least recently used entries are evicted above max_bytes."""
+        cache = QueryCache(max_bytes=2500)
+
+        for i in range(10):
+            cache.get_or_load('q', (i,), ('t',), lambda: list(range(10)))
+
+        assert cache.size <= 2500
+        assert 0 < len(cache) < 10
+
+    def test_too_large_value_is_not_cached(self):
+        """Test that a result larger than the whole cache is returned but not stored."""
+        cache = QueryCache(max_bytes=10)
+
+        assert cache.get_or_load('q', (), ('t',), self.load) == [1]
+        assert len(cache) == 0
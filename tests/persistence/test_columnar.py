@@ -0,0 +1,107 @@
+import subprocess
+import sys
+import pytest
+from array import array
+from decimal import Decimal
+from unittest.mock import Mock, MagicMock
+from mysql.connector.constants import FieldType
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.columnar import ColumnarBuilder
+from app.persistence.model import Player, TeamGoalsView
+from app.persistence.repository import PlayerRepository
+from app.persistence.reporting import ReportingRepository
+
+PLAYER_DESCRIPTION = [('id_', FieldType.LONG), ('name', FieldType.VAR_STRING),
+                      ('goals', FieldType.LONG), ('team_id', FieldType.LONG)]
+
+
+class TestColumnarBuilder:
+    """Tests for ColumnarBuilder."""
+
+    def test_numeric_columns_use_typed_arrays(self):
+        """Test that int columns are stored in contiguous arrays."""
+        builder = ColumnarBuilder(Player, PLAYER_DESCRIPTION)
+        builder.add([(1, "P1", 5, 1), (2, "P2", 3, 2)])
+        builder.add([(3, "P3", 7, 2)])
+
+        result = builder.result(use_numpy=False)
+
+        assert result['goals'] == array('q', [5, 3, 7])
+        assert result['team_id'] == array('q', [1, 2, 2])
+        assert result['name'] == ["P1", "P2", "P3"]
+
+    def test_null_demotes_column_to_list(self):
+        """Test that a numeric column with NULL falls back to a list."""
+        builder = ColumnarBuilder(Player, PLAYER_DESCRIPTION)
+        builder.add([(1, "P1", 5, 1)])
+        builder.add([(2, "P2", 3, None)])
+
+        result = builder.result(use_numpy=False)
+
+        assert result['team_id'] == [1, None]
+        assert isinstance(result['goals'], array)
+
+    def test_decimal_sums_converted(self):
+        """Test that DECIMAL aggregates are stored as integers."""
+        builder = ColumnarBuilder(TeamGoalsView, [('team_id', FieldType.LONG), ('team_name', FieldType.VAR_STRING),
+                                                  ('goals', FieldType.NEWDECIMAL)])
+        builder.add([(1, "A", Decimal(12))])
+
+        assert builder.result(use_numpy=False)['goals'] == array('q', [12])
+
+    def test_import_does_not_load_numpy(self):
+        """Test that importing the repository module leaves numpy until a NumPy result is built."""
+        code = 'import sys, app.persistence.repository; print("numpy" in sys.modules)'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == 'False'
+
+    def test_numpy_arrays(self):
+        """Test conversion of typed columns into NumPy arrays."""
+        numpy = pytest.importorskip('numpy')
+        builder = ColumnarBuilder(Player, PLAYER_DESCRIPTION)
+        builder.add([(1, "P1", 5, 1), (2, "P2", 3, 2)])
+
+        result = builder.result(use_numpy=True)
+
+        assert result['goals'].dtype == numpy.int64
+        assert result['goals'].sum() == 8
+
+
+class TestColumnarReads:
+    """Tests for columnar finders."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def test_find_all_columnar(self):
+        """Test that find_all_columnar fills columns from fetched batches."""
+        self.mock_cursor.description = PLAYER_DESCRIPTION
+        self.mock_cursor.fetchmany.side_effect = [[(1, "P1", 5, 1)], [(2, "P2", 3, 1)], []]
+
+        result = PlayerRepository(self.mock_pool).find_all_columnar(batch_size=1, use_numpy=False)
+
+        assert result['id_'] == array('q', [1, 2])
+        assert result['goals'] == array('q', [5, 3])
+        self.mock_connection.cursor.assert_called_once_with(buffered=False)
+
+    def test_goals_per_team_columnar(self):
+        """Test columnar variant of a reporting finder."""
+        self.mock_cursor.description = [('team_id', FieldType.LONG), ('team_name', FieldType.VAR_STRING),
+                                         ('goals', FieldType.NEWDECIMAL)]
+        self.mock_cursor.fetchmany.side_effect = [[(1, "A", Decimal(4)), (2, "B", Decimal(0))], []]
+
+        result = ReportingRepository(self.mock_pool).goals_per_team_columnar(use_numpy=False)
+
+        assert result['goals'] == array('q', [4, 0])
+        assert result['team_name'] == ["A", "B"]
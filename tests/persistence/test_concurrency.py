@@ -0,0 +1,104 @@
+import pytest
+from dataclasses import dataclass
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.concurrency import OptimisticLockError, retry_on_conflict, version_column, version_column_of
+from app.persistence.model import Team
+from app.persistence.repository import CrudRepository
+
+
+@dataclass
+class Club:
+    id_: int | None = None
+    name: str | None = None
+    points: int | None = 0
+    version: int = version_column()
+
+
+class ClubRepository(CrudRepository):
+    def __init__(self, connection_pool: MySQLConnectionPool):
+        super().__init__(connection_pool, Club)
+
+
+class TestOptimisticLocking:
+    """Tests for version column support in CrudRepository.update."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def test_version_column_detection(self):
+        """Test finding the version column of an entity."""
+        assert version_column_of(Club) == 'version'
+        assert version_column_of(Team) is None
+
+    def test_update_checks_and_increments_version(self):
+        """Test that update adds version condition and bumps the version."""
+        repo = ClubRepository(self.mock_pool)
+        club = Club(id_=1, name="Club A", points=3, version=4)
+        self.mock_cursor.rowcount = 1
+
+        repo.update(1, club)
+
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert sql == "update clubs set name='Club A', points=3, version=version+1 where id_=1 and version=4"
+        assert club.version == 5
+        self.mock_connection.commit.assert_called_once()
+
+    def test_update_conflict(self):
+        """Test that zero matched rows raise OptimisticLockError."""
+        repo = ClubRepository(self.mock_pool)
+        club = Club(id_=1, name="Club A", points=3, version=4)
+        self.mock_cursor.rowcount = 0
+
+        with pytest.raises(OptimisticLockError):
+            repo.update(1, club)
+
+        assert club.version == 4
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+
+    def test_update_without_values_rejected(self):
+        """Test that an item with only None data fields is rejected before any SQL is sent."""
+        repo = ClubRepository(self.mock_pool)
+
+        with pytest.raises(ValueError, match="Nothing to update for id_ 1"):
+            repo.update(1, Club(name=None, points=None, version=4))
+
+        self.mock_pool.get_connection.assert_not_called()
+
+
+class TestRetryOnConflict:
+    """Tests for retry_on_conflict helper."""
+
+    def test_retries_until_success(self):
+        """Test that a conflicting call is repeated."""
+        calls = []
+
+        @retry_on_conflict(attempts=3)
+        def add_points():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OptimisticLockError()
+            return 'ok'
+
+        assert add_points() == 'ok'
+        assert len(calls) == 3
+
+    def test_gives_up_after_attempts(self):
+        """Test that the conflict is raised when attempts are exhausted."""
+        @retry_on_conflict(attempts=2)
+        def add_points():
+            raise OptimisticLockError()
+
+        with pytest.raises(OptimisticLockError):
+            add_points()
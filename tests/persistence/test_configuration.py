@@ -0,0 +1,77 @@
+import subprocess
+import sys
+import pytest
+from unittest.mock import Mock
+from app.persistence import configuration
+from app.persistence.configuration import RepositoryRegistry
+from app.persistence.repository import TeamRepository
+
+
+class TestRepositoryRegistry:
+    """Tests for lazy repository registry."""
+
+    def test_repository_created_on_first_use(self):
+        """Test that factories run only on first access and results are reused."""
+        pool_factory = Mock(return_value='pool')
+        factory = Mock(side_effect=lambda pool: object())
+        registry = RepositoryRegistry(pool_factory)
+        registry.register('repo', factory)
+
+        pool_factory.assert_not_called()
+        first = registry.get('repo')
+
+        assert registry.get('repo') is first
+        factory.assert_called_once_with('pool')
+        pool_factory.assert_called_once_with('default')
+
+    def test_use_pool_recreates_repositories(self):
+        """Test that switching pool drops previously created repositories."""
+        registry = RepositoryRegistry(lambda profile: 'pool')
+        registry.register('repo', lambda pool: [pool])
+        registry.get('repo')
+
+        registry.use_pool('other')
+
+        assert registry.get('repo') == ['other']
+        registry.reset()
+        assert registry.get('repo') == ['pool']
+
+    def test_repository_bound_to_profile(self):
+        """Test that repositories registered with a profile get that profile's pool."""
+        registry = RepositoryRegistry(lambda profile: f'{profile}_pool')
+        registry.register('repo', lambda pool: pool)
+        registry.register('bulk_repo', lambda pool: pool, profile='bulk')
+
+        assert registry.get('repo') == 'default_pool'
+        assert registry.get('bulk_repo') == 'bulk_pool'
+
+    def test_module_attributes_resolved_from_registry(self):
+        """Test that module level repositories come from the registry."""
+        assert isinstance(configuration.team_repository, TeamRepository)
+        assert configuration.team_repository is configuration.registry.get('team_repository')
+        assert configuration.team_repository._query_cache is configuration.player_repository._query_cache
+
+    def test_query_timeouts_skip_lock_wait_set_by_pool(self, monkeypatch):
+        """Test that query timeouts rely on the pool init_command when it already sets the lock wait."""
+        monkeypatch.setenv('MYSQL_QUERY_TIMEOUT', '2')
+        pool = Mock(init_command='set session innodb_lock_wait_timeout = 2')
+        try:
+            configuration.registry.use_pool(pool)
+            assert configuration.registry.get('query_timeouts').lock_wait_on_connect
+            configuration.registry.use_pool(Mock(init_command=None))
+            assert not configuration.registry.get('query_timeouts').lock_wait_on_connect
+        finally:
+            configuration.registry.reset()
+
+    def test_unknown_attribute(self):
+        """Test that unknown attributes still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            configuration.coach_repository
+
+    def test_import_does_not_load_connector(self):
+        """Test that importing configuration and connection does not import the connector."""
+        code = ('import sys, app.persistence.configuration, app.persistence.connection; '
+                'print(any(name.startswith("mysql") or name == "inflection" for name in sys.modules))')
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == 'False'
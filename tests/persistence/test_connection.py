@@ -1,7 +1,8 @@
 import pytest
-from unittest.mock import Mock, MagicMock
+from unittest.mock import Mock, MagicMock, patch
 from mysql.connector.pooling import MySQLConnectionPool
-from app.persistence.connection import MySQLConnectionPoolBuilder, create_tables, drop_tables
+import os
+from app.persistence.connection import MySQLConnectionPoolBuilder, LazyConnectionPool, create_tables, drop_tables, pool_size_for_budget
 
 
 class TestConnection:
@@ -52,6 +53,118 @@ class TestConnection:
         assert config['database'] == 'test_db'
         assert config['port'] == 3308
     
+    def test_connection_pool_builder_allow_local_infile(self):
+        """Test that LOAD DATA LOCAL INFILE can be enabled on the pool."""
+        builder = MySQLConnectionPoolBuilder().allow_local_infile(True)
+        assert builder._pool_config['allow_local_infile'] is True
+    
+    def test_connection_pool_builder_from_env(self):
+        """Test that builder reads MYSQL_* environment variables."""
+        builder = MySQLConnectionPoolBuilder.from_env({
+            'MYSQL_HOST': 'db.local',
+            'MYSQL_PORT': '3310',
+            'MYSQL_DATABASE': 'league',
+            'MYSQL_POOL_SIZE': '8'
+        })
+        config = builder._pool_config
+        
+        assert config['host'] == 'db.local'
+        assert config['port'] == 3310
+        assert config['database'] == 'league'
+        assert config['pool_size'] == 8
+        assert config['user'] == 'user'
+    
+    def test_connection_pool_builder_from_env_defaults(self):
+        """Test that without environment the docker-compose port is used."""
+        assert MySQLConnectionPoolBuilder.from_env({})._pool_config['port'] == 3307
+    
+    def test_lazy_pool_builds_on_first_connection(self):
+        """Test that lazy pool does not connect until a connection is requested."""
+        builder = MySQLConnectionPoolBuilder().pool_size(3)
+        mock_pool = Mock(spec=MySQLConnectionPool)
+        
+        with patch.object(MySQLConnectionPoolBuilder, 'build', return_value=mock_pool) as build:
+            lazy_pool = builder.build_lazy()
+            assert isinstance(lazy_pool, LazyConnectionPool)
+            assert lazy_pool.pool_size == 3
+            assert not lazy_pool.is_built
+            build.assert_not_called()
+            
+            lazy_pool.get_connection()
+            lazy_pool.get_connection()
+        
+        build.assert_called_once()
+        assert mock_pool.get_connection.call_count == 2
+    
+    def test_connection_pool_builder_tuning_options(self):
+        """Test setters for host and connection tuning options."""
+        builder = (MySQLConnectionPoolBuilder().host('db.local').connection_timeout(3).autocommit(True)
+                   .use_pure(False).compress(True).buffered(True).charset('utf8mb4'))
+        config = builder._pool_config
+        
+        assert config['host'] == 'db.local'
+        assert config['connection_timeout'] == 3
+        assert config['autocommit'] is True
+        assert config['use_pure'] is False
+        assert config['compress'] is True
+        assert config['buffered'] is True
+        assert config['charset'] == 'utf8mb4'
+    
+    def test_driver_config_prefers_c_extension(self):
+        """Test that C extension is selected when available."""
+        with patch('app.persistence.connection.c_extension_available', return_value=True):
+            assert MySQLConnectionPoolBuilder().driver_config()['use_pure'] is False
+    
+    def test_driver_config_falls_back_to_pure_python(self):
+        """Test fallback to the pure Python driver without the C extension."""
+        with patch('app.persistence.connection.c_extension_available', return_value=False):
+            assert MySQLConnectionPoolBuilder().driver_config()['use_pure'] is True
+            assert MySQLConnectionPoolBuilder().use_pure(False).driver_config()['use_pure'] is True
+    
+    def test_driver_config_keeps_explicit_pure_python(self):
+        """Test that an explicit use_pure=True is respected."""
+        with patch('app.persistence.connection.c_extension_available', return_value=True):
+            assert MySQLConnectionPoolBuilder().use_pure(True).driver_config()['use_pure'] is True
+    
+    def test_lazy_pool_rebuilt_in_forked_child(self):
+        """Test that a pool built before fork is not reused in the child process."""
+        parent_pool = Mock(spec=MySQLConnectionPool)
+        child_pool = Mock(spec=MySQLConnectionPool)
+        
+        with patch.object(MySQLConnectionPoolBuilder, 'build', side_effect=[parent_pool, child_pool]):
+            lazy_pool = MySQLConnectionPoolBuilder().build_lazy()
+            assert lazy_pool.pool() is parent_pool
+            
+            with patch('app.persistence.connection.os.getpid', return_value=os.getpid() + 1):
+                assert lazy_pool.pool() is child_pool
+                assert lazy_pool.pool() is child_pool
+        
+        parent_pool.get_connection.assert_not_called()
+    
+    def test_lazy_pool_reset_in_real_fork(self):
+        """Test that register_at_fork hook drops the inherited pool in the child."""
+        if not hasattr(os, 'fork'):
+            pytest.skip('fork not available')
+        with patch.object(MySQLConnectionPoolBuilder, 'build', return_value=Mock(spec=MySQLConnectionPool)):
+            lazy_pool = MySQLConnectionPoolBuilder().build_lazy()
+            lazy_pool.pool()
+        
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if not lazy_pool.is_built else 1)
+        _, status = os.waitpid(pid, 0)
+        
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert lazy_pool.is_built
+    
+    def test_pool_size_for_budget(self):
+        """Test splitting a global connection budget between processes."""
+        assert pool_size_for_budget(151, 8, reserved=10) == 17
+        assert pool_size_for_budget(1000, 4) == 32
+        assert MySQLConnectionPoolBuilder().connection_budget(100, 4)._pool_config['pool_size'] == 25
+        with pytest.raises(ValueError):
+            pool_size_for_budget(10, 8, reserved=5)
+    
     def test_connection_pool_builder_class_method(self):
         """Test that builder class method returns instance."""
         builder = MySQLConnectionPoolBuilder.builder()
@@ -0,0 +1,169 @@
+import pytest
+from unittest.mock import Mock, MagicMock
+from mysql.connector import errors
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.graph import GraphWriter
+from app.persistence.ids import HiLoIdAllocator, seed_sequence
+from app.persistence.model import Player, Team
+from app.persistence.repository import PlayerRepository, TeamRepository
+from app.persistence.retry import RetryPolicy
+
+
+class TestGraphWriter:
+    """Tests for writing team / player graphs with pre-allocated ids."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+        self.team_allocator = Mock(spec=HiLoIdAllocator)
+        self.team_allocator.assign.side_effect = self.assign_from(10)
+        self.player_allocator = Mock(spec=HiLoIdAllocator)
+        self.player_allocator.assign.side_effect = self.assign_from(100)
+        self.team_repository = TeamRepository(self.mock_pool)
+        self.player_repository = PlayerRepository(self.mock_pool)
+        self.writer = GraphWriter(
+            [self.player_repository, self.team_repository],
+            {Team: self.team_allocator, Player: self.player_allocator}
+        )
+
+    @staticmethod
+    def assign_from(start):
+        def assign(items):
+            for offset, item in enumerate(item for item in items if item.id_ is None):
+                item.id_ = start + offset
+            return items
+        return assign
+
+    def executed(self):
+        return [call[0][0] for call in self.mock_cursor.execute.call_args_list]
+
+    def test_team_with_players_in_one_transaction(self):
+        """Test that ids and foreign keys are set in memory and each table gets one insert."""
+        team = Team(name="Team A", points=3, players=[Player(name="Ann", goals=1), Player(name="Bob", goals=2)])
+        other = Team(name="Team B", players=[Player(name="Cid")])
+
+        written = self.writer.flush([team, other])
+
+        assert team.players is not None and other.players is not None
+        assert list(written) == [Team, Player]
+        assert [player.team_id for player in team.players + other.players] == [10, 10, 11]
+        assert self.executed() == [
+            "insert into teams (id_, name, points) values (10, 'Team A', 3), (11, 'Team B', 0)",
+            "insert into players (id_, name, goals, team_id) values "
+            "(100, 'Ann', 1, 10), (101, 'Bob', 2, 10), (102, 'Cid', 0, 11)",
+        ]
+        self.mock_connection.start_transaction.assert_called_once()
+        self.mock_connection.commit.assert_called_once()
+        assert self.mock_pool.get_connection.call_count == 1
+
+    def test_many_to_one_links_player_to_team(self):
+        """Test that Player.team is written before the player."""
+        team = Team(name="Team A")
+        players = [Player(name="Ann", team=team), Player(name="Bob", team=team)]
+
+        self.writer.flush(players)
+
+        assert [player.team_id for player in players] == [10, 10]
+        assert self.executed()[0].startswith('insert into teams')
+        self.team_allocator.assign.assert_called_once_with([team])
+
+    def test_existing_ids_kept(self):
+        """Test that entities with ids are not given new ones."""
+        team = Team(id_=5, name="Team A", players=[Player(id_=7, name="Ann")])
+
+        self.writer.flush([team])
+
+        assert team.players is not None
+        assert team.players[0].team_id == 5
+        self.team_allocator.assign.assert_not_called()
+
+    def test_failure_rolls_back_everything(self):
+        """Test that a failing insert rolls back the whole graph."""
+        self.mock_cursor.execute.side_effect = [None, errors.IntegrityError(msg="Duplicate", errno=1062)]
+        inserted: list[list[Team]] = []
+        self.team_repository.after_insert(inserted.append)
+
+        with pytest.raises(errors.IntegrityError):
+            self.writer.flush([Team(name="Team A", players=[Player(name="Ann")])])
+
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+        assert inserted == []
+
+    def test_deadlock_retries_whole_graph(self):
+        """Test that the retry policy repeats the transaction with the same ids."""
+        self.team_repository.with_retry(RetryPolicy(sleep=lambda _: None))
+        self.writer = GraphWriter([self.team_repository, self.player_repository], {Team: self.team_allocator})
+        self.mock_cursor.execute.side_effect = [errors.InternalError(msg="Deadlock", errno=1213), None]
+
+        self.writer.flush([Team(name="Team A")])
+
+        assert self.executed() == ["insert into teams (id_, name, points) values (10, 'Team A', 0)"] * 2
+        self.team_allocator.assign.assert_called_once()
+
+    def test_missing_allocator(self):
+        """Test that new entities need an allocator."""
+        writer = GraphWriter([self.team_repository], {})
+
+        with pytest.raises(ValueError):
+            writer.flush([Team(name="Team A")])
+
+
+class TestIdAllocatorHelpers:
+    """Tests for id assignment and sequence seeding."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def test_assign_only_missing_ids(self):
+        """Test that assign keeps existing ids and reserves the rest at once."""
+        self.mock_cursor.lastrowid = 101
+        allocator = HiLoIdAllocator(self.mock_pool, 'teams')
+        teams = [Team(name="A"), Team(id_=50, name="B"), Team(name="C")]
+
+        allocator.assign(teams)
+
+        assert [team.id_ for team in teams] == [1, 50, 2]
+
+    def test_repository_insert_uses_allocator(self):
+        """Test that a repository with an id allocator writes reserved ids instead of relying on auto_increment."""
+        allocator = Mock(spec=HiLoIdAllocator)
+        allocator.assign.side_effect = TestGraphWriter.assign_from(7)
+        repository = TeamRepository(self.mock_pool).with_id_allocator(allocator)
+        teams = [Team(name="A"), Team(name="B")]
+
+        assert repository.insert(Team(name="C")) == 7
+        repository.insert_many(teams)
+
+        assert [team.id_ for team in teams] == [7, 8]
+        assert self.mock_cursor.execute.call_args_list[0][0][0] == "insert into teams (id_, name, points) values (7, 'C', 0)"
+
+    def test_seed_sequence_above_existing_rows(self):
+        """Test that the sequence starts after the table's highest id."""
+        seed_sequence(self.mock_pool, 'teams', 'teams')
+
+        self.mock_cursor.execute.assert_called_once_with(
+            'insert ignore into id_sequences (name, next_id) select %s, coalesce(max(id_), 0) + 1 from teams',
+            ('teams',)
+        )
+        self.mock_connection.commit.assert_called_once()
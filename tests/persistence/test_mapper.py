@@ -0,0 +1,104 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock
+from mysql.connector.constants import FieldType
+from app.persistence.mapper import row_mapper, map_rows
+from app.persistence.model import Team, Player, TeamGoalsView
+
+
+def description(*columns):
+    return [(name, type_code, None, None, None, None, True) for name, type_code in columns]
+
+
+class TestRowMapper:
+    """Tests for generated row-to-entity mappers."""
+
+    def test_maps_by_column_name(self):
+        """Test that columns are assigned by name, not by position."""
+        mapper = row_mapper(Player, description(('team_id', FieldType.LONG), ('name', FieldType.VAR_STRING),
+                                                ('id_', FieldType.LONG), ('goals', FieldType.LONG)))
+
+        player = mapper((2, "P1", 7, 5))
+
+        assert player == Player(id_=7, name="P1", goals=5, team_id=2)
+        assert player.team is None
+
+    def test_missing_columns_use_defaults(self):
+        """Test that fields absent from the result set get their defaults."""
+        team = row_mapper(Team, description(('id_', FieldType.LONG), ('name', FieldType.VAR_STRING)))((1, "A"))
+
+        assert team == Team(id_=1, name="A", points=0)
+        assert team.players is None
+
+    def test_decimal_converted_to_int_field(self):
+        """Test that DECIMAL columns are converted once per column for int fields."""
+        mapper = row_mapper(TeamGoalsView, description(('team_id', FieldType.LONG), ('team_name', FieldType.VAR_STRING),
+                                                       ('goals', FieldType.NEWDECIMAL)))
+
+        view = mapper((1, "A", Decimal("12")))
+
+        assert view.goals == 12
+        assert type(view.goals) is int
+
+    def test_decimal_null_stays_none(self):
+        """Test that NULL values skip conversion."""
+        mapper = row_mapper(Team, description(('id_', FieldType.LONG), ('name', FieldType.VAR_STRING),
+                                              ('points', FieldType.NEWDECIMAL)))
+
+        assert mapper((1, "A", None)).points is None
+
+    def test_mapper_is_cached(self):
+        """Test that the same entity and columns reuse one generated function."""
+        columns = description(('id_', FieldType.LONG), ('name', FieldType.VAR_STRING), ('points', FieldType.LONG))
+
+        assert row_mapper(Team, columns) is row_mapper(Team, list(columns))
+
+    def test_required_field_missing(self):
+        """Test that a result set without a required view column is rejected."""
+        with pytest.raises(ValueError):
+            row_mapper(TeamGoalsView, description(('team_id', FieldType.LONG)))
+
+    def test_positional_without_description(self):
+        """Test fallback to positional mapping when cursor has no description."""
+        cursor = MagicMock()
+        cursor.description = None
+
+        assert map_rows(Team, cursor, [(1, "A", 10)]) == [Team(1, "A", 10)]
+
+
+class TestRawRowMapper:
+    """Tests for mapping rows from raw cursors."""
+
+    def test_raw_values_converted_per_column(self):
+        """Test that bytes from a raw cursor are converted by column type."""
+        mapper = row_mapper(Player, description(('id_', FieldType.LONG), ('name', FieldType.VAR_STRING),
+                                                ('goals', FieldType.LONGLONG), ('team_id', FieldType.LONG)), raw=True)
+
+        player = mapper((bytearray(b'7'), bytearray(b'P7'), bytearray(b'12'), None))
+
+        assert player == Player(id_=7, name="P7", goals=12, team_id=None)
+
+    def test_raw_decimal_and_dates(self):
+        """Test raw DECIMAL and DATETIME conversions."""
+        from dataclasses import dataclass
+        from datetime import datetime
+
+        @dataclass
+        class Match:
+            id_: int | None = None
+            played_at: datetime | None = None
+            goals: int | None = 0
+
+        mapper = row_mapper(Match, description(('id_', FieldType.LONG), ('played_at', FieldType.DATETIME),
+                                               ('goals', FieldType.NEWDECIMAL)), raw=True)
+
+        match = mapper((b'1', b'2024-05-01 20:45:00', b'3.00'))
+
+        assert match.played_at == datetime(2024, 5, 1, 20, 45)
+        assert match.goals == 3
+
+    def test_raw_and_converted_mappers_are_cached_separately(self):
+        """Test that raw flag is part of the mapper cache key."""
+        columns = description(('id_', FieldType.LONG), ('name', FieldType.VAR_STRING), ('points', FieldType.LONG))
+
+        assert row_mapper(Team, columns, raw=True) is not row_mapper(Team, columns)
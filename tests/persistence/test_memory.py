@@ -0,0 +1,184 @@
+import pytest
+from mysql.connector import errors
+from app.persistence.memory import MemoryPlayerRepository, MemoryTeamRepository, league_database
+from app.persistence.indexes import HashIndex, SortedIndex
+from app.persistence.model import Player, Team
+from app.persistence.relationship import LoadStrategy
+from app.persistence.repository import PlayerRepositoryProtocol, TeamRepositoryProtocol
+
+
+class TestIndexes:
+    """Tests for in-memory indexes."""
+
+    def test_sorted_index_range(self):
+        """Test bisect based range lookup."""
+        index = SortedIndex()
+        for id_, points in [(1, 10), (2, 15), (3, 8), (4, 10), (5, None)]:
+            index.add(points, id_)
+
+        assert index.between(10, 15) == [1, 4, 2]
+        assert index.between(0, 9) == [3]
+        assert len(index) == 4
+
+        index.remove(10, 1)
+        assert index.between(10, 10) == [4]
+
+    def test_hash_index(self):
+        """Test exact match lookup."""
+        index = HashIndex()
+        index.add("A", 2)
+        index.add("A", 1)
+        index.remove("A", 2)
+
+        assert index.find("A") == [1]
+        assert index.find("B") == []
+
+
+class TestMemoryRepositories:
+    """Tests for repositories backed by the in-memory engine."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.database = league_database()
+        # Typy protokolow - mypy sprawdza, ze silnik w pamieci ma interfejs CrudRepository
+        self.teams: TeamRepositoryProtocol = MemoryTeamRepository(self.database)
+        self.players: PlayerRepositoryProtocol = MemoryPlayerRepository(self.database)
+
+    def test_auto_increment_and_find(self):
+        """Test that ids are generated and rows read back as entities or tuples."""
+        assert self.teams.insert(Team(name="Team A", points=10)) == 1
+        assert self.teams.insert(Team(name="Team B", points=15)) == 2
+
+        assert self.teams.find_by_id(2) == (2, "Team B", 15)
+        assert self.teams.find_all() == [Team(1, "Team A", 10), Team(2, "Team B", 15)]
+        assert self.teams.find_by_id(3) is None
+
+    def test_preset_ids_move_auto_increment(self):
+        """Test that explicit ids are kept and auto_increment continues after them."""
+        self.teams.insert(Team(id_=10, name="Team A"))
+
+        assert self.teams.insert(Team(name="Team B")) == 11
+        with pytest.raises(errors.IntegrityError):
+            self.teams.insert(Team(id_=10, name="Team C"))
+
+    def test_foreign_key_checked(self):
+        """Test that players must reference an existing team."""
+        with pytest.raises(errors.IntegrityError) as error:
+            self.players.insert(Player(name="Ann", team_id=99))
+
+        assert error.value.errno == 1452
+
+    def test_delete_cascades_to_players(self):
+        """Test on delete cascade from teams to players."""
+        team_id = self.teams.insert(Team(name="Team A"))
+        self.players.insert_many([Player(name="Ann", team_id=team_id), Player(name="Bob", team_id=team_id)])
+
+        self.teams.delete(team_id)
+
+        assert self.players.find_all() == []
+
+    def test_failed_statement_is_atomic(self):
+        """Test that insert_many with a bad row inserts nothing."""
+        team_id = self.teams.insert(Team(name="Team A"))
+
+        with pytest.raises(errors.IntegrityError):
+            self.players.insert_many([Player(name="Ann", team_id=team_id), Player(name="Bob", team_id=99)])
+
+        assert self.players.find_all() == []
+
+    def test_transaction_rollback(self):
+        """Test that a failed transaction undoes inserts, updates and cascades."""
+        team_id = self.teams.insert(Team(name="Team A", points=10))
+        self.players.insert(Player(name="Ann", team_id=team_id))
+
+        with pytest.raises(RuntimeError):
+            with self.database.transaction():
+                self.teams.update(team_id, Team(points=20))
+                self.teams.delete(team_id)
+                self.teams.insert(Team(name="Team B"))
+                raise RuntimeError("abort")
+
+        assert self.teams.find_all() == [Team(1, "Team A", 10)]
+        assert [player.name for player in self.players.find_all()] == ["Ann"]
+        assert self.teams.find_by_name("Team B") is None
+
+    def test_nested_transaction_is_savepoint(self):
+        """Test that a failed inner transaction keeps the outer changes."""
+        with self.database.transaction():
+            self.teams.insert(Team(name="Team A"))
+            with pytest.raises(errors.IntegrityError):
+                self.players.insert(Player(name="Ann", team_id=99))
+
+        assert len(self.teams.find_all()) == 1
+
+    def test_secondary_indexes(self):
+        """Test points range and name lookups."""
+        self.teams.insert_many([Team(name="A", points=10), Team(name="B", points=15), Team(name="C", points=8)])
+        self.teams.update(3, Team(points=12))
+
+        assert [team.name for team in self.teams.find_all_by_points_between(10, 12)] == ["A", "C"]
+        assert self.teams.find_by_name("B") == Team(2, "B", 15)
+
+    def test_relationships(self):
+        """Test relationship loading with both strategies."""
+        team_id = self.teams.insert(Team(name="Team A"))
+        self.players.insert_many([Player(name="Ann", team_id=team_id), Player(name="Bob")])
+
+        teams = self.teams.find_all_with('players')
+        players = self.players.find_all_with('team', strategy=LoadStrategy.JOINED)
+
+        assert [player.name for player in teams[0].players] == ["Ann"]
+        assert players[0].team == Team(1, "Team A", 0)
+        assert players[1].team is None
+
+    def test_delete_all_and_paging(self):
+        """Test chunked delete_all and keyset paging."""
+        self.teams.insert_many([Team(name=str(i)) for i in range(5)])
+
+        assert [team.id_ for team in self.teams.find_page(after_id=2, limit=2)] == [3, 4]
+        assert self.teams.delete_all(batch_size=2) == 5
+        assert self.teams.find_all() == []
+
+    def test_hooks_and_update_many(self):
+        """Test change hooks and batched updates."""
+        updated: list[dict[int, Team]] = []
+        self.teams.after_update(updated.append)
+        self.teams.insert_many([Team(name="A"), Team(name="B")])
+
+        assert self.teams.update_many({1: Team(points=3), 2: Team(points=5), 7: Team(points=1)}) == 2
+        assert [team.points for team in self.teams.find_all()] == [3, 5]
+        assert list(updated[0]) == [1, 2, 7]
+
+    def test_columnar_and_streaming(self):
+        """Test columnar reads and batched iteration."""
+        self.teams.insert_many([Team(name="A", points=1), Team(name="B", points=2)])
+
+        columns = self.teams.find_all_columnar(use_numpy=False)
+
+        assert list(columns['points']) == [1, 2]
+        assert [team.name for team in self.teams.iter_all(batch_size=1)] == ["A", "B"]
+
+    def test_load_data_reads_csv(self, tmp_path):
+        """Test that load_data reads the LOAD DATA file format (insert columns, \\N as NULL)."""
+        path = tmp_path / "teams.csv"
+        path.write_text('"Team ""A""",10\nTeam B,\\N\n', encoding='utf-8')
+        inserted: list[list[Team]] = []
+        self.teams.after_insert(inserted.append)
+
+        assert self.teams.load_data(str(path)) == 2
+        assert self.teams.find_all() == [Team(1, 'Team "A"', 10), Team(2, "Team B", None)]
+        assert inserted == [[Team(None, 'Team "A"', 10), Team(None, "Team B", None)]]
+
+    def test_archive_batch_moves_matching_rows(self):
+        """Test that archive_batch moves rows matching `column op %s` conditions to the archive table."""
+        self.teams.insert_many([Team(name=str(i), points=i) for i in range(5)])
+        deleted: list[list[int] | None] = []
+        self.teams.after_delete(deleted.append)
+
+        assert self.teams.archive_batch('points < %s and points >= %s', (3, 1), batch_size=1) == 1
+        assert self.teams.archive_batch('points < %s and points >= %s', (3, 1)) == 1
+        assert [team.points for team in self.teams.find_all()] == [0, 3, 4]
+        assert sorted(self.database.archive(Team, 'teams_archive').rows) == [2, 3]
+        assert deleted == [[2], [3]]
+        with pytest.raises(ValueError, match="not supported"):
+            self.teams.archive_batch('name like %s', ('A%',))
@@ -0,0 +1,106 @@
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.reporting import ReportingRepository
+from app.persistence.model import TeamGoalsView, TopScorerView, TeamRankingView
+
+
+class TestReportingRepository:
+    """Tests for ReportingRepository."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def test_goals_per_team(self):
+        """Test that goals are aggregated with group by in SQL."""
+        repo = ReportingRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = [(2, "Team B", 12), (1, "Team A", 0)]
+
+        result = repo.goals_per_team()
+
+        assert result == [TeamGoalsView(2, "Team B", 12), TeamGoalsView(1, "Team A", 0)]
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert 'group by' in sql
+
+    def test_top_scorers_uses_limit_parameter(self):
+        """Test that top scorers are limited in SQL."""
+        repo = ReportingRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = [(7, "P7", 20, "Team A")]
+
+        result = repo.top_scorers(3)
+
+        assert result == [TopScorerView(7, "P7", 20, "Team A")]
+        sql, params = self.mock_cursor.execute.call_args[0]
+        assert sql.endswith('limit %s')
+        assert params == (3,)
+
+    def test_teams_ranked_by_points(self):
+        """Test ranking of teams in a points range."""
+        repo = ReportingRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = [(1, 2, "Team B", 15), (2, 1, "Team A", 10)]
+
+        result = repo.teams_ranked_by_points(10, 20)
+
+        assert result[0] == TeamRankingView(1, 2, "Team B", 15)
+        assert self.mock_cursor.execute.call_args[0][1] == (10, 20)
+
+    def test_teams_ranked_before_points_filter(self):
+        """Test that teams are ranked in a derived table and the points range is applied outside it."""
+        repo = ReportingRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = []
+
+        repo.teams_ranked_by_points(10, 20)
+
+        sql = self.mock_cursor.execute.call_args[0][0]
+        ranking, outer = sql.rsplit(') r ', 1)
+        assert 'rank() over' in ranking and 'where' not in ranking
+        assert outer.startswith('where r.points between %s and %s')
+
+    def test_iter_goals_per_team_streams(self):
+        """Test that streaming variant uses unbuffered cursor and fetchmany."""
+        repo = ReportingRepository(self.mock_pool)
+        self.mock_cursor.fetchmany.side_effect = [[(1, "Team A", 3)], [(2, "Team B", 1)], []]
+
+        result = list(repo.iter_goals_per_team(batch_size=1))
+
+        assert [view.team_id for view in result] == [1, 2]
+        self.mock_connection.cursor.assert_called_once_with(buffered=False)
+
+    def test_results_cached_with_ttl(self):
+        """Test that cached repository does not repeat the same query."""
+        repo = ReportingRepository(self.mock_pool, cache_ttl=60)
+        self.mock_cursor.fetchall.return_value = [(7, "P7", 20, "Team A")]
+
+        repo.top_scorers(3)
+        repo.top_scorers(3)
+        repo.top_scorers(5)
+
+        assert self.mock_cursor.execute.call_count == 2
+
+    def test_cached_views_are_copies(self):
+        """Test that callers get their own copies of cached report rows."""
+        repo = ReportingRepository(self.mock_pool, cache_ttl=60)
+        self.mock_cursor.fetchall.return_value = [(7, "P7", 20, "Team A")]
+
+        repo.top_scorers(3)[0].goals = 0
+
+        assert repo.top_scorers(3) == [TopScorerView(7, "P7", 20, "Team A")]
+
+    def test_results_not_cached_by_default(self):
+        """Test that repository without ttl always queries the database."""
+        repo = ReportingRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = []
+
+        repo.goals_per_team()
+        repo.goals_per_team()
+
+        assert self.mock_cursor.execute.call_count == 2
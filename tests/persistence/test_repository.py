@@ -3,6 +3,8 @@ from unittest.mock import Mock, MagicMock, patch
 from mysql.connector.pooling import MySQLConnectionPool
 from app.persistence.repository import CrudRepository, TeamRepository, PlayerRepository, PlayerWithTeamRepository
 from app.persistence.model import Team, Player, PlayerWithTeamView
+from app.persistence.relationship import LoadStrategy
+from app.persistence.cache import QueryCache
 
 
 class TestCrudRepository:
@@ -124,13 +126,30 @@ class TestCrudRepository:
         self.mock_connection.commit.assert_called_once()
     
     def test_delete_all_method(self):
-        """Test delete_all method."""
+        """Test delete_all method deletes in id ranges, one commit per range."""
         repo = TeamRepository(self.mock_pool)
+        self.mock_cursor.fetchone.return_value = (1, 25)
+        self.mock_cursor.rowcount = 10
+        
+        result = repo.delete_all(batch_size=10)
+        
+        assert result == 30
+        executed = [call[0][0] for call in self.mock_cursor.execute.call_args_list]
+        assert executed == [
+            'select min(id_), max(id_) from teams',
+            'delete from teams where id_ between 1 and 10',
+            'delete from teams where id_ between 11 and 20',
+            'delete from teams where id_ between 21 and 25',
+        ]
+        assert self.mock_connection.commit.call_count == 3
+    
+    def test_delete_all_empty_table(self):
+        """Test delete_all on an empty table."""
+        repo = TeamRepository(self.mock_pool)
+        self.mock_cursor.fetchone.return_value = (None, None)
         
-        repo.delete_all()
-        
+        assert repo.delete_all() == 0
         self.mock_cursor.execute.assert_called_once()
-        self.mock_connection.commit.assert_called_once()
     
     def test_table_name_generation(self):
         """Test table name generation."""
@@ -323,3 +342,283 @@ class TestRepositoryIntegration:
         assert team_id == 1
         assert player_id == 1
         assert player.team_id == team_id
+
+
+class TestRelationshipLoading:
+    """Tests for select-in and joined loading of Player.team and Team.players."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+    
+    def test_select_in_loads_teams_with_one_query(self):
+        """Test that select-in strategy fetches all teams of a page in one query."""
+        repo = PlayerRepository(self.mock_pool)
+        self.mock_cursor.fetchall.side_effect = [
+            [(1, "P1", 5, 1), (2, "P2", 3, 1), (3, "P3", 7, 2), (4, "P4", 0, None)],
+            [(1, "Team A", 10), (2, "Team B", 15)]
+        ]
+        
+        players = repo.find_all_with('team')
+        
+        assert self.mock_cursor.execute.call_count == 2
+        in_sql = self.mock_cursor.execute.call_args_list[1][0][0]
+        assert 'from teams where id_ in (1, 2)' in in_sql
+        assert players[0].team == Team(1, "Team A", 10)
+        assert players[1].team is players[0].team
+        assert players[2].team.name == "Team B"
+        assert players[3].team is None
+    
+    def test_select_in_loads_team_players(self):
+        """Test that select-in strategy groups players by team."""
+        repo = TeamRepository(self.mock_pool)
+        teams = [Team(1, "Team A", 10), Team(2, "Team B", 15)]
+        self.mock_cursor.fetchall.return_value = [(1, "P1", 5, 1), (2, "P2", 3, 1)]
+        
+        repo.load_relationship(teams, 'players')
+        
+        self.mock_cursor.execute.assert_called_once()
+        assert teams[0].players is not None
+        assert [player.name for player in teams[0].players] == ["P1", "P2"]
+        assert teams[1].players == []
+    
+    def test_joined_loads_team_in_single_query(self):
+        """Test that joined strategy stitches teams from one left join query."""
+        repo = PlayerRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = [
+            (1, "P1", 5, 1, 1, "Team A", 10),
+            (2, "P2", 3, None, None, None, None)
+        ]
+        
+        players = repo.find_all_with('team', strategy=LoadStrategy.JOINED)
+        
+        self.mock_cursor.execute.assert_called_once()
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert 'left join teams t on o.team_id = t.id_' in sql
+        assert players[0].team == Team(1, "Team A", 10)
+        assert players[1].team is None
+    
+    def test_joined_groups_players_per_team(self):
+        """Test that joined strategy collects the reverse collection."""
+        repo = TeamRepository(self.mock_pool)
+        self.mock_cursor.fetchall.return_value = [
+            (1, "Team A", 10, 1, "P1", 5, 1),
+            (1, "Team A", 10, 2, "P2", 3, 1),
+            (2, "Team B", 15, None, None, None, None)
+        ]
+        
+        teams = repo.find_all_with('players', strategy=LoadStrategy.JOINED)
+        
+        assert len(teams) == 2
+        assert [player.id_ for player in teams[0].players] == [1, 2]
+        assert teams[1].players == []
+    
+    def test_unknown_relationship(self):
+        """Test that loading an undeclared relationship raises ValueError."""
+        repo = PlayerRepository(self.mock_pool)
+        
+        with pytest.raises(ValueError):
+            repo.load_relationship([], 'coach')
+    
+    def test_relationship_is_not_a_column(self):
+        """Test that relationship attributes are skipped in inserts."""
+        repo = PlayerRepository(self.mock_pool)
+        player = Player(name="P1", goals=1, team_id=1, team=Team(1, "Team A", 10))
+        
+        repo.insert(player)
+        
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert 'team,' not in sql
+        assert repo._field_names() == ['id_', 'name', 'goals', 'team_id']
+
+
+class TestStreamingOperations:
+    """Tests for iter_all and load_data."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+    
+    def test_iter_all_fetches_in_batches(self):
+        """Test that iter_all streams rows from an unbuffered cursor."""
+        repo = TeamRepository(self.mock_pool)
+        self.mock_cursor.fetchmany.side_effect = [[(1, "A", 10), (2, "B", 15)], [(3, "C", 8)], []]
+        
+        result = list(repo.iter_all(batch_size=2))
+        
+        assert [team.id_ for team in result] == [1, 2, 3]
+        self.mock_connection.cursor.assert_called_once_with(buffered=False)
+        self.mock_cursor.fetchmany.assert_called_with(2)
+    
+    def test_load_data(self, tmp_path):
+        """Test load_data statement."""
+        path = tmp_path / "players.csv"
+        path.write_text("P1,5,1\nP2,1,1\nP3,\\N,\\N\n")
+        repo = PlayerRepository(self.mock_pool)
+        self.mock_cursor.rowcount = 3
+
+        result = repo.load_data(str(path))
+
+        assert result == 3
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert sql.startswith(f"load data local infile '{path}' into table players")
+        assert sql.endswith("(name, goals, team_id)")
+        self.mock_connection.commit.assert_called_once()
+
+    def test_load_data_with_id(self, tmp_path):
+        """Test that load_data with_id reads the id_ column from the file."""
+        path = tmp_path / "players.csv"
+        path.write_text("7,P1,5,1\n\\N,P2,1,1\n")
+        repo = PlayerRepository(self.mock_pool)
+        inserted: list[Player] = []
+        repo.after_insert(inserted.extend)
+        self.mock_cursor.rowcount = 2
+
+        assert repo.load_data(str(path), with_id=True) == 2
+
+        assert self.mock_cursor.execute.call_args[0][0].endswith("(id_, name, goals, team_id)")
+        assert [player.id_ for player in inserted] == [7, None]
+
+    def test_load_data_skipped_rows_raise(self, tmp_path):
+        """Test that a load which skipped rows is rolled back also without summaries."""
+        path = tmp_path / "players.csv"
+        path.write_text("P1,5,1\nP2,1,1\n")
+        self.mock_cursor.rowcount = 1
+
+        with pytest.raises(ValueError, match="loaded 1 of 2 rows"):
+            PlayerRepository(self.mock_pool).load_data(str(path))
+
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+
+
+class TestQueryResultCache:
+    """Tests for query result caching and table-level invalidation."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        
+        self.cache = QueryCache()
+        self.team_repo = TeamRepository(self.mock_pool, self.cache)
+        self.player_repo = PlayerRepository(self.mock_pool, self.cache)
+        self.view_repo = PlayerWithTeamRepository(self.mock_pool, self.cache)
+    
+    def test_points_between_uses_bound_parameters(self):
+        """Test that points range query is parametrized."""
+        self.mock_cursor.fetchall.return_value = []
+        
+        self.team_repo.find_all_by_points_between(10, 20)
+        
+        sql, params = self.mock_cursor.execute.call_args[0]
+        assert 'between %s and %s' in sql
+        assert params == (10, 20)
+    
+    def test_repeated_query_served_from_cache(self):
+        """Test that identical queries hit the database once."""
+        self.mock_cursor.fetchall.return_value = [(1, "Team A", 15)]
+        
+        first = self.team_repo.find_all_by_points_between(10, 20)
+        second = self.team_repo.find_all_by_points_between(10, 20)
+        
+        assert first == second
+        self.mock_cursor.execute.assert_called_once()
+    
+    def test_cached_entities_cannot_be_changed_by_caller(self):
+        """Test that changing a returned entity does not change the cached result."""
+        self.mock_cursor.fetchall.return_value = [(1, "Team A", 15)]
+
+        self.team_repo.find_all_by_points_between(0, 20)[0].points = 999
+
+        assert self.team_repo.find_all_by_points_between(0, 20)[0].points == 15
+        self.mock_cursor.execute.assert_called_once()
+
+    def test_player_write_keeps_team_queries(self):
+        """Test that a write to players does not evict queries on teams only."""
+        self.mock_cursor.fetchall.return_value = [(1, "Team A", 15)]
+        self.team_repo.find_all_by_points_between(10, 20)
+        self.mock_cursor.fetchall.return_value = []
+        self.view_repo.find_all_players_with_teams(10, 20)
+        
+        self.player_repo.insert(Player(name="P1", goals=1, team_id=1))
+        self.team_repo.find_all_by_points_between(10, 20)
+        self.mock_cursor.fetchall.return_value = [(1, "P1", 1, 1, "Team A")]
+        views = self.view_repo.find_all_players_with_teams(10, 20)
+        
+        # 2 selecty + insert + ponowny select widoku
+        assert self.mock_cursor.execute.call_count == 4
+        assert views == [PlayerWithTeamView(1, "P1", 1, 1, "Team A")]
+    
+    def test_team_delete_evicts_player_queries(self):
+        """Test that team writes also evict players because of cascades."""
+        self.mock_cursor.fetchall.return_value = []
+        self.view_repo.find_all_players_with_teams(10, 20)
+        
+        self.team_repo.delete(1)
+        self.view_repo.find_all_players_with_teams(10, 20)
+        
+        assert self.mock_cursor.execute.call_count == 3
+
+
+class TestRawReads:
+    """Tests for raw cursor reads."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+    
+    def test_find_all_with_raw_cursor(self):
+        """Test that raw reads use a raw cursor and convert values."""
+        repo = TeamRepository(self.mock_pool).raw_reads()
+        self.mock_cursor.description = [('id_', 3), ('name', 253), ('points', 3)]
+        self.mock_cursor.fetchall.return_value = [(bytearray(b'1'), bytearray(b'Team A'), bytearray(b'10'))]
+        
+        result = repo.find_all()
+        
+        self.mock_connection.cursor.assert_called_once_with(raw=True)
+        assert result == [Team(1, "Team A", 10)]
+    
+    def test_iter_all_with_raw_cursor(self):
+        """Test that raw reads keep the cursor unbuffered in iter_all."""
+        repo = TeamRepository(self.mock_pool).raw_reads()
+        self.mock_cursor.fetchmany.side_effect = [[], []]
+        
+        list(repo.iter_all())
+        
+        self.mock_connection.cursor.assert_called_once_with(buffered=False, raw=True)
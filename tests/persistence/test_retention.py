@@ -0,0 +1,190 @@
+import pytest
+from dataclasses import dataclass
+from datetime import datetime
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.retention import id_ranges, live_condition, soft_delete_column, soft_delete_column_of
+from app.persistence.memory import MemoryCrudRepository, MemoryDatabase
+from app.persistence.model import Team
+from app.persistence.repository import CrudRepository
+from app.persistence.summary import Summary
+
+
+@dataclass
+class Fixture:
+    id_: int | None = None
+    home: str | None = None
+    deleted_at: datetime | None = soft_delete_column()
+
+
+class FixtureRepository(CrudRepository):
+    def __init__(self, connection_pool: MySQLConnectionPool):
+        super().__init__(connection_pool, Fixture)
+
+
+class TestRetentionHelpers:
+    """Tests for soft delete metadata and id ranges."""
+
+    def test_soft_delete_column_detection(self):
+        """Test finding the soft delete column of an entity."""
+        assert soft_delete_column_of(Fixture) == 'deleted_at'
+        assert soft_delete_column_of(Team) is None
+
+    def test_live_condition(self):
+        """Test condition selecting rows that are not deleted."""
+        assert live_condition(Fixture) == 'deleted_at is null'
+        assert live_condition(Fixture, 'f') == 'f.deleted_at is null'
+        assert live_condition(Team) is None
+
+    def test_id_ranges(self):
+        """Test splitting ids into inclusive ranges."""
+        assert id_ranges(1, 25, 10) == [(1, 10), (11, 20), (21, 25)]
+        assert id_ranges(5, 5, 10) == [(5, 5)]
+        with pytest.raises(ValueError):
+            id_ranges(1, 10, 0)
+
+
+class TestSoftDelete:
+    """Tests for soft delete mode in CrudRepository."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.repo = FixtureRepository(self.mock_pool)
+
+    def executed(self):
+        return [call[0][0] for call in self.mock_cursor.execute.call_args_list]
+
+    def test_delete_marks_row(self):
+        """Test that delete sets the soft delete column of a live row instead of removing it."""
+        self.repo.delete(3)
+
+        assert self.executed() == ['update fixtures set deleted_at=now() where id_=3 and deleted_at is null']
+
+    def test_delete_all_marks_rows_in_ranges(self):
+        """Test that delete_all soft deletes in id ranges."""
+        self.mock_cursor.fetchone.return_value = (1, 3)
+
+        self.repo.delete_all(batch_size=2)
+
+        assert self.executed()[1:] == [
+            'update fixtures set deleted_at=now() where id_ between 1 and 2 and deleted_at is null',
+            'update fixtures set deleted_at=now() where id_ between 3 and 3 and deleted_at is null',
+        ]
+
+    def test_finders_skip_deleted_rows(self):
+        """Test that finders filter out soft deleted rows."""
+        self.mock_cursor.description = [('id_', 3), ('home', 253), ('deleted_at', 12)]
+        self.mock_cursor.fetchall.return_value = []
+        self.mock_cursor.fetchmany.return_value = []
+
+        self.repo.find_all()
+        self.repo.find_by_id(1)
+        list(self.repo.iter_all())
+
+        assert self.executed() == [
+            'select * from fixtures where deleted_at is null',
+            'select * from fixtures where id_=1 and deleted_at is null',
+            'select * from fixtures where deleted_at is null order by id_',
+        ]
+
+    def test_insert_and_update_skip_soft_delete_column(self):
+        """Test that the soft delete column is left to the database on insert and update."""
+        self.repo.insert(Fixture(home="Team A"))
+        self.repo.update(1, Fixture(home="Team B", deleted_at=datetime(2026, 1, 1)))
+
+        assert self.executed()[0] == "insert into fixtures (home) values ('Team A')"
+        assert self.executed()[1] == "update fixtures set home='Team B' where id_=1"
+
+    def test_restore(self):
+        """Test restoring a soft deleted row."""
+        self.repo.restore(3)
+
+        assert self.executed() == ['update fixtures set deleted_at=null where id_=3']
+
+    def test_restore_updates_summaries_and_hooks(self):
+        """Test that a restored row is added back to summaries and reported to insert hooks."""
+        summary = Mock(spec=Summary)
+        summary.capture.side_effect = [{}, {1: (1, 0)}]
+        restored: list[Fixture] = []
+        self.mock_cursor.description = [('id_', 3), ('home', 253), ('deleted_at', 12)]
+        self.mock_cursor.fetchall.return_value = [(3, "Team A", None)]
+        self.repo.with_summary(summary).after_insert(restored.extend)
+
+        self.repo.restore(3)
+
+        summary.apply.assert_called_once_with(self.mock_cursor, {}, {1: (1, 0)})
+        assert restored == [Fixture(3, "Team A", None)]
+
+    def test_restore_requires_soft_delete_column(self):
+        """Test that restore is not available without soft delete column."""
+        from app.persistence.repository import TeamRepository
+
+        with pytest.raises(ValueError):
+            TeamRepository(self.mock_pool).restore(1)
+
+    def test_archive_batch_moves_rows(self):
+        """Test that a batch is copied to the archive table and deleted in one transaction."""
+        self.mock_cursor.fetchall.return_value = [(1,), (2,)]
+        self.mock_cursor.rowcount = 2
+
+        moved = self.repo.archive_batch('deleted_at < %s', (datetime(2026, 1, 1),), batch_size=2)
+
+        assert moved == 2
+        assert self.executed() == [
+            'select id_ from fixtures where deleted_at < %s order by id_ limit 2 for update',
+            'insert into fixtures_archive select * from fixtures where id_ in (1, 2)',
+            'delete from fixtures where id_ in (1, 2)',
+        ]
+        self.mock_connection.start_transaction.assert_called_once()
+        self.mock_connection.commit.assert_called_once()
+
+    def test_archive_batch_nothing_to_move(self):
+        """Test that an empty batch ends the transaction without writes."""
+        self.mock_cursor.fetchall.return_value = []
+
+        assert self.repo.archive_batch('1 = 1') == 0
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+
+
+class TestMemorySoftDelete:
+    """Tests for soft delete mode in the in-memory engine."""
+
+    def test_delete_keeps_first_deletion_time(self):
+        """Test that deleting an already deleted row does not move its deletion time."""
+        database = MemoryDatabase()
+        database.create_table(Fixture)
+        repo = MemoryCrudRepository(database, Fixture)
+        repo.insert_many([Fixture(home="A"), Fixture(home="B")])
+        repo.delete(1)
+        deleted_at = database.table(Fixture).rows[1]['deleted_at']
+
+        repo.delete(1)
+
+        assert database.table(Fixture).rows[1]['deleted_at'] == deleted_at
+        assert repo.delete_all() == 1
+
+    def test_restore_notifies_insert_hooks(self):
+        """Test that a restored row is reported to insert hooks, as in CrudRepository.restore."""
+        database = MemoryDatabase()
+        database.create_table(Fixture)
+        repo = MemoryCrudRepository(database, Fixture)
+        repo.insert_many([Fixture(home="A"), Fixture(home="B")])
+        repo.delete(2)
+        restored: list[Fixture] = []
+        repo.after_insert(restored.extend)
+
+        repo.restore(2)
+        repo.restore(5)
+
+        assert restored == [Fixture(2, "B", None)]
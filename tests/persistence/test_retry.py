@@ -0,0 +1,160 @@
+import threading
+import pytest
+from unittest.mock import Mock, MagicMock
+from mysql.connector import errors
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.retry import RetryPolicy, RetryBudget
+from app.persistence.repository import TeamRepository
+from app.persistence.model import Team
+
+
+def deadlock():
+    return errors.InternalError(msg="Deadlock found", errno=1213)
+
+
+def lost_connection():
+    return errors.OperationalError(msg="Lost connection", errno=2013)
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.delays: list[float] = []
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0.1, sleep=self.delays.append, jitter=lambda: 1.0)
+
+    def test_retries_transient_error_with_backoff(self):
+        """Test that deadlocks are retried with exponential delays."""
+        operation = Mock(side_effect=[deadlock(), deadlock(), 'ok'])
+
+        assert self.policy.run(operation) == 'ok'
+        assert self.delays == [0.1, 0.2]
+        assert self.policy.metrics.retries == 2
+        assert self.policy.metrics.errors[1213] == 2
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that the last error is raised when attempts are exhausted."""
+        operation = Mock(side_effect=deadlock())
+
+        with pytest.raises(errors.InternalError):
+            self.policy.run(operation)
+
+        assert operation.call_count == 3
+        assert self.policy.metrics.failures == 1
+
+    def test_non_transient_error_not_retried(self):
+        """Test that other errors are raised immediately."""
+        operation = Mock(side_effect=errors.ProgrammingError(msg="Syntax", errno=1064))
+
+        with pytest.raises(errors.ProgrammingError):
+            self.policy.run(operation)
+
+        operation.assert_called_once()
+
+    def test_lost_connection_only_for_idempotent(self):
+        """Test that lost connections are retried only for idempotent operations."""
+        assert self.policy.run(Mock(side_effect=[lost_connection(), 1]), idempotent=True) == 1
+        with pytest.raises(errors.OperationalError):
+            self.policy.run(Mock(side_effect=[lost_connection(), 1]), idempotent=False)
+
+    def test_budget_stops_retries(self):
+        """Test that an exhausted retry budget stops retrying."""
+        policy = RetryPolicy(budget=RetryBudget(ratio=0, capacity=1), sleep=lambda _: None)
+
+        assert policy.run(Mock(side_effect=[deadlock(), 1])) == 1
+        with pytest.raises(errors.InternalError):
+            policy.run(Mock(side_effect=[deadlock(), 1]))
+
+        assert policy.metrics.budget_exhausted == 1
+
+    def test_metrics_counted_across_threads(self):
+        """Test that a policy shared by many threads does not lose metric updates."""
+        policy = RetryPolicy(budget=None, sleep=lambda _: None)
+
+        def work() -> None:
+            for _ in range(500):
+                policy.run(Mock(side_effect=[deadlock(), 1]))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert (policy.metrics.calls, policy.metrics.attempts, policy.metrics.retries) == (4000, 8000, 4000)
+        assert policy.metrics.errors[1213] == 4000
+
+    def test_delay_is_capped_and_jittered(self):
+        """Test full jitter backoff bounded by max_delay."""
+        policy = RetryPolicy(base_delay=1, max_delay=3, jitter=lambda: 0.5)
+
+        assert policy.delay(1) == 0.5
+        assert policy.delay(5) == 1.5
+
+    def test_transaction_retries_whole_block(self):
+        """Test that a deadlocked transaction is rolled back and run again."""
+        mock_pool = Mock(spec=MySQLConnectionPool)
+        mock_connection = MagicMock()
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = mock_connection
+        mock_pool.get_connection.return_value = context_manager
+        work = Mock(side_effect=[deadlock(), 'done'])
+
+        assert self.policy.transaction(mock_pool, work) == 'done'
+        assert work.call_count == 2
+        mock_connection.rollback.assert_called_once()
+        mock_connection.commit.assert_called_once()
+
+
+class TestRepositoryRetry:
+    """Tests for retries in repository methods."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.policy = RetryPolicy(sleep=lambda _: None)
+
+    def test_read_retried_after_lost_connection(self):
+        """Test that idempotent reads are retried."""
+        repo = TeamRepository(self.mock_pool).with_retry(self.policy)
+        self.mock_cursor.execute.side_effect = [lost_connection(), None]
+        self.mock_cursor.fetchone.return_value = (1, "Team A", 10)
+
+        assert repo.find_by_name("Team A") == Team(1, "Team A", 10)
+        assert self.policy.metrics.retries == 1
+
+    def test_insert_not_retried_after_lost_connection(self):
+        """Test that inserts are not repeated when the outcome is unknown."""
+        repo = TeamRepository(self.mock_pool).with_retry(self.policy)
+        self.mock_cursor.execute.side_effect = lost_connection()
+
+        with pytest.raises(errors.OperationalError):
+            repo.insert(Team(name="Team A"))
+
+        self.mock_cursor.execute.assert_called_once()
+
+    def test_insert_retried_after_deadlock(self):
+        """Test that inserts rolled back by a deadlock are repeated."""
+        repo = TeamRepository(self.mock_pool).with_retry(self.policy)
+        self.mock_cursor.execute.side_effect = [deadlock(), None]
+        self.mock_cursor.lastrowid = 5
+
+        assert repo.insert(Team(name="Team A")) == 5
+
+    def test_no_policy_no_retry(self):
+        """Test that repositories without policy let errors bubble up."""
+        repo = TeamRepository(self.mock_pool)
+        self.mock_cursor.execute.side_effect = [deadlock(), None]
+
+        with pytest.raises(errors.InternalError):
+            repo.delete(1)
@@ -0,0 +1,77 @@
+import pytest
+from app.persistence.connection import MySQLConnectionPoolBuilder
+from app.persistence.settings import load_pool_config, env_pool_config
+
+
+class TestPoolSettings:
+    """Tests for file and environment driven pool configuration."""
+
+    def test_builtin_profile(self):
+        """Test that a built-in profile is applied over defaults."""
+        config = load_pool_config('bulk', env={})
+
+        assert config['pool_name'] == 'bulk_pool'
+        assert config['compress'] is True
+        assert config['allow_local_infile'] is True
+        assert config['port'] == 3307
+
+    def test_unknown_profile(self):
+        """Test that an unknown profile is rejected."""
+        with pytest.raises(ValueError, match="Unknown pool profile"):
+            load_pool_config('reports', env={})
+
+    def test_toml_file_and_profile_sections(self, tmp_path):
+        """Test that TOML [pool] and [profiles.<name>] sections are merged."""
+        path = tmp_path / "db.toml"
+        path.write_text('[pool]\nhost = "db.local"\nport = 3306\n\n'
+                        '[profiles.oltp]\npool_size = 20\n\n[profiles.reports]\nread_timeout = 120\n')
+
+        oltp = load_pool_config('oltp', str(path), env={})
+        reports = load_pool_config('reports', env={'MYSQL_CONFIG': str(path)})
+
+        assert oltp['host'] == 'db.local'
+        assert oltp['port'] == 3306
+        assert oltp['pool_size'] == 20
+        assert oltp['connection_timeout'] == 3
+        assert reports['read_timeout'] == 120
+
+    def test_environment_overrides_file(self, tmp_path):
+        """Test precedence of MYSQL_* and MYSQL_<PROFILE>_* variables."""
+        path = tmp_path / "db.toml"
+        path.write_text('[profiles.bulk]\npool_size = 8\n')
+        env = {'MYSQL_HOST': 'env-host', 'MYSQL_COMPRESS': 'false', 'MYSQL_BULK_POOL_SIZE': '2'}
+
+        config = load_pool_config('bulk', str(path), env=env)
+
+        assert config['host'] == 'env-host'
+        assert config['compress'] is False
+        assert config['pool_size'] == 2
+
+    def test_unknown_option_in_file(self, tmp_path):
+        """Test that typos in the configuration file are reported."""
+        path = tmp_path / "db.toml"
+        path.write_text('[pool]\npool_sise = 3\n')
+
+        with pytest.raises(ValueError, match="Unknown pool option pool_sise"):
+            load_pool_config('default', str(path), env={})
+
+    def test_env_pool_config_coerces_types(self):
+        """Test conversion of environment strings to option types."""
+        config = env_pool_config({'MYSQL_PORT': '3310', 'MYSQL_AUTOCOMMIT': 'yes', 'MYSQL_CHARSET': 'utf8mb4'})
+
+        assert config == {'port': 3310, 'autocommit': True, 'charset': 'utf8mb4'}
+
+    def test_query_timeout_sets_init_command(self):
+        """Test that MYSQL_QUERY_TIMEOUT applies the lock wait once per connection, unless init_command is given."""
+        config = load_pool_config('default', env={'MYSQL_QUERY_TIMEOUT': '2.5'})
+        custom = load_pool_config('default', env={'MYSQL_QUERY_TIMEOUT': '2.5', 'MYSQL_INIT_COMMAND': 'set names utf8mb4'})
+
+        assert config['init_command'] == 'set session innodb_lock_wait_timeout = 3'
+        assert custom['init_command'] == 'set names utf8mb4'
+
+    def test_builder_from_profile(self):
+        """Test builder created from a profile."""
+        builder = MySQLConnectionPoolBuilder.from_profile('oltp', env={})
+
+        assert builder._pool_config['pool_size'] == 10
+        assert builder._pool_config['user'] == 'user'
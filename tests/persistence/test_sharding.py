@@ -0,0 +1,200 @@
+import pytest
+from mysql.connector import errors
+from unittest.mock import Mock, MagicMock, PropertyMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.ids import HiLoIdAllocator
+from app.persistence.model import Player
+from app.persistence.sharding import ShardMap, ShardedPlayerRepository
+
+PLAYER_DESCRIPTION = [('id_', 3), ('name', 253), ('goals', 3), ('team_id', 3)]
+
+
+def mock_pool():
+    pool = Mock(spec=MySQLConnectionPool)
+    connection = MagicMock()
+    cursor = MagicMock()
+
+    # Configure the mock chain properly for context manager
+    context_manager = MagicMock()
+    context_manager.__enter__.return_value = connection
+    context_manager.__exit__.return_value = None
+    pool.get_connection.return_value = context_manager
+    connection.cursor.return_value = cursor
+    cursor.description = PLAYER_DESCRIPTION
+    return pool, cursor
+
+
+def executed(cursor):
+    return [call[0][0] for call in cursor.execute.call_args_list]
+
+
+class TestHiLoIdAllocator:
+    """Tests for HiLoIdAllocator."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.pool, self.cursor = mock_pool()
+
+    def test_ids_from_reserved_block(self):
+        """Test that one statement reserves a whole block of ids, read back from lastrowid."""
+        self.cursor.lastrowid = 11
+        allocator = HiLoIdAllocator(self.pool, 'players', block_size=10)
+
+        assert [allocator.next_id() for _ in range(3)] == [1, 2, 3]
+        self.cursor.execute.assert_called_once_with(
+            'insert into id_sequences (name, next_id) values (%s, last_insert_id(%s)) '
+            'on duplicate key update next_id = last_insert_id(next_id + %s)',
+            ('players', 11, 10)
+        )
+        assert self.pool.get_connection.call_count == 1
+
+    def test_next_block_when_exhausted(self):
+        """Test that a new block is reserved when the current one runs out."""
+        type(self.cursor).lastrowid = PropertyMock(side_effect=[3, 103])
+        allocator = HiLoIdAllocator(self.pool, 'players', block_size=2)
+
+        assert allocator.next_id() == 1
+        assert allocator.next_ids(2) == [2, 101]
+
+    def test_large_request_in_one_block(self):
+        """Test that a request bigger than the block size is reserved at once."""
+        self.cursor.lastrowid = 1001
+        allocator = HiLoIdAllocator(self.pool, 'players', block_size=10)
+
+        assert allocator.next_ids(1000) == list(range(1, 1001))
+        assert self.pool.get_connection.call_count == 1
+
+    def test_sequence_seeded_from_table_once(self):
+        """Test that an allocator bound to a table seeds the sequence above max(id_) before the first block."""
+        self.cursor.lastrowid = 61
+        allocator = HiLoIdAllocator(self.pool, 'players', block_size=10, table='players')
+
+        assert allocator.next_ids(2) == [51, 52]
+        allocator.next_ids(8)
+
+        assert executed(self.cursor)[0] == ('insert ignore into id_sequences (name, next_id) '
+                                            'select %s, coalesce(max(id_), 0) + 1 from players')
+        assert len(executed(self.cursor)) == 2
+
+    def test_missing_sequence_table_created(self):
+        """Test that the sequence table is created only when seeding finds it missing."""
+        self.cursor.execute.side_effect = [errors.ProgrammingError(msg="Table doesn't exist", errno=1146),
+                                           None, None, None]
+        self.cursor.lastrowid = 11
+        allocator = HiLoIdAllocator(self.pool, 'players', block_size=10, table='players')
+
+        assert allocator.next_id() == 1
+        statements = executed(self.cursor)
+        assert statements[1].strip().startswith('create table if not exists id_sequences')
+        assert statements[2].startswith('insert ignore into id_sequences')
+
+
+class TestShardMap:
+    """Tests for ShardMap."""
+
+    def test_routing_is_stable(self):
+        """Test that the same key always goes to the same shard."""
+        shard_map = ShardMap([object(), object(), object()])
+
+        assert {shard_map.shard_for(7) for _ in range(10)} == {shard_map.shard_for(7)}
+        assert {shard_map.shard_for(team_id) for team_id in range(100)} == {0, 1, 2}
+
+    def test_overrides(self):
+        """Test that overrides win over the hash."""
+        shard_map = ShardMap([object(), object()], overrides={1: 1, 2: 1})
+
+        assert shard_map.shard_for(1) == shard_map.shard_for(2) == 1
+        with pytest.raises(ValueError):
+            ShardMap([object()], overrides={1: 3})
+
+    def test_missing_key(self):
+        """Test that rows without shard key cannot be routed."""
+        with pytest.raises(ValueError):
+            ShardMap([object()]).shard_of(Player(name="Ann"))
+
+
+class TestShardedPlayerRepository:
+    """Tests for ShardedPlayerRepository on stand-in pools."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.pools, self.cursors = zip(*[mock_pool() for _ in range(2)])
+        # Druzyna 1 na shardzie 0, druzyna 2 na shardzie 1
+        self.shard_map = ShardMap(list(self.pools), overrides={1: 0, 2: 1})
+        self.allocator = Mock(spec=HiLoIdAllocator)
+        self.allocator.next_id.return_value = 42
+        self.allocator.next_ids.side_effect = lambda count: list(range(100, 100 + count))
+        self.allocator.assign.side_effect = lambda items: HiLoIdAllocator.assign(self.allocator, items)
+        self.repo = ShardedPlayerRepository(self.shard_map, self.allocator)
+
+    def teardown_method(self):
+        """Stop shard threads."""
+        self.repo.close()
+
+    def test_insert_routes_by_team_with_global_id(self):
+        """Test that insert uses an allocated id and the team's shard."""
+        result = self.repo.insert(Player(name="Ann", goals=1, team_id=2))
+
+        assert result == 42
+        assert executed(self.cursors[1]) == ["insert into players (id_, name, goals, team_id) values (42, 'Ann', 1, 2)"]
+        self.cursors[0].execute.assert_not_called()
+
+    def test_insert_many_groups_by_shard(self):
+        """Test that insert_many writes one batch per shard."""
+        players = [Player(name="A", team_id=1), Player(name="B", team_id=2), Player(name="C", team_id=1)]
+
+        assert self.repo.insert_many(players) == [100, 101, 102]
+        assert executed(self.cursors[0]) == [
+            "insert into players (id_, name, goals, team_id) values (100, 'A', 0, 1), (102, 'C', 0, 1)"
+        ]
+        assert executed(self.cursors[1]) == ["insert into players (id_, name, goals, team_id) values (101, 'B', 0, 2)"]
+
+    def test_find_by_id_scatters_when_keyed_by_team(self):
+        """Test that a point read by id_ asks every shard."""
+        self.cursors[0].fetchone.return_value = None
+        self.cursors[1].fetchone.return_value = (5, "Ann", 1, 2)
+
+        assert self.repo.find_by_id(5) == (5, "Ann", 1, 2)
+
+    def test_find_by_id_routed_when_keyed_by_id(self):
+        """Test that a point read goes to one shard when the map is keyed by id_."""
+        repo = ShardedPlayerRepository(ShardMap(list(self.pools), key='id_', overrides={5: 1}), self.allocator)
+        self.cursors[1].fetchone.return_value = (5, "Ann", 1, 2)
+
+        assert repo.find_by_id(5) == (5, "Ann", 1, 2)
+        self.cursors[0].execute.assert_not_called()
+        repo.close()
+
+    def test_update_cannot_move_between_shards(self):
+        """Test that changing the shard key to another shard is rejected."""
+        self.cursors[0].fetchone.return_value = (5, "Ann", 1, 1)
+        self.cursors[1].fetchone.return_value = None
+
+        with pytest.raises(ValueError):
+            self.repo.update(5, Player(name="Ann", team_id=2))
+
+    def test_find_all_merges_ordered(self):
+        """Test that find_all merges shard results by id_."""
+        self.cursors[0].fetchall.return_value = [(3, "C", 0, 1), (1, "A", 0, 1)]
+        self.cursors[1].fetchall.return_value = [(2, "B", 0, 2), (4, "D", 0, 2)]
+
+        assert [player.id_ for player in self.repo.find_all()] == [1, 2, 3, 4]
+
+    def test_find_page_takes_limit_after_merge(self):
+        """Test keyset paging across shards."""
+        self.cursors[0].fetchall.return_value = [(11, "A", 0, 1), (14, "D", 0, 1)]
+        self.cursors[1].fetchall.return_value = [(12, "B", 0, 2), (13, "C", 0, 2)]
+
+        page = self.repo.find_page(after_id=10, limit=2)
+
+        assert [player.id_ for player in page] == [11, 12]
+        self.cursors[0].execute.assert_called_once_with(
+            'select * from players where id_ > %s order by id_ limit %s', (10, 2)
+        )
+
+    def test_find_all_by_team_single_shard(self):
+        """Test that team queries go only to the team's shard."""
+        self.cursors[1].fetchall.return_value = [(2, "B", 0, 2)]
+
+        assert [player.name for player in self.repo.find_all_by_team(2)] == ["B"]
+        self.cursors[0].execute.assert_not_called()
@@ -0,0 +1,192 @@
+import pytest
+from unittest.mock import Mock, MagicMock, call
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.model import Player, TeamStats, TeamGoalsView
+from app.persistence.reporting import ReportingRepository
+from app.persistence.repository import PlayerRepository
+from app.persistence.summary import Summary, TeamStatsMismatch, TeamStatsSummary
+
+
+class TestTeamStatsSummary:
+    """Tests for TeamStatsSummary."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.stats = TeamStatsSummary(self.mock_pool)
+
+    def test_apply_writes_deltas_in_key_order(self):
+        """Test that only changed teams are upserted, ordered by team_id."""
+        self.stats.apply(self.mock_cursor, {2: (1, 7), 1: (3, 10)}, {1: (3, 10), 3: (1, 9)})
+
+        self.mock_cursor.execute.assert_called_once_with(
+            'insert into team_stats (team_id, players, goals) values (2, -1, -7), (3, 1, 9) as delta '
+            'on duplicate key update players = team_stats.players + delta.players, '
+            'goals = team_stats.goals + delta.goals'
+        )
+
+    def test_apply_without_changes(self):
+        """Test that nothing is written when the aggregates did not change."""
+        self.stats.apply(self.mock_cursor, {1: (2, 4)}, {1: (2, 4)})
+
+        self.mock_cursor.execute.assert_not_called()
+
+    def test_inserted_aggregates_items(self):
+        """Test that inserted players are summed per team, players without a team skipped."""
+        self.stats.inserted(self.mock_cursor, [
+            Player(name="A", goals=2, team_id=1), Player(name="B", goals=None, team_id=1),
+            Player(name="C", goals=5, team_id=None),
+        ])
+
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert 'values (1, 2, 2) as delta' in sql
+
+    def test_capture_locks_rows(self):
+        """Test that captured aggregates come from a locking read of the affected rows."""
+        self.mock_cursor.fetchall.return_value = [(1, 2, 8)]
+
+        assert self.stats.capture(self.mock_cursor, 'id_=5') == {1: (2, 8)}
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert sql.startswith('select team_id, count(*), coalesce(sum(goals), 0) from players where (id_=5)')
+        assert sql.endswith('group by team_id for update')
+
+    def test_find_missing_row_is_zero(self):
+        """Test that a team without a summary row has zero players and goals."""
+        self.mock_cursor.fetchone.return_value = None
+
+        assert self.stats.find(4) == TeamStats(4, 0, 0)
+
+    def test_rebuild_in_one_transaction(self):
+        """Test that rebuild replaces the table with a fresh aggregate and commits once."""
+        self.mock_cursor.rowcount = 3
+
+        assert self.stats.rebuild() == 3
+
+        statements = [c.args[0] for c in self.mock_cursor.execute.call_args_list]
+        assert statements[0] == 'delete from team_stats'
+        assert statements[1].startswith('insert into team_stats (team_id, players, goals) select team_id, count(*)')
+        self.mock_connection.start_transaction.assert_called_once()
+        self.mock_connection.commit.assert_called_once()
+
+    def test_rebuild_rolls_back_on_error(self):
+        """Test that a failed rebuild leaves the old table contents."""
+        self.mock_cursor.execute.side_effect = [None, RuntimeError("boom")]
+
+        with pytest.raises(RuntimeError):
+            self.stats.rebuild()
+
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+
+    def test_check_reports_mismatches(self):
+        """Test that differing and missing rows are reported."""
+        self.mock_cursor.fetchall.side_effect = [
+            [(1, 2, 8), (2, 1, 3)],
+            [(1, 2, 8), (2, 1, 4), (3, 1, 1)],
+        ]
+
+        assert self.stats.check() == [
+            TeamStatsMismatch(2, TeamStats(2, 1, 3), TeamStats(2, 1, 4)),
+            TeamStatsMismatch(3, TeamStats(3, 0, 0), TeamStats(3, 1, 1)),
+        ]
+
+    def test_reporting_reads_summary_table(self):
+        """Test that goals per team are read from team_stats when enabled."""
+        self.mock_cursor.fetchall.return_value = [(1, "Team A", 8)]
+
+        result = ReportingRepository(self.mock_pool, use_team_stats=True).goals_per_team()
+
+        assert result == [TeamGoalsView(1, "Team A", 8)]
+        sql = self.mock_cursor.execute.call_args[0][0]
+        assert 'team_stats' in sql and 'group by' not in sql
+
+
+class TestRepositoryWithSummary:
+    """Tests for maintaining summaries from CrudRepository writes."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.summary = Mock(spec=Summary)
+        self.repository = PlayerRepository(self.mock_pool).with_summary(self.summary)
+
+    def test_update_applies_before_and_after(self):
+        """Test that update captures the row before and after the statement and applies both before commit."""
+        self.summary.capture.side_effect = [{1: (1, 5)}, {2: (1, 9)}]
+        self.summary.apply.side_effect = lambda *args: self.mock_connection.commit.assert_not_called()
+
+        self.repository.update(5, Player(goals=9, team_id=2))
+
+        assert self.summary.capture.call_args_list == [call(self.mock_cursor, 'id_=5'), call(self.mock_cursor, 'id_=5')]
+        self.summary.apply.assert_called_once_with(self.mock_cursor, {1: (1, 5)}, {2: (1, 9)})
+        self.mock_connection.commit.assert_called_once()
+
+    def test_delete_applies_removed_rows(self):
+        """Test that delete subtracts the captured rows."""
+        self.summary.capture.side_effect = [{1: (1, 5)}, {}]
+
+        self.repository.delete(5)
+
+        self.summary.apply.assert_called_once_with(self.mock_cursor, {1: (1, 5)}, {})
+
+    def test_insert_keeps_own_lastrowid(self):
+        """Test that insert returns its id even though the summary upsert runs on the same cursor."""
+        self.mock_cursor.lastrowid = 11
+
+        def upsert(cursor, items):
+            cursor.lastrowid = 0
+        self.summary.inserted.side_effect = upsert
+
+        assert self.repository.insert(Player(name="A", goals=1, team_id=1)) == 11
+
+    def test_insert_many_keeps_own_lastrowid(self):
+        """Test that insert_many returns the id of its own insert."""
+        self.mock_cursor.lastrowid = 21
+        self.summary.inserted.side_effect = lambda cursor, items: setattr(cursor, 'lastrowid', 0)
+
+        assert self.repository.insert_many([Player(name="B", goals=1, team_id=1)]) == 21
+        self.summary.inserted.assert_called_once()
+
+    def test_load_data_applies_loaded_rows(self, tmp_path):
+        """Test that rows loaded with LOAD DATA are parsed from the file and added to the summary."""
+        path = tmp_path / "players.csv"
+        path.write_text('P1,5,1\n"O\'Neil",\\N,\\N\n')
+        self.mock_cursor.rowcount = 2
+
+        assert self.repository.load_data(str(path)) == 2
+
+        self.summary.inserted.assert_called_once_with(
+            self.mock_cursor, [Player(name="P1", goals=5, team_id=1), Player(name="O'Neil", goals=None, team_id=None)]
+        )
+        self.mock_connection.commit.assert_called_once()
+
+    def test_load_data_skipped_rows_roll_back(self, tmp_path):
+        """Test that a load which skipped rows is rolled back instead of skewing the summary."""
+        path = tmp_path / "players.csv"
+        path.write_text('P1,5,1\nP2,1,1\n')
+        self.mock_cursor.rowcount = 1
+
+        with pytest.raises(ValueError, match="loaded 1 of 2 rows"):
+            self.repository.load_data(str(path))
+
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+        self.summary.inserted.assert_not_called()
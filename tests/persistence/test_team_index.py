@@ -0,0 +1,121 @@
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.model import Team
+from app.persistence.repository import TeamRepository
+from app.persistence.team_index import TeamIndex
+
+
+class TestTeamIndex:
+    """Tests for the in-process team index."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.repository = Mock(spec=TeamRepository)
+        self.repository.after_insert.return_value = self.repository
+        self.repository.after_update.return_value = self.repository
+        self.repository.after_delete.return_value = self.repository
+        self.repository.find_all.return_value = [
+            Team(1, "Team A", 10), Team(2, "Team B", 15), Team(3, "Team C", 8), Team(4, "Team D", 10)
+        ]
+        self.repository.find_page.return_value = []
+        self.now = 0.0
+        self.index = TeamIndex(self.repository, max_age=60, clock=lambda: self.now)
+
+    def hook(self, name):
+        return getattr(self.repository, name).call_args[0][0]
+
+    def test_loaded_once_on_first_lookup(self):
+        """Test that the index loads all teams with one query."""
+        assert [team.name for team in self.index.find_all_by_points_between(9, 15)] == ["Team A", "Team D", "Team B"]
+        assert self.index.find_by_name("Team C") == Team(3, "Team C", 8)
+        assert self.index.find_by_name("Team X") is None
+
+        self.repository.find_all.assert_called_once()
+
+    def test_names_matched_like_collation(self):
+        """Test that names are matched case- and accent-insensitively, like the default MySQL collation."""
+        self.repository.find_all.return_value = [Team(1, "Team A", 10), Team(2, "Górnik", 15)]
+
+        assert self.index.find_by_name("team a") == Team(1, "Team A", 10)
+        assert self.index.find_by_name("GORNIK") == Team(2, "Górnik", 15)
+
+        self.index._on_update({2: Team(name="Piast", points=None)})
+        assert self.index.find_by_name("gornik") is None
+        assert self.index.find_by_name("PIAST") == Team(2, "Piast", 15)
+
+    def test_results_are_copies(self):
+        """Test that callers cannot change indexed teams."""
+        team = self.index.find_by_name("Team A")
+        assert team is not None
+        team.points = 100
+
+        again = self.index.find_by_name("Team A")
+        assert again is not None and again.points == 10
+
+    def test_refreshed_from_hooks(self):
+        """Test incremental updates from repository writes."""
+        self.index.attach()
+        self.repository.use_index.assert_called_once_with(self.index)
+        self.index.find_by_name("Team A")
+
+        self.hook('after_update')({1: Team(points=20, name=None)})
+        self.hook('after_delete')([2])
+        self.hook('after_insert')([Team(id_=9, name="Team Z", points=12)])
+
+        assert [team.id_ for team in self.index.find_all_by_points_between(10, 20)] == [4, 9, 1]
+        assert self.index.find_by_name("Team B") is None
+        self.repository.find_all.assert_called_once()
+
+    def test_inserts_without_id_fetched_by_keyset(self):
+        """Test that auto_increment inserts are fetched after the highest known id."""
+        self.index.attach()
+        self.index.find_by_name("Team A")
+        self.repository.find_page.side_effect = [[Team(5, "Team E", 30)], []]
+
+        self.hook('after_insert')([Team(name="Team E", points=30)])
+
+        assert self.index.find_by_name("Team E") == Team(5, "Team E", 30)
+        self.repository.find_page.assert_any_call(after_id=4, limit=1000)
+        self.repository.find_all.assert_called_once()
+
+    def test_reload_after_max_age_and_delete_all(self):
+        """Test full reloads for expired index and delete_all."""
+        self.index.attach()
+        len(self.index)
+        self.now = 61
+        len(self.index)
+        self.hook('after_delete')(None)
+        len(self.index)
+
+        assert self.index.loads == 3
+
+
+class TestTeamRepositoryWithIndex:
+    """Tests for TeamRepository answering lookups from the index."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.mock_cursor.description = [('id_', 3), ('name', 253), ('points', 3)]
+        self.mock_cursor.fetchall.return_value = [(1, "Team A", 10), (2, "Team B", 15)]
+
+    def test_no_round_trip_after_load(self):
+        """Test that repeated lookups and writes keep using one load query."""
+        repo = TeamRepository(self.mock_pool)
+        TeamIndex(repo).attach()
+
+        assert repo.find_by_name("Team B") == Team(2, "Team B", 15)
+        repo.update(2, Team(name="Team B", points=30))
+        assert repo.find_all_by_points_between(20, 40) == [Team(2, "Team B", 30)]
+
+        executed = [call[0][0] for call in self.mock_cursor.execute.call_args_list]
+        assert executed == ['select * from teams', "update teams set name='Team B', points=30 where id_=2"]
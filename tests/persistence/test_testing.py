@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.configuration import RepositoryRegistry
+from app.persistence.model import Team
+from app.persistence.repository import TeamRepository
+from app.persistence.testing import SavepointConnection, rollback_transaction, worker_schema
+
+
+class TestRollbackIsolation:
+    """Tests for transaction-rollback test isolation helpers."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def executed(self):
+        return [call[0][0] for call in self.mock_cursor.execute.call_args_list]
+
+    def test_worker_schema(self):
+        """Test per xdist worker schema names."""
+        assert worker_schema('test_db', env={}) == 'test_db'
+        assert worker_schema('test_db', env={'PYTEST_XDIST_WORKER': 'gw3'}) == 'test_db_gw3'
+
+    def test_commit_and_rollback_use_savepoint(self):
+        """Test that commit moves the savepoint and rollback returns to it."""
+        connection = SavepointConnection(self.mock_connection)
+
+        connection.start_transaction()
+        connection.commit()
+        connection.rollback()
+
+        assert self.executed() == ['savepoint test_case', 'rollback to savepoint test_case']
+        self.mock_connection.start_transaction.assert_not_called()
+        self.mock_connection.commit.assert_not_called()
+        assert connection.is_connected is self.mock_connection.is_connected
+
+    def test_repository_writes_rolled_back(self):
+        """Test that repository work on the pinned connection ends with a real rollback."""
+        with rollback_transaction(self.mock_pool) as pinned_pool:
+            TeamRepository(pinned_pool).insert(Team(name="Team A"))
+
+        assert self.executed() == [
+            'savepoint test_case',
+            "insert into teams (name, points) values ('Team A', 0)",
+            'savepoint test_case',
+        ]
+        self.mock_connection.start_transaction.assert_called_once()
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+        self.mock_pool.get_connection.assert_called_once()
+
+    def test_rollback_after_failure(self):
+        """Test that the transaction is rolled back when the test fails."""
+        with pytest.raises(RuntimeError):
+            with rollback_transaction(self.mock_pool):
+                raise RuntimeError("test failed")
+
+        self.mock_connection.rollback.assert_called_once()
+
+    def test_registry_repositories_on_pinned_connection(self):
+        """Test that registry repositories are forced onto the pinned connection."""
+        registry = RepositoryRegistry(lambda profile: self.mock_pool)
+        registry.register('team_repository', TeamRepository)
+
+        with rollback_transaction(self.mock_pool) as pinned_pool:
+            registry.use_pool(pinned_pool)
+            assert registry.get('team_repository')._connection_pool is pinned_pool
+            registry.reset()
+
+        assert registry.get('team_repository')._connection_pool is self.mock_pool
@@ -0,0 +1,189 @@
+import threading
+import pytest
+from unittest.mock import Mock, MagicMock
+from mysql.connector import errors
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.batch import QueryBatch
+from app.persistence.repository import TeamRepository
+from app.persistence.timeouts import QueryCanceller, QueryTimeoutError, QueryTimeouts, max_execution_time
+
+
+def mock_pool():
+    pool = Mock(spec=MySQLConnectionPool)
+    connection = MagicMock()
+    cursor = MagicMock()
+    context_manager = MagicMock()
+    context_manager.__enter__.return_value = connection
+    context_manager.__exit__.return_value = None
+    pool.get_connection.return_value = context_manager
+    connection.cursor.return_value = cursor
+    return pool, connection, cursor
+
+
+class TestMaxExecutionTime:
+    """Tests for the MAX_EXECUTION_TIME hint."""
+
+    def test_hint_added_to_select(self):
+        """Test that the hint follows the select keyword, in milliseconds."""
+        assert (max_execution_time('select * from teams', 1.5)
+                == 'select /*+ MAX_EXECUTION_TIME(1500) */ * from teams')
+
+    def test_other_statements_unchanged(self):
+        """Test that writes and queries without a limit are not modified."""
+        assert max_execution_time('update teams set points=1', 1.0) == 'update teams set points=1'
+        assert max_execution_time('select * from teams', None) == 'select * from teams'
+
+
+class TestRepositoryTimeouts:
+    """Tests for CrudRepository.with_timeouts / timeout."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool, self.mock_connection, self.mock_cursor = mock_pool()
+        self.mock_cursor.description = [('id_', 3), ('name', 253), ('points', 3)]
+        self.mock_cursor.fetchall.return_value = []
+        self.repository = TeamRepository(self.mock_pool)
+
+    def test_select_gets_hint(self):
+        """Test that finders send the MAX_EXECUTION_TIME hint."""
+        self.repository.timeout(0.25).find_all()
+
+        self.mock_cursor.execute.assert_called_once_with('select /*+ MAX_EXECUTION_TIME(250) */ * from teams')
+
+    def test_timeout_returns_copy(self):
+        """Test that a per-call timeout does not change the original repository."""
+        self.repository.timeout(0.25)
+        self.repository.find_all()
+
+        self.mock_cursor.execute.assert_called_once_with('select * from teams')
+
+    def test_write_sets_lock_wait_timeout(self):
+        """Test that writes set innodb_lock_wait_timeout for the session first."""
+        self.repository.with_timeouts(QueryTimeouts(lock_wait=2)).delete(1)
+
+        statements = [call.args[0] for call in self.mock_cursor.execute.call_args_list]
+        assert statements == ['set session innodb_lock_wait_timeout = 2', 'delete from teams where id_=1']
+
+    def test_lock_wait_on_connect_skips_set(self):
+        """Test that no SET round trip is sent when the pool applies lock_wait in init_command."""
+        timeouts = QueryTimeouts(lock_wait=2, lock_wait_on_connect=True)
+        self.repository.with_timeouts(timeouts).delete(1)
+
+        self.mock_cursor.execute.assert_called_once_with('delete from teams where id_=1')
+        assert timeouts.init_command() == 'set session innodb_lock_wait_timeout = 2'
+
+    def test_server_timeout_raises_query_timeout(self):
+        """Test that a statement stopped by the server surfaces as QueryTimeoutError."""
+        self.mock_cursor.execute.side_effect = errors.DatabaseError(msg="Query execution was interrupted", errno=3024)
+
+        with pytest.raises(QueryTimeoutError, match='maximum statement execution time'):
+            self.repository.timeout(0.1).find_all()
+
+    def test_other_errors_unchanged(self):
+        """Test that unrelated errors pass through."""
+        self.mock_cursor.execute.side_effect = errors.ProgrammingError(msg="Syntax", errno=1064)
+
+        with pytest.raises(errors.ProgrammingError):
+            self.repository.timeout(0.1).find_all()
+
+    def test_batch_queries_get_hint(self):
+        """Test that QueryBatch applies the hint to each batched query."""
+        batch = QueryBatch(self.mock_pool, multi_statement=False, timeouts=QueryTimeouts(select=1))
+        batch.submit(self.repository.find_all)
+        batch.execute()
+
+        self.mock_cursor.execute.assert_called_once_with('select /*+ MAX_EXECUTION_TIME(1000) */ * from teams', ())
+
+
+class TestQueryCanceller:
+    """Tests for the client-side deadline and KILL QUERY."""
+
+    def test_kill_query_after_deadline(self):
+        """Test that a query running past the deadline is killed from the side connection."""
+        control_pool, _, control_cursor = mock_pool()
+        killed = threading.Event()
+        control_cursor.execute.side_effect = lambda sql: killed.set()
+        timeouts = QueryTimeouts(deadline=0.01, canceller=QueryCanceller(control_pool))
+        connection = MagicMock(connection_id=42)
+
+        with pytest.raises(QueryTimeoutError, match='deadline expired'):
+            with timeouts.guard(connection):
+                assert killed.wait(5)
+                raise errors.DatabaseError(msg="Query execution was interrupted", errno=1317)
+
+        control_cursor.execute.assert_called_once_with('kill query 42')
+
+    def test_no_kill_when_query_finishes(self):
+        """Test that the deadline timer is cancelled after the block."""
+        control_pool, _, control_cursor = mock_pool()
+        timeouts = QueryTimeouts.of(5.0, QueryCanceller(control_pool))
+
+        with timeouts.guard(MagicMock(connection_id=42)):
+            pass
+
+        control_pool.get_connection.assert_not_called()
+
+    def test_one_watchdog_for_all_guards(self):
+        """Test that deadlines share one watchdog thread instead of a timer per query."""
+        control_pool, _, _ = mock_pool()
+        canceller = QueryCanceller(control_pool)
+        timeouts = QueryTimeouts.of(5.0, canceller)
+        threads = set()
+
+        for connection_id in range(20):
+            with timeouts.guard(MagicMock(connection_id=connection_id)):
+                threads.add(canceller._thread)
+
+        assert len(threads) == 1
+        assert len(canceller._watches) == 20
+        control_pool.get_connection.assert_not_called()
+
+    def test_released_watch_is_not_killed(self):
+        """Test that a connection which left its block is skipped when its deadline passes."""
+        control_pool, _, control_cursor = mock_pool()
+        killed = threading.Event()
+        control_cursor.execute.side_effect = lambda sql: killed.set()
+        canceller = QueryCanceller(control_pool)
+
+        released = canceller.watch(42, 0.01)
+        QueryCanceller.release(released)
+        # Pozniejszy termin - watchdog zdejmuje go dopiero po pierwszym
+        running = canceller.watch(43, 0.02)
+
+        assert killed.wait(5)
+        assert not released.expired and running.expired
+        control_cursor.execute.assert_called_once_with('kill query 43')
+
+    def test_release_waits_for_kill_in_flight(self):
+        """Test that a block cannot return its connection while KILL for it is being sent."""
+        control_pool, _, control_cursor = mock_pool()
+        killing, finish_kill = threading.Event(), threading.Event()
+
+        def kill(sql: str) -> None:
+            killing.set()
+            finish_kill.wait(5)
+
+        control_cursor.execute.side_effect = kill
+        timeouts = QueryTimeouts(deadline=0.01, canceller=QueryCanceller(control_pool))
+        released = threading.Event()
+
+        def query() -> None:
+            with timeouts.guard(MagicMock(connection_id=42)):
+                assert killing.wait(5)
+            released.set()
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        assert killing.wait(5)
+        assert not released.wait(0.05)
+        finish_kill.set()
+        thread.join(5)
+
+        assert released.is_set()
+
+    def test_kill_failure_is_logged(self):
+        """Test that a failed KILL does not raise in the timer thread."""
+        control_pool, _, control_cursor = mock_pool()
+        control_cursor.execute.side_effect = errors.DatabaseError(msg="Unknown thread id", errno=1094)
+
+        QueryCanceller(control_pool).kill_query(42)
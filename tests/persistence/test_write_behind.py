@@ -0,0 +1,192 @@
+import pytest
+import time
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.repository import CrudRepository, PlayerRepository
+from app.persistence.model import Player
+from app.persistence.write_behind import WriteBehindBuffer
+from tests.persistence.test_concurrency import ClubRepository, Club
+
+
+class TestBatchedUpdatesAndHooks:
+    """Tests for update_many and change hooks in CrudRepository."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+
+        # Configure the mock chain properly for context manager
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = self.mock_connection
+        context_manager.__exit__.return_value = None
+        self.mock_pool.get_connection.return_value = context_manager
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def test_update_many_single_statement(self):
+        """Test that update_many writes all rows with one case statement."""
+        repo = PlayerRepository(self.mock_pool)
+        self.mock_cursor.rowcount = 2
+
+        result = repo.update_many({1: Player(goals=3), 2: Player(name="Bob", goals=5)})
+
+        assert result == 2
+        self.mock_cursor.execute.assert_called_once_with(
+            "update players set goals=case id_ when 1 then 3 when 2 then 5 else goals end, "
+            "name=case id_ when 2 then 'Bob' else name end where id_ in (1, 2)"
+        )
+        self.mock_connection.commit.assert_called_once()
+
+    def test_update_many_empty(self):
+        """Test that nothing is executed for no items."""
+        assert PlayerRepository(self.mock_pool).update_many({}) == 0
+        self.mock_pool.get_connection.assert_not_called()
+
+    def test_update_many_without_values_rejected(self):
+        """Test that an item with only None data fields is rejected instead of producing an empty set clause."""
+        with pytest.raises(ValueError, match="Nothing to update for id_ 2"):
+            PlayerRepository(self.mock_pool).update_many({1: Player(goals=3), 2: Player(goals=None)})
+
+        self.mock_pool.get_connection.assert_not_called()
+
+    def test_update_many_rejects_version_column(self):
+        """Test that versioned entities must be updated one by one."""
+        with pytest.raises(ValueError):
+            ClubRepository(self.mock_pool).update_many({1: Club(name="A")})
+
+    def test_hooks_called_after_commit(self):
+        """Test after_insert and after_update hooks."""
+        inserted: list[list[Player]] = []
+        updated: list[dict[int, Player]] = []
+        repo = PlayerRepository(self.mock_pool).after_insert(inserted.append).after_update(updated.append)
+        player = Player(name="Ann", goals=1, team_id=1)
+
+        repo.insert(player)
+        repo.insert_many([player])
+        repo.update(1, player)
+        repo.update_many({2: player})
+
+        assert inserted == [[player], [player]]
+        assert updated == [{1: player}, {2: player}]
+
+    def test_failing_hook_does_not_break_write(self):
+        """Test that hook errors are logged, not raised."""
+        repo = PlayerRepository(self.mock_pool).after_update(Mock(side_effect=RuntimeError("boom")))
+
+        assert repo.update(1, Player(goals=1)) == 1
+
+
+class TestWriteBehindBuffer:
+    """Tests for WriteBehindBuffer."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.repository = Mock(spec=CrudRepository)
+        self.repository._table_name.return_value = 'players'
+
+    def test_coalesces_updates_of_same_id(self):
+        """Test that later non-None values are merged into the pending update."""
+        buffer = WriteBehindBuffer(self.repository)
+
+        buffer.update(1, Player(goals=1))
+        buffer.update(1, Player(goals=2))
+        buffer.update(1, Player(name="Ann", goals=None))
+        buffer.update(2, Player(goals=7))
+
+        assert len(buffer) == 2
+        assert buffer.flush() == 2
+        self.repository.update_many.assert_called_once_with({1: Player(name="Ann", goals=2), 2: Player(goals=7)})
+        assert buffer.coalesced == 2
+        assert len(buffer) == 0
+
+    def test_update_without_values_rejected(self):
+        """Test that an update with only None data fields is rejected by the caller, not by a later flush."""
+        buffer = WriteBehindBuffer(PlayerRepository(MagicMock()))
+
+        with pytest.raises(ValueError, match="Nothing to update"):
+            buffer.update(1, Player(goals=None))
+
+        assert len(buffer) == 0
+
+    def test_flush_when_full(self):
+        """Test that reaching max_pending flushes immediately."""
+        buffer = WriteBehindBuffer(self.repository, max_pending=2)
+
+        buffer.update(1, Player(goals=1))
+        self.repository.update_many.assert_not_called()
+        buffer.update(2, Player(goals=1))
+
+        self.repository.update_many.assert_called_once()
+
+    def test_empty_flush(self):
+        """Test that an empty buffer does not touch the database."""
+        assert WriteBehindBuffer(self.repository).flush() == 0
+        self.repository.update_many.assert_not_called()
+
+    def test_failed_flush_keeps_changes(self):
+        """Test that changes are requeued without overriding newer ones."""
+        buffer = WriteBehindBuffer(self.repository)
+        buffer.update(1, Player(goals=1, name="Ann"))
+
+        def fail(batch):
+            buffer.update(1, Player(goals=5))
+            raise RuntimeError("db down")
+
+        self.repository.update_many.side_effect = fail
+        with pytest.raises(RuntimeError):
+            buffer.flush()
+
+        self.repository.update_many.side_effect = None
+        buffer.flush()
+        self.repository.update_many.assert_called_with({1: Player(name="Ann", goals=5)})
+
+    def test_background_flush_and_close(self):
+        """Test periodic flushing and the final flush on close."""
+        with WriteBehindBuffer(self.repository, flush_interval=0.02) as buffer:
+            buffer.update(1, Player(goals=1))
+            deadline = time.monotonic() + 2
+            while not self.repository.update_many.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert self.repository.update_many.called
+            buffer.update(2, Player(goals=1))
+
+        self.repository.update_many.assert_called_with({2: Player(goals=1)})
+        assert len(buffer) == 0
+
+    def test_pending_changes_merged_over_reads(self):
+        """Test that find_by_id applies buffered changes, also while they are being flushed."""
+        buffer = WriteBehindBuffer(self.repository)
+        self.repository.find_by_id.return_value = Player(1, "Ann", 3, 1)
+        buffer.update(1, Player(goals=4))
+
+        assert buffer.pending(1) == Player(goals=4)
+        assert buffer.pending(2) is None
+        assert buffer.find_by_id(1) == Player(1, "Ann", 4, 1)
+
+        def during_flush(batch):
+            buffer.update(1, Player(goals=None, team_id=2))
+            assert buffer.find_by_id(1) == Player(1, "Ann", 4, 2)
+
+        self.repository.update_many.side_effect = during_flush
+        buffer.flush()
+
+        assert buffer.pending(1) == Player(goals=None, team_id=2)
+
+    def test_restarted_after_fork(self):
+        """Test that a child process drops the parent's changes and restarts the flush thread on first update."""
+        buffer = WriteBehindBuffer(self.repository, flush_interval=60).start()
+        buffer.update(1, Player(goals=1))
+        parent_thread, parent_stopped = buffer._thread, buffer._stopped
+
+        buffer._after_fork()
+        # W prawdziwym dziecku watku rodzica nie ma
+        parent_stopped.set()
+        assert parent_thread is not None
+        parent_thread.join()
+
+        assert len(buffer) == 0 and buffer._thread is None
+        buffer.update(2, Player(goals=1))
+        assert buffer._thread is not None and buffer._thread.is_alive()
+        buffer.close()
+        self.repository.update_many.assert_called_once_with({2: Player(goals=1)})
@@ -0,0 +1,180 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from app.persistence.repository import PlayerRepository, TeamRepository
+from app.persistence.timeouts import QueryTimeoutError
+from app.service.admission import AdaptiveLimit, AdmissionController, OperationClass, OverloadedError
+from app.service.dto import CreatePlayerWithTeamDto
+from app.service.players_with_teams import PlayersWithTeamsService
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestAdaptiveLimit:
+    """Tests for AdaptiveLimit."""
+
+    def test_additive_increase(self):
+        """Test that fast operations grow the limit by about one per round."""
+        limit = AdaptiveLimit(initial=4, target_latency=0.1)
+        for _ in range(4):
+            limit.record(0.01)
+
+        assert limit.current == 4
+        assert 4.9 < limit.limit < 5.0
+
+    def test_multiplicative_decrease(self):
+        """Test that slow operations shrink the limit, down to min_limit."""
+        limit = AdaptiveLimit(initial=10, min_limit=2, target_latency=0.1, backoff=0.5)
+        limit.record(0.5)
+        assert limit.current == 5
+        for _ in range(10):
+            limit.record(0.0, overloaded=True)
+        assert limit.current == 2
+
+    def test_max_limit(self):
+        """Test that the limit never exceeds max_limit."""
+        limit = AdaptiveLimit(initial=5, max_limit=5)
+        limit.record(0.0)
+
+        assert limit.current == 5
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.controller = AdmissionController(AdaptiveLimit(initial=1, max_limit=1, target_latency=10.0),
+                                              max_queue=2, max_wait=5.0)
+        self.release = threading.Event()
+        self.order = []
+
+    def hold(self, name):
+        with self.controller.admit(name):
+            self.order.append(name)
+            self.release.wait(5)
+
+    def start(self, name):
+        thread = threading.Thread(target=self.hold, args=(name,))
+        thread.start()
+        return thread
+
+    def test_admits_within_limit(self):
+        """Test that an operation runs immediately when there is room."""
+        with self.controller.admit('read'):
+            assert self.controller.in_flight == 1
+
+        assert self.controller.in_flight == 0
+        assert self.controller.metrics.admitted['read'] == 1
+
+    def test_rejects_when_queue_full(self):
+        """Test fast rejection once max_queue operations wait."""
+        threads = [self.start('write')]
+        wait_until(lambda: self.controller.in_flight == 1)
+        threads += [self.start('write'), self.start('write')]
+        wait_until(lambda: self.controller.queued == 2)
+
+        with pytest.raises(OverloadedError, match='Too many queued'):
+            with self.controller.admit('read'):
+                pass
+
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        assert self.controller.metrics.rejected['read'] == 1
+        assert self.controller.metrics.admitted['write'] == 3
+
+    def test_interactive_lane_first(self):
+        """Test that a queued read is admitted before an earlier queued bulk import."""
+        running = self.start('write')
+        wait_until(lambda: self.controller.in_flight == 1)
+        bulk = self.start('bulk')
+        wait_until(lambda: self.controller.queued == 1)
+        read = self.start('read')
+        wait_until(lambda: self.controller.queued == 2)
+
+        self.release.set()
+        for thread in (running, bulk, read):
+            thread.join()
+
+        assert self.order == ['write', 'read', 'bulk']
+
+    def test_wait_timeout(self):
+        """Test that an operation waiting longer than max_wait is rejected."""
+        controller = AdmissionController(AdaptiveLimit(initial=1, max_limit=1), max_wait=0.01)
+
+        with controller.admit('write'):
+            with pytest.raises(OverloadedError, match='waited more than'):
+                with controller.admit('read'):
+                    pass
+
+        assert controller.metrics.timed_out['read'] == 1
+        assert controller.queued == 0
+
+    def test_class_concurrency_limit(self):
+        """Test that a class at its own limit does not block other classes."""
+        controller = AdmissionController(AdaptiveLimit(initial=5, max_limit=5), max_wait=0.01)
+
+        with controller.admit('bulk'):
+            with pytest.raises(OverloadedError):
+                with controller.admit('bulk'):
+                    pass
+            with controller.admit('read'):
+                assert controller.in_flight == 2
+
+    def test_query_timeout_shrinks_limit(self):
+        """Test that a timed out query counts as an overload signal."""
+        controller = AdmissionController(AdaptiveLimit(initial=4, target_latency=10.0, backoff=0.5))
+
+        with pytest.raises(QueryTimeoutError):
+            with controller.admit('read'):
+                raise QueryTimeoutError('Query cancelled')
+
+        assert controller.limit.current == 2
+
+
+class TestAdmittedService:
+    """Tests for admission control on PlayersWithTeamsService."""
+
+    def test_rejected_call_does_not_touch_repositories(self):
+        """Test that an overloaded service fails fast without database calls."""
+        admission = AdmissionController(AdaptiveLimit(initial=1, max_limit=1), max_queue=0)
+        player_repository = Mock(spec=PlayerRepository)
+        team_repository = Mock(spec=TeamRepository)
+        service = PlayersWithTeamsService(player_repository, team_repository, admission)
+
+        with admission.admit('read'):
+            with pytest.raises(OverloadedError):
+                service.add_player_with_team(CreatePlayerWithTeamDto("John", 1, "Team A"))
+
+        team_repository.find_by_name.assert_not_called()
+        player_repository.insert.assert_not_called()
+
+    def test_slow_bulk_batches_do_not_shrink_limit(self):
+        """Test that non-adaptive classes (bulk imports) do not drive the shared limit."""
+        clock = iter(range(0, 1000, 5))
+        controller = AdmissionController(AdaptiveLimit(initial=4, target_latency=0.1), clock=lambda: float(next(clock)))
+
+        for _ in range(10):
+            with controller.admit('bulk'):
+                pass
+
+        assert controller.limit.current == 4
+
+    def test_class_target_latency(self):
+        """Test that each adaptive class is measured against its own target."""
+        classes = (OperationClass('read', 0, target_latency=0.1), OperationClass('report', 1, target_latency=10.0))
+        clock = iter([0.0, 1.0])
+        controller = AdmissionController(AdaptiveLimit(initial=4, target_latency=0.1), classes,
+                                         clock=lambda: next(clock))
+
+        with controller.admit('report'):
+            pass
+
+        assert controller.limit.limit > 4
@@ -0,0 +1,58 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from app.persistence.repository import CrudRepository
+from app.persistence.model import Team
+from app.service.archive import ArchiveJob
+from tests.persistence.test_retention import Fixture
+
+
+class TestArchiveJob:
+    """Tests for ArchiveJob."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.repository = Mock(spec=CrudRepository)
+        self.repository._entity = Fixture
+        self.repository._table_name.return_value = 'fixtures'
+        self.pauses = []
+
+    def test_runs_batches_until_table_is_drained(self):
+        """Test that batches are archived until a short batch is returned."""
+        self.repository.archive_batch.side_effect = [2, 2, 1]
+        job = ArchiveJob(self.repository, batch_size=2, pause=0.5, sleep=self.pauses.append)
+
+        result = job.run('id_ < %s', (100,))
+
+        assert result.rows == 5
+        assert result.batches == 3
+        assert self.pauses == [0.5, 0.5]
+        self.repository.archive_batch.assert_called_with('id_ < %s', (100,), 2, None)
+
+    def test_max_batches(self):
+        """Test that the job stops after max_batches."""
+        self.repository.archive_batch.return_value = 2
+        job = ArchiveJob(self.repository, batch_size=2)
+
+        result = job.run('1 = 1', max_batches=2)
+
+        assert result.batches == 2
+        assert self.repository.archive_batch.call_count == 2
+
+    def test_archive_deleted(self):
+        """Test archiving rows soft deleted before a date."""
+        self.repository.archive_batch.return_value = 0
+        job = ArchiveJob(self.repository, archive_table='fixtures_2025')
+        older_than = datetime(2026, 7, 1)
+
+        result = job.archive_deleted(older_than)
+
+        assert result.rows == 0
+        self.repository.archive_batch.assert_called_once_with('deleted_at < %s', (older_than,), 1000, 'fixtures_2025')
+
+    def test_archive_deleted_requires_soft_delete_column(self):
+        """Test that archive_deleted needs a soft delete column."""
+        self.repository._entity = Team
+
+        with pytest.raises(ValueError):
+            ArchiveJob(self.repository).archive_deleted(datetime(2026, 7, 1))
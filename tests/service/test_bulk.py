@@ -0,0 +1,184 @@
+import json
+import pytest
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.service.bulk import BulkImporter, BulkExporter, Checkpoint, to_entity, batched
+from app.persistence.model import Team, Player
+from app.persistence.repository import PlayerRepository, TeamRepository
+
+
+class TestToEntity:
+    """Tests for row validation and conversion."""
+
+    def test_converts_csv_strings(self):
+        """Test that numeric columns are converted from strings."""
+        player = to_entity(Player, {"name": "P1", "goals": "5", "team_id": ""})
+
+        assert player == Player(name="P1", goals=5, team_id=None)
+
+    def test_unknown_column(self):
+        """Test that unknown columns are rejected."""
+        with pytest.raises(ValueError, match="Unknown columns"):
+            to_entity(Team, {"name": "A", "coach": "X"})
+
+    def test_missing_name(self):
+        """Test that a row without name is rejected."""
+        with pytest.raises(ValueError, match="Name is required"):
+            to_entity(Team, {"name": "", "points": "3"})
+
+    def test_invalid_number(self):
+        """Test that a non numeric value in numeric column is rejected."""
+        with pytest.raises(ValueError):
+            to_entity(Team, {"name": "A", "points": "many"})
+
+
+class TestBulkImporter:
+    """Tests for BulkImporter."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_repository = Mock(spec=TeamRepository)
+        self.mock_repository._entity = Team
+        self.mock_repository._table_name.return_value = 'teams'
+
+    def test_batched(self):
+        """Test splitting an iterable into bounded batches."""
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_import_csv_in_batches(self, tmp_path):
+        """Test that a CSV file is written with one parameterized insert_batch per batch."""
+        path = tmp_path / "teams.csv"
+        path.write_text("name,points\nA,1\nB,2\nC,3\n")
+        importer = BulkImporter(self.mock_repository, batch_size=2)
+
+        result = importer.import_file(path)
+
+        assert result.rows == 3
+        assert result.batches == 2
+        assert self.mock_repository.insert_batch.call_count == 2
+        assert self.mock_repository.insert_batch.call_args_list[0][0][0] == [Team(name="A", points=1), Team(name="B", points=2)]
+
+    def test_import_ndjson(self, tmp_path):
+        """Test importing an NDJSON file."""
+        path = tmp_path / "teams.ndjson"
+        path.write_text('{"name": "A", "points": 1}\n\n{"name": "B", "points": 2}\n')
+
+        result = BulkImporter(self.mock_repository).import_file(path)
+
+        assert result.rows == 2
+        self.mock_repository.insert_batch.assert_called_once_with([Team(name="A", points=1), Team(name="B", points=2)])
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Test that rows committed before a failure are skipped on resume."""
+        path = tmp_path / "teams.csv"
+        path.write_text("name,points\nA,1\nB,2\nC,3\n")
+        checkpoint = Checkpoint(tmp_path / "teams.checkpoint")
+        self.mock_repository.insert_batch.side_effect = [None, RuntimeError("connection lost")]
+
+        with pytest.raises(RuntimeError):
+            BulkImporter(self.mock_repository, batch_size=2, checkpoint=checkpoint).import_file(path)
+        assert checkpoint.load() == 2
+
+        self.mock_repository.insert_batch.side_effect = None
+        result = BulkImporter(self.mock_repository, batch_size=2, checkpoint=checkpoint).import_file(path)
+
+        assert result.skipped == 2
+        assert result.rows == 1
+        assert self.mock_repository.insert_batch.call_args[0][0] == [Team(name="C", points=3)]
+        assert checkpoint.load() == 0
+
+    def test_import_with_load_data(self, tmp_path):
+        """Test that load data mode hands a temporary CSV file with the id_ column to the repository."""
+        path = tmp_path / "players.csv"
+        path.write_text("id_,name,goals,team_id\n7,P1,5,3\n,P2,1,\n")
+        repository = Mock(spec=PlayerRepository)
+        repository._entity = Player
+        repository._table_name.return_value = 'players'
+        written = []
+
+        def load_data(file_path, with_id):
+            written.append((open(file_path).read(), with_id))
+            return 2
+
+        repository.load_data.side_effect = load_data
+
+        result = BulkImporter(repository, use_load_data=True).import_file(path)
+
+        assert written == [("7,P1,5,3\n\\N,P2,1,\\N\n", True)]
+        assert result.rows == 2
+        repository._assign_ids.assert_called_once()
+        repository.insert_batch.assert_not_called()
+
+    def test_load_data_shortfall_not_counted(self, tmp_path):
+        """Test that rows skipped by LOAD DATA fail the import instead of being checkpointed as imported."""
+        path = tmp_path / "players.csv"
+        path.write_text("name,goals,team_id\nP1,5,\nP2,1,\n")
+        repository = Mock(spec=PlayerRepository)
+        repository._entity = Player
+        repository._table_name.return_value = 'players'
+        repository.load_data.return_value = 1
+        checkpoint = Checkpoint(tmp_path / "players.checkpoint")
+
+        with pytest.raises(ValueError, match="loaded 1 of 2 rows"):
+            BulkImporter(repository, use_load_data=True, checkpoint=checkpoint).import_file(path)
+
+        assert checkpoint.load() == 0
+
+
+class TestBulkExporter:
+    """Tests for BulkExporter."""
+
+    def test_export_csv(self, tmp_path):
+        """Test exporting a table to CSV from the streaming iterator."""
+        repository = Mock(spec=TeamRepository)
+        repository._entity = Team
+        repository.iter_all.return_value = iter([Team(1, "A", 10), Team(2, "B", 15)])
+        path = tmp_path / "teams.csv"
+
+        rows = BulkExporter(repository, batch_size=500).export_file(path)
+
+        assert rows == 2
+        assert path.read_text() == "id_,name,points\n1,A,10\n2,B,15\n"
+        repository.iter_all.assert_called_once_with(500)
+
+    def test_export_ndjson(self, tmp_path):
+        """Test exporting a table to NDJSON."""
+        repository = Mock(spec=PlayerRepository)
+        repository._entity = Player
+        repository.iter_all.return_value = iter([Player(1, "P1", 5, 1)])
+        path = tmp_path / "players.ndjson"
+
+        BulkExporter(repository).export_file(path)
+
+        assert json.loads(path.read_text()) == {"id_": 1, "name": "P1", "goals": 5, "team_id": 1}
+
+
+class TestRoundTrip:
+    """Tests for exporting a table and importing the file back."""
+
+    def test_nulls_and_quotes_survive_round_trip(self, tmp_path):
+        """Test that quotes and missing values are sent as parameters, not spliced into SQL."""
+        players = [Player(1, "O'Neil", None, None), Player(2, 'Robert"); drop table players; --', 3, 1)]
+        exporting = Mock(spec=PlayerRepository)
+        exporting._entity = Player
+        exporting.iter_all.return_value = iter(players)
+        path = tmp_path / "players.csv"
+        BulkExporter(exporting).export_file(path)
+
+        mock_pool = Mock(spec=MySQLConnectionPool)
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        context_manager = MagicMock()
+        context_manager.__enter__.return_value = mock_connection
+        mock_pool.get_connection.return_value = context_manager
+        mock_connection.cursor.return_value = mock_cursor
+
+        result = BulkImporter(PlayerRepository(mock_pool)).import_file(path)
+
+        assert result.rows == 2
+        mock_cursor.executemany.assert_called_once_with(
+            'insert into players (id_, name, goals, team_id) values (%s, %s, %s, %s)',
+            [(1, "O'Neil", None, None), (2, 'Robert"); drop table players; --', 3, 1)]
+        )
+        mock_cursor.execute.assert_not_called()
+        mock_connection.commit.assert_called_once()
@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import json
+import re
+import threading
+import pytest
+from typing import Any
+from unittest.mock import Mock, MagicMock
+from mysql.connector.pooling import MySQLConnectionPool
+from app.service.export import SnapshotExporter
+
+TABLES: dict[str, list[tuple[Any, ...]]] = {
+    'teams': [(1, "Team A", 10), (2, "Team B", 15)],
+    'players': [(id_, f"P{id_}", id_ % 4, 1 + id_ % 2) for id_ in range(1, 26)],
+}
+
+
+class FakeCursor:
+    """Cursor answering min/max and id range selects from TABLES."""
+
+    def __init__(self, log):
+        self.log = log
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.log.append(sql)
+        if match := re.match(r'select min\(id_\), max\(id_\) from (\w+)', sql):
+            ids = [row[0] for row in TABLES[match.group(1)]]
+            self.rows = [(min(ids), max(ids))]
+        elif match := re.match(r'select .* from (\w+) where id_ between (\d+) and (\d+)', sql):
+            table, start, end = match.group(1), int(match.group(2)), int(match.group(3))
+            self.rows = [row for row in TABLES[table] if start <= row[0] <= end]
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class TestSnapshotExporter:
+    """Tests for SnapshotExporter."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_pool.pool_size = 4
+        self.log: list[str] = []
+        self.connections: list[MagicMock] = []
+        lock = threading.Lock()
+
+        def get_connection():
+            connection = MagicMock()
+            cursor = FakeCursor(self.log)
+            connection.cursor.side_effect = lambda **options: cursor
+            with lock:
+                self.connections.append(connection)
+            context_manager = MagicMock()
+            context_manager.__enter__.return_value = connection
+            return context_manager
+
+        self.mock_pool.get_connection.side_effect = get_connection
+
+    def test_worker_count_leaves_lock_connection(self):
+        """Test that one pooled connection is kept for the table lock."""
+        assert SnapshotExporter(self.mock_pool, 'out').worker_count() == 3
+        assert SnapshotExporter(self.mock_pool, 'out', lock_tables=False).worker_count() == 4
+        assert SnapshotExporter(self.mock_pool, 'out', workers=2).worker_count() == 2
+        self.mock_pool.pool_size = 1
+        with pytest.raises(ValueError):
+            SnapshotExporter(self.mock_pool, 'out').worker_count()
+
+    def test_snapshots_opened_under_table_lock(self, tmp_path):
+        """Test that every worker opens its snapshot between lock and unlock tables."""
+        exporter = SnapshotExporter(self.mock_pool, tmp_path, chunk_rows=10)
+
+        exporter.export()
+
+        lock = self.log.index('lock tables teams read, players read')
+        unlock = self.log.index('unlock tables')
+        snapshots = [i for i, sql in enumerate(self.log) if sql.startswith('start transaction with consistent snapshot')]
+        assert len(snapshots) == 3
+        assert all(lock < i < unlock for i in snapshots)
+        assert unlock < min(i for i, sql in enumerate(self.log) if 'min(id_)' in sql)
+
+    def test_chunks_checksums_and_manifest(self, tmp_path):
+        """Test that id ranges are written to gzip files described by the manifest."""
+        manifest = SnapshotExporter(self.mock_pool, tmp_path, chunk_rows=10, batch_size=4).export()
+
+        assert manifest.tables == {'teams': 2, 'players': 25}
+        assert [chunk.file for chunk in manifest.chunks] == [
+            'teams.00000.ndjson.gz', 'players.00000.ndjson.gz', 'players.00001.ndjson.gz', 'players.00002.ndjson.gz'
+        ]
+        assert [(chunk.first_id, chunk.last_id, chunk.rows) for chunk in manifest.chunks[1:]] == [
+            (1, 10, 10), (11, 20, 10), (21, 25, 5)
+        ]
+        players = []
+        for chunk in manifest.chunks[1:]:
+            data = (tmp_path / chunk.file).read_bytes()
+            assert hashlib.sha256(data).hexdigest() == chunk.sha256
+            players += [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+        assert [player['id_'] for player in players] == list(range(1, 26))
+        assert players[0] == {'id_': 1, 'name': 'P1', 'goals': 1, 'team_id': 2}
+
+        written = json.loads((tmp_path / 'manifest.json').read_text())
+        assert written['tables'] == {'teams': 2, 'players': 25}
+        assert written['chunks'][0]['sha256'] == manifest.chunks[0].sha256
+
+    def test_snapshots_released(self, tmp_path):
+        """Test that every worker transaction is rolled back after the export."""
+        SnapshotExporter(self.mock_pool, tmp_path, lock_tables=False).export()
+
+        assert len(self.connections) == 4
+        for connection in self.connections:
+            connection.rollback.assert_called_once()
+        assert 'unlock tables' not in self.log
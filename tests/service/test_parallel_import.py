@@ -0,0 +1,144 @@
+import threading
+import time
+from typing import Any
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+from mysql.connector import errors
+from mysql.connector.pooling import MySQLConnectionPool
+from app.persistence.connection import PinnedConnectionPool
+from app.persistence.repository import PlayerRepository, TeamRepository
+from app.persistence.retry import RetryPolicy
+from app.persistence.summary import Summary
+from app.service.parallel_import import ParallelPlayerImporter
+from app.service.dto import CreatePlayerWithTeamDto
+from app.service.players_with_teams import PlayersWithTeamsService
+
+
+class TestParallelPlayerImporter:
+    """Tests for ParallelPlayerImporter."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_pool = Mock(spec=MySQLConnectionPool)
+        self.mock_pool.pool_size = 3
+        self.connections: list[MagicMock] = []
+
+        def get_connection():
+            context_manager = MagicMock()
+            context_manager.__enter__.return_value = MagicMock()
+            self.connections.append(context_manager)
+            return context_manager
+
+        self.mock_pool.get_connection.side_effect = get_connection
+        self.dtos = [CreatePlayerWithTeamDto(str(i), i, "Team A") for i in range(25)]
+
+    def test_worker_count_bounded_by_pool_size(self):
+        """Test that worker count never exceeds pool size."""
+        assert ParallelPlayerImporter(self.mock_pool).worker_count() == 3
+        assert ParallelPlayerImporter(self.mock_pool, workers=10).worker_count() == 3
+        assert ParallelPlayerImporter(self.mock_pool, workers=2).worker_count() == 2
+
+    def test_results_reassembled_in_input_order(self):
+        """Test that ids are returned in the order of the input stream."""
+        importer = ParallelPlayerImporter(self.mock_pool, chunk_size=4)
+
+        with patch.object(PlayersWithTeamsService, 'add_player_with_team',
+                          autospec=True, side_effect=lambda service, dto: int(dto.player_name) + 1000):
+            result = importer.import_players(iter(self.dtos))
+
+        assert result.ids == [i + 1000 for i in range(25)]
+        assert sum(stats.items for stats in result.stats) == 25
+        assert len(self.connections) == 3
+
+    def test_each_worker_uses_own_connection(self):
+        """Test that each worker keeps a single checked-out connection."""
+        used: dict[int, set[int]] = {}
+
+        def add(service, dto):
+            used.setdefault(threading.get_ident(), set()).add(id(service.player_repository._connection_pool._connection))
+            return 1
+
+        with patch.object(PlayersWithTeamsService, 'add_player_with_team', autospec=True, side_effect=add):
+            ParallelPlayerImporter(self.mock_pool, chunk_size=1).import_players(self.dtos)
+
+        assert all(len(connections) == 1 for connections in used.values())
+
+    def test_error_is_raised_after_workers_stop(self):
+        """Test that a worker error is propagated to the caller."""
+        def add(service, dto):
+            if dto.player_name == "7":
+                raise ValueError("Team name not found")
+            return 1
+
+        with patch.object(PlayersWithTeamsService, 'add_player_with_team', autospec=True, side_effect=add):
+            with pytest.raises(ValueError, match="Team name not found"):
+                ParallelPlayerImporter(self.mock_pool, chunk_size=2).import_players(self.dtos)
+
+    def test_input_error_stops_workers(self):
+        """Test that an error raised by the input iterable is propagated instead of hanging the workers."""
+        def dtos():
+            yield from self.dtos[:5]
+            raise ValueError("Broken input")
+
+        with patch.object(PlayersWithTeamsService, 'add_player_with_team', autospec=True, return_value=1):
+            with pytest.raises(ValueError, match="Broken input"):
+                ParallelPlayerImporter(self.mock_pool, chunk_size=2).import_players(dtos())
+
+        assert all(connection.__exit__.called for connection in self.connections)
+
+    def test_workers_use_configured_repositories(self):
+        """Test that workers write through pinned copies of the given repositories with their summaries and retry policy."""
+        summary = Mock(spec=Summary)
+        policy = RetryPolicy()
+        player_repository = PlayerRepository(self.mock_pool).with_summary(summary).with_retry(policy)
+        team_repository = TeamRepository(self.mock_pool).with_retry(policy)
+        services: list[Any] = []
+
+        def add(service, dto):
+            services.append(service)
+            return 1
+
+        with patch.object(PlayersWithTeamsService, 'add_player_with_team', autospec=True, side_effect=add):
+            ParallelPlayerImporter(self.mock_pool, player_repository=player_repository,
+                                   team_repository=team_repository).import_players(self.dtos)
+
+        for service in services:
+            assert isinstance(service.player_repository._connection_pool, PinnedConnectionPool)
+            assert service.player_repository._summaries == [summary]
+            assert service.player_repository._retry_policy is policy
+            assert service.team_repository._retry_policy is policy
+        assert player_repository._connection_pool is self.mock_pool
+
+    def test_input_not_read_after_worker_error(self):
+        """Test that the producer stops reading the input once a worker has failed."""
+        failed = threading.Event()
+        read: list[int] = []
+
+        def dtos():
+            for i, dto in enumerate(self.dtos):
+                read.append(i)
+                yield dto
+                if i == 0:
+                    failed.wait(1)
+                    time.sleep(0.05)
+
+        def add(service, dto):
+            failed.set()
+            raise ValueError("Team name not found")
+
+        with patch.object(PlayersWithTeamsService, 'add_player_with_team', autospec=True, side_effect=add):
+            with pytest.raises(ValueError, match="Team name not found"):
+                ParallelPlayerImporter(self.mock_pool, chunk_size=1).import_players(dtos())
+
+        assert len(read) < len(self.dtos)
+
+    def test_input_error_not_masked_when_workers_are_gone(self):
+        """Test that an input error is raised even when no worker is left to take the sentinels."""
+        self.mock_pool.get_connection.side_effect = errors.PoolError("Failed getting connection; pool exhausted")
+
+        def dtos():
+            yield from self.dtos[:5]
+            raise ValueError("Broken input")
+
+        with pytest.raises(ValueError, match="Broken input"):
+            ParallelPlayerImporter(self.mock_pool, chunk_size=1).import_players(dtos())
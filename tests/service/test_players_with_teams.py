@@ -252,3 +252,31 @@ class TestPlayersWithTeamsServiceIntegration:
         assert player_calls[0][0][0].team_id == 1  # Team A
         assert player_calls[1][0][0].team_id == 2  # Team B
         assert player_calls[2][0][0].team_id == 1  # Team A again
+
+
+class TestPlayersWithTeamsServiceInMemory:
+    """Tests for PlayersWithTeamsService on the in-memory engine."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from app.persistence.memory import MemoryPlayerRepository, MemoryTeamRepository, league_database
+
+        database = league_database()
+        self.player_repository = MemoryPlayerRepository(database)
+        self.team_repository = MemoryTeamRepository(database)
+        self.service = PlayersWithTeamsService(self.player_repository, self.team_repository)
+
+    def test_add_player_with_team(self):
+        """Test that the player is stored with the team's id."""
+        team_id = self.team_repository.insert(Team(name="Test Team", points=10))
+
+        player_id = self.service.add_player_with_team(CreatePlayerWithTeamDto("John Doe", 5, "Test Team"))
+
+        assert self.player_repository.find_by_id(player_id) == (player_id, "John Doe", 5, team_id)
+
+    def test_add_player_with_unknown_team(self):
+        """Test that nothing is stored for an unknown team."""
+        with pytest.raises(ValueError, match="Team name not found"):
+            self.service.add_player_with_team(CreatePlayerWithTeamDto("John Doe", 5, "Nonexistent Team"))
+
+        assert self.player_repository.find_all() == []